@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from random import randint
+from random import Random
 
 
 class Bag:
@@ -9,7 +9,9 @@ class Bag:
     DRAWN_UNKNOWN = '?'
     DISCARDED_NONE = ''
 
-    def __init__(self, count2chars):
+    def __init__(self, count2chars, seed=None):
+        """Draws are reproducible if seed is given."""
+        self.rng = Random(seed)
         char2count = {}
         for count in count2chars:
             for char in count2chars[count]:
@@ -29,7 +31,7 @@ class Bag:
 
         chars = []
         for _ in range(count):
-            pos = randint(0, len(self.letters) - 1)
+            pos = self.rng.randint(0, len(self.letters) - 1)
             chars.append(self.letters[pos])
             end = len(self.letters)
             self.letters = self.letters[0: pos] + self.letters[pos + 1: end]
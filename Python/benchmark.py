@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import yaml
+
+
+from bag import Bag
+from board import Board, BoardLayout
+from gtree import GTree
+from rack import Rack
+from search import Search
+from search_bench import SearchBench
+from selfplay import SelfPlay
+from typing import Callable, Dict, List, Tuple
+from util import Util
+
+
+# A reproducible benchmark suite. Every case is built from fixed seeds, so that its work (ops: words,
+# lookups, moves, ...) is the same from run to run, and only its time varies. Cases:
+#   gtree_build:                  Building a GADDAG from the word list
+#   has_word:                     Looking up words, half of which are in the dictionary
+#   has_words:                    Looking up the same words in one batch
+#   find_moves/LAYOUT/PHASE:      Search.find_moves on an empty, mid-game, or dense board, per layout
+#   move2points:                  Board.moves2points of all the moves of the dense board of the first layout
+#   selfplay:                     Complete computer-vs-computer games
+# Mid-game & dense boards are played out from an empty board with highest-scoring moves.
+# Each case selected is set up, then run repeat times; its time is the fastest run. Results are written
+# as JSON, and can be compared with a baseline: a case regresses if it takes more than (1 + threshold)
+# times as long.
+class Benchmark:
+    LAYOUTS = ['layout_scrabble', 'layout_wwf', 'layout_wwf_challenge']
+    PHASE2MOVE_COUNT = {'empty': 0, 'mid': 8, 'dense': 24}
+    SEED = 2018
+    HAS_WORD_LOOKUPS = 20000
+    SELFPLAY_GAMES = 2
+    RACK = 'etaoin_'
+    REPEAT = 3
+    THRESHOLD = 0.2
+
+    def __init__(self, config, words:List[str], repeat:int=REPEAT, selfplay_games:int=SELFPLAY_GAMES):
+        self.config = config
+        self.words = words
+        self.repeat = repeat
+        self.selfplay_games = selfplay_games
+        self.gtree = GTree()
+        self.gtree.add_wordlist(words)
+        self.layouts = {name: BoardLayout(Util.get_rows_from_config(config[name])) for name in Benchmark.LAYOUTS}
+
+    def position(self, layout:BoardLayout, move_count:int, seed:int=SEED)->Tuple[Board, int]:
+        """Return the board after up to move_count highest-scoring moves by two players, and the number
+        of moves made. (Play stops early if neither player can move.)"""
+        board = Board(self.config, layout=layout)
+        bag = Bag(self.config[self.config['counts2chars']], seed)
+        rack_size = int(self.config['rack_size'])
+        racks = [Rack(bag.draw(rack_size)) for _ in range(2)]
+        made_count = 0
+        failed_count = 0
+        while made_count < move_count and failed_count < 2:
+            rack = racks[(made_count + failed_count) % 2]
+            moves = Search(self.gtree, board).best_moves(rack, 1)
+            if not moves:
+                failed_count += 1
+                continue
+            failed_count = 0
+            board.make_move(moves[0], self.gtree)
+            rack.remove_tiles([pl.char for pl in moves[0].placed_letters])
+            rack.add_chars(bag.draw(min(len(moves[0].placed_letters), len(bag))))
+            made_count += 1
+        return board, made_count
+
+    def cases(self)->Dict[str, Callable[[], Callable[[], int]]]:
+        """Return the setup of each case, which builds the case's inputs (untimed), and returns the function
+        that runs it once and returns its number of ops. Only the setups of the cases run are called."""
+        result = {}
+        words = self.words
+        memo = {}
+
+        def lookups():
+            if 'lookups' not in memo:
+                rng = random.Random(Benchmark.SEED)
+                lookups = [rng.choice(words) for _ in range(Benchmark.HAS_WORD_LOOKUPS // 2)]
+                lookups += [rng.choice(words) + rng.choice('aeiostz') for _ in range(Benchmark.HAS_WORD_LOOKUPS // 2)]
+                rng.shuffle(lookups)
+                memo['lookups'] = lookups
+            return memo['lookups']
+
+        def board(layout_name, phase):
+            if (layout_name, phase) not in memo:
+                memo[(layout_name, phase)], _ = self.position(self.layouts[layout_name], Benchmark.PHASE2MOVE_COUNT[phase])
+            return memo[(layout_name, phase)]
+
+        def gtree_build():
+            GTree().add_wordlist(words)
+            return len(words)
+        result['gtree_build'] = lambda: gtree_build
+
+        def has_word_setup():
+            words = lookups()
+            self.gtree.has_word('')  # Builds the set of words, which is not timed
+
+            def has_word():
+                has_word = self.gtree.has_word
+                for word in words:
+                    has_word(word)
+                return len(words)
+            return has_word
+        result['has_word'] = has_word_setup
+
+        def has_words_setup():
+            words = lookups()
+            self.gtree.has_word('')  # Builds the set of words, which is not timed
+
+            def has_words():
+                self.gtree.has_words(words)
+                return len(words)
+            return has_words
+        result['has_words'] = has_words_setup
+
+        def find_moves_setup(layout_name, phase):
+            def setup():
+                brd = board(layout_name, phase)
+                return lambda: len(Search(self.gtree, brd).find_moves(Benchmark.RACK))
+            return setup
+        for layout_name in self.layouts:
+            for phase in Benchmark.PHASE2MOVE_COUNT:
+                result[f'find_moves/{layout_name}/{phase}'] = find_moves_setup(layout_name, phase)
+
+        def move2points_setup():
+            dense_board = board(Benchmark.LAYOUTS[0], 'dense')
+            moves = Search(self.gtree, dense_board).find_moves(Benchmark.RACK)
+
+            def move2points():
+                dense_board.moves2points(moves)
+                return len(moves)
+            return move2points
+        result['move2points'] = move2points_setup
+
+        def selfplay():
+            selfplay = SelfPlay(self.config, self.gtree, self.layouts[Benchmark.LAYOUTS[0]])
+            selfplay.play_games(self.selfplay_games, Benchmark.SEED)
+            return selfplay.move_count
+        result['selfplay'] = lambda: selfplay
+        return result
+
+    def run(self, patterns:List[str]=None, verbose=False)->Dict:
+        """Run the cases whose names match any of patterns (default: all), and return the results."""
+        name2result = {}
+        for name, setup in self.cases().items():
+            if patterns and not any([fnmatch.fnmatch(name, pattern) for pattern in patterns]):
+                continue
+            case = setup()
+            times = []
+            ops = None
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                ops = case()
+                times.append(time.perf_counter() - start)
+            seconds = min(times)
+            name2result[name] = { 'seconds': seconds
+                                  , 'median_seconds': statistics.median(times)
+                                  , 'ops': ops
+                                  , 'ops_per_sec': ops / seconds if seconds > 0 else 0.0
+                                  }
+            if verbose:
+                print(f'{name:40s} {seconds * 1000:10.2f} ms {ops:8d} ops', file=sys.stderr)
+        return { 'meta': { 'python': platform.python_version()
+                           , 'platform': platform.platform()
+                           , 'words': len(self.words)
+                           , 'words_digest': hashlib.sha256('\n'.join(self.words).encode()).hexdigest()
+                           , 'repeat': self.repeat
+                           , 'seed': Benchmark.SEED
+                           }
+                 , 'cases': name2result
+                 }
+
+    @staticmethod
+    def compare(results:Dict, baseline:Dict, threshold:float=THRESHOLD)->List[str]:
+        """Return a line for each case that regressed from baseline: it takes more than (1 + threshold)
+        times as long, or does different work (ops). Cases missing from either are skipped."""
+        lines = []
+        if results['meta']['words_digest'] != baseline['meta']['words_digest']:
+            lines.append('Word lists differ: times are not comparable')
+        for name, result in results['cases'].items():
+            base = baseline['cases'].get(name)
+            if base is None:
+                continue
+            if result['ops'] != base['ops']:
+                lines.append(f'{name}: ops changed from {base["ops"]} to {result["ops"]}')
+            ratio = result['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+            if ratio > 1.0 + threshold:
+                lines.append(f'{name}: {ratio:.2f}x as long ({base["seconds"] * 1000:.2f} ms'
+                             + f' -> {result["seconds"] * 1000:.2f} ms)')
+        return lines
+
+    @staticmethod
+    def report(results:Dict, baseline:Dict=None)->str:
+        lines = []
+        for name, result in results['cases'].items():
+            line = f'{name:40s} {result["seconds"] * 1000:10.2f} ms {result["ops_per_sec"]:12.0f} ops/sec'
+            base = baseline['cases'].get(name) if baseline else None
+            if base is not None and base['seconds'] > 0:
+                line += f' {result["seconds"] / base["seconds"]:6.2f}x baseline'
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+def main(args):
+    with open(args.configfile, 'r') as stream:
+        config = yaml.safe_load(stream)
+    if args.dictionary:
+        words = [word for chunk in GTree.read_words(args.dictionary) for word in chunk]
+    else:
+        words = SearchBench.synthetic_words()
+    benchmark = Benchmark(config, words, repeat=args.repeat)
+    results = benchmark.run(args.cases, verbose=args.verbose)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print(Benchmark.report(results, baseline))
+    if baseline is not None:
+        regressions = Benchmark.compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION: {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog=sys.argv[0], description='Benchmark dictionary build, search & scoring')
+    parser.add_argument('-c', '--configfile', default='config.yml')
+    parser.add_argument('-d', '--dictionary', default=None
+            , help='Word file (default: a fixed list of synthetic words, so that results are reproducible)')
+    parser.add_argument('-o', '--output', default=None, help='JSON file of results')
+    parser.add_argument('-b', '--baseline', default=None
+            , help='JSON file of earlier results: exit with status 1 if any case regressed')
+    parser.add_argument('-t', '--threshold', type=float, default=Benchmark.THRESHOLD
+            , help='Slowdown beyond which a case regresses, as a fraction of its baseline time')
+    parser.add_argument('-k', '--cases', nargs='+', default=None, help='Only run cases matching these patterns')
+    parser.add_argument('-n', '--repeat', type=int, default=Benchmark.REPEAT)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    main(parser.parse_args())
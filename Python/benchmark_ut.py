@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+
+from benchmark import Benchmark
+from util import Util
+
+
+class TestBenchmark(unittest.TestCase):
+    # Enough short words to play out a few moves of each position.
+    WORDS = ['at', 'eat', 'in', 'it', 'no', 'not', 'on', 'tea', 'ten', 'tin', 'to', 'ton']
+
+    def test_run(self):
+        config = Util.load_config()  # Benchmark builds its own GADDAG of the words
+        benchmark = Benchmark(config, TestBenchmark.WORDS, repeat=1, selfplay_games=1)
+        results = benchmark.run(['has_word', 'move2points', 'find_moves/layout_wwf_challenge/*'])
+        assert(sorted(results['cases']) == ['find_moves/layout_wwf_challenge/dense', 'find_moves/layout_wwf_challenge/empty'
+                                            , 'find_moves/layout_wwf_challenge/mid', 'has_word', 'move2points'])
+        assert(results['cases']['has_word']['ops'] == Benchmark.HAS_WORD_LOOKUPS)
+        assert(results['meta']['words'] == len(TestBenchmark.WORDS))
+
+        # Cases are reproducible: the same work is done again.
+        again = Benchmark(config, TestBenchmark.WORDS, repeat=1).run(['find_moves/*'])
+        for name, result in again['cases'].items():
+            if name in results['cases']:
+                assert(result['ops'] == results['cases'][name]['ops'])
+        board, move_count = benchmark.position(benchmark.layouts['layout_scrabble'], 4)
+        assert(move_count == 4 and not board.is_empty())
+
+        # The set of words is built by the setup of has_word, rather than its first timed run.
+        benchmark = Benchmark(config, TestBenchmark.WORDS, repeat=1)
+        benchmark.cases()['has_word']()
+        assert(benchmark.gtree.word_set is not None)
+
+        # Positions are only played out for the cases run.
+        with patch.object(Benchmark, 'position', side_effect=AssertionError('position')):
+            assert(sorted(benchmark.run(['has_word*', 'gtree_build'])['cases']) == ['gtree_build', 'has_word', 'has_words'])
+
+    def test_compare(self):
+        meta = {'words_digest': 'abc'}
+        baseline = {'meta': meta, 'cases': {'a': {'seconds': 1.0, 'ops': 10}, 'b': {'seconds': 1.0, 'ops': 10}}}
+        results = {'meta': meta, 'cases': { 'a': {'seconds': 1.1, 'ops': 10}
+                                            , 'b': {'seconds': 1.5, 'ops': 10}
+                                            , 'c': {'seconds': 9.0, 'ops': 10}}}
+        assert(Benchmark.compare(results, baseline, 0.2) == ['b: 1.50x as long (1000.00 ms -> 1500.00 ms)'])
+        assert(Benchmark.compare(results, baseline, 0.6) == [])
+        results['cases']['a']['ops'] = 11
+        assert(Benchmark.compare(results, baseline, 0.6) == ['a: ops changed from 10 to 11'])
+
+
+if __name__ == '__main__':
+    unittest.main()
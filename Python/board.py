@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 
+from board_direction import BoardDirection
 from enum import Enum, auto
-from move import PlacedWord
+import hashlib
 from typing import Dict, List
 from util import Cell, Util
 
@@ -18,6 +19,14 @@ class BoardCellType(Enum):
 class Board:
     CHAR_EMPTY = '.'
 
+    # Cross-check masks have bit (ord(c) - ord('a')) set if letter c can be placed in a cell.
+    CROSS_CHECK_ALL = (1 << 26) - 1
+    CROSS_CHECK_NONE = 0
+
+    # Zobrist keys: a pseudo-random 64-bit value for each (x, y, char), derived from a hash of it,
+    # so keys agree across processes & runs. A board's hash is the XOR of the keys of its letters.
+    zobrist_keys = {}
+
     def __init__(self, config, layout, rows:List[str]=None)->List[List[str]]:
         def board2char(c):
             return Board.CHAR_EMPTY if c == '.' else c
@@ -47,19 +56,61 @@ class Board:
         assert(self.height == self.layout.height)
         assert(self.width == self.layout.width)
 
-    # Note: Neither config nor layout are cahnged after Game is initialized.
-    def __deepcopy__(self):
-        brd = Board(config, layout, self.letters[:][:])
+        self.game = None
+        self.char2points = Util.get_char2points(config)
+
+        # Per-cell cross-checks, keyed by the axis (BoardDirection.LEFT or UP) of the primary word being played.
+        #   cross_checks: Mask of the letters that form a valid secondary word if placed in the cell.
+        #   cross_scores: Points of the letters already on board in that secondary word, or None if there is none.
+        # They are computed for cross_gtree, and refreshed by update_cross_checks.
+        self.cross_checks = None
+        self.cross_scores = None
+        self.cross_gtree = None
+
+        # Anchors (a.k.a. hooks) are the empty cells adjacent to a filled cell.
+        # They, and the count of filled cells, are kept up to date by _set_letter.
+        self.anchors = set()
+        self.filled_count = 0
+        self.zobrist = 0  # Zobrist hash of the letters on board, also kept up to date by _set_letter.
+        for cell in self.cells_filled():
+            self.filled_count += 1
+            self.update_anchors(cell)
+            self.zobrist ^= Board.zobrist_key(cell.x, cell.y, self[cell])
+
+    # Note: Neither config nor layout are changed after Game is initialized, so they are shared by copies.
+    # So are cross_gtree and game. (See Game.__deepcopy__.)
+    def __deepcopy__(self, memo=None):
+        brd = Board.__new__(Board)
+        brd.__dict__.update(self.__dict__)
+        brd.letters = [row[:] for row in self.letters]
+        if self.cross_checks is not None:
+            brd.cross_checks = {bdir: [row[:] for row in rows] for bdir, rows in self.cross_checks.items()}
+            brd.cross_scores = {bdir: [row[:] for row in rows] for bdir, rows in self.cross_scores.items()}
+        brd.anchors = set(self.anchors)
         return brd
 
     def __getitem__(self, cell):
         return self.letters[cell.y][cell.x]
 
     def __setitem__(self, cell, char):
+        """Set the letter of cell. The cross-checks are then out of date, so they are dropped, and fully
+        refreshed by the next Search. (make_move & unmake_move only refresh the cells they affect.)"""
+        self._set_letter(cell, char)
+        self.cross_gtree = None
+
+    def _set_letter(self, cell, char):
+        was_empty = self.is_cell_empty(cell)
+        if not was_empty:
+            self.zobrist ^= Board.zobrist_key(cell.x, cell.y, self.letters[cell.y][cell.x])
         self.letters[cell.y][cell.x] = char
+        is_empty = self.is_cell_empty(cell)
+        if not is_empty:
+            self.zobrist ^= Board.zobrist_key(cell.x, cell.y, char)
+        if was_empty != is_empty:
+            self.filled_count += 1 if was_empty else -1
+            self.update_anchors(cell)
 
     def __str__(self, compact=False):
-        hooks = self.hooks()
         letters = [['+' if Cell(c, r) in self.layout.start_cells and self.is_cell_empty(Cell(c, r))
                         else self.letters[r][c]
                     for c in range(self.width)]
@@ -72,31 +123,68 @@ class Board:
             body = '\n'.join([f'\t{k:3d} {row} {k:3d}' for k, row in enumerate(rows)])
             return '{}\n{}\n{}'.format(header_footer, body, header_footer)
 
+    @staticmethod
+    def char2mask(c):
+        return 1 << (ord(c.lower()) - ord('a'))
+
+    def cross_check(self, cell, bdir):
+        """Return the cross-check mask of the cell for a primary word played in direction bdir."""
+        return self.cross_checks[BoardDirection.axis(bdir)][cell.y][cell.x]
+
+    def cross_score(self, cell, bdir):
+        return self.cross_scores[BoardDirection.axis(bdir)][cell.y][cell.x]
+
+    def cross_words(self, cell, bdir):
+        """Return the letters on board just before and just after cell, perpendicular to bdir."""
+        back = BoardDirection.perpendicular(bdir)
+        forward = BoardDirection.reversed(back)
+        prefix = ''
+        cursor = Util.add_cell_bdir(cell, back)
+        while self.is_cell_on_board(cursor) and not self.is_cell_empty(cursor):
+            prefix = self[cursor] + prefix
+            cursor = Util.add_cell_bdir(cursor, back)
+        suffix = ''
+        cursor = Util.add_cell_bdir(cell, forward)
+        while self.is_cell_on_board(cursor) and not self.is_cell_empty(cursor):
+            suffix = suffix + self[cursor]
+            cursor = Util.add_cell_bdir(cursor, forward)
+        return prefix, suffix
+
+    @staticmethod
+    def cross_check_mask(gtree, prefix, suffix):
+        """Return the mask of letters c such that prefix + c + suffix is in gtree.
+        Each such word is found in the GADDAG by hooking it on c: c, reversed(prefix), CHAR_REV, suffix."""
+        from gtree import GNode  # Deferred, since gtree imports board
+
+        def walk(node, chars):
+            for c in chars:
+                node = node.children.get(c)
+                if node is None:
+                    return None
+            return node
+
+        tail = reversed(prefix.lower())
+        after_hook = ''.join(tail) + ((GNode.CHAR_REV + suffix.lower()) if suffix else '') + GNode.CHAR_EOW
+        mask = Board.CROSS_CHECK_NONE
+        for c, node in gtree.root.children.items():
+            if c.isalpha() and walk(node, after_hook) is not None:
+                mask |= Board.char2mask(c)
+        return mask
+
     def find_moves(self, gtree, rack):
         return gtree.find_moves(self, rack)
 
-    # TODO: More efficient general solution? Set intersection? More efficient special cases (e.g., sparse board)?
     def hooks(self):
-        hooks = []
-        for cell in self.layout.start_cells:
-            if self[cell] == Board.CHAR_EMPTY:
-                hooks.append(cell)
+        """Return the empty start cells and anchors, in (y, x) order."""
+        hooks = set([cell for cell in self.layout.start_cells if self.is_cell_empty(cell)])
+        hooks.update(self.anchors)
+        return sorted(hooks, key=lambda cell: (cell.y, cell.x))
 
-        filled = set([cell for cell in self.cells_filled()])
-        for cell in self.cells():
-            if self[cell] == Board.CHAR_EMPTY:
-                for adj in self.cells_adjacent(cell):
-                    if adj in filled:
-                        hooks.append(cell)
-                        break
-        return hooks
-
-    # TODO: Improve efficiency. Unless undo is implemented, is_empty can be cached.
-    #       Or hooks() could just be called with an is_board_empty flag.
     def is_empty(self):
-        return all([ all([c == BoardCellType.BLANK for c in row])
-                        for row in self.letters
-                        ])
+        return self.filled_count == 0
+
+    def is_hook(self, cell):
+        return cell in self.anchors or (cell in self.layout.start_cells and self.is_cell_empty(cell))
 
     def is_cell_empty(self, cell):
         return self[cell] == Board.CHAR_EMPTY
@@ -104,14 +192,70 @@ class Board:
     def is_cell_on_board(self, cell):
         return (0 <= cell.x < self.width) and (0 <= cell.y < self.height)
 
-    def move2points(self, move):
-        cell2pl = {Cell(pl.x, pl.y): pl for pl in move.placed_letters}
-        points = self.word2points(cell2pl, move.primary_word)
-        for secondary_word in move.secondary_words:
-            points += self.word2points(cell2pl, move.secondary_word)
-        if len(move.placed_letters) == int(self.game.config['rack_size']):
-            points += int(self.game.config['bingo_points'])
-        return points
+    def make_move(self, move, gtree=None):
+        """Place the letters of move. If gtree is given, cross-checks are updated for it."""
+        for pl in move.placed_letters:
+            self._set_letter(pl.cell, pl.char)
+        if gtree is not None:
+            self.update_cross_checks(gtree, [pl.cell for pl in move.placed_letters])
+        else:
+            self.cross_gtree = None
+
+    def unmake_move(self, move, gtree=None):
+        """Remove the letters of move, undoing make_move."""
+        for pl in move.placed_letters:
+            self._set_letter(pl.cell, Board.CHAR_EMPTY)
+        if gtree is not None:
+            self.update_cross_checks(gtree, [pl.cell for pl in move.placed_letters])
+        else:
+            self.cross_gtree = None
+
+    def move2points(self, move)->int:
+        return self.moves2points([move])[0]
+
+    def moves2points(self, moves)->List[int]:
+        """Return the points of each move. Can be called before or after the move's letters are placed.
+        Letter points & multipliers are laid out in flat row-major lists, so the points of letters on board
+        in a word are summed up with a single slice."""
+        width = self.width
+        char2points = self.char2points
+        board_points = [char2points.get(c, 0) for row in self.letters for c in row]  # Blanks (uppercase) score 0
+        letter_multipliers = [m for row in self.layout.letter_multipliers for m in row]
+        word_multipliers = [m for row in self.layout.word_multipliers for m in row]
+        config = self.config if self.config else {}
+        rack_size = int(config['rack_size']) if 'rack_size' in config else None
+        bingo_points = int(config['bingo_points']) if 'bingo_points' in config else 0
+
+        result = []
+        for move in moves:
+            placed = [(pl.cell.y * width + pl.cell.x, char2points.get(pl.char, 0)) for pl in move.placed_letters]
+            points = 0
+            for pw in [move.primary_word] + move.secondary_words:
+                begin = pw.cell_begin.y * width + pw.cell_begin.x
+                end = pw.cell_end.y * width + pw.cell_end.x
+                stride = 1 if pw.cell_begin.y == pw.cell_end.y else width
+                word_points = sum(board_points[begin:end + 1:stride])
+                word_multiplier = 1
+                for index, tile_points in placed:
+                    if begin <= index <= end and (index - begin) % stride == 0 \
+                            and (stride == width or index // width == begin // width):
+                        word_points += tile_points * letter_multipliers[index] - board_points[index]
+                        word_multiplier *= word_multipliers[index]
+                points += word_points * word_multiplier
+            if rack_size is not None and len(placed) == rack_size:
+                points += bingo_points
+            result.append(points)
+        return result
+
+    @staticmethod
+    def zobrist_key(x:int, y:int, char:str)->int:
+        key = (x, y, char)
+        result = Board.zobrist_keys.get(key)
+        if result is None:
+            digest = hashlib.blake2b(f'{x},{y},{char}'.encode(), digest_size=8).digest()
+            result = int.from_bytes(digest, 'little')
+            Board.zobrist_keys[key] = result
+        return result
 
     def cells(self):
         for y in range(self.layout.height):
@@ -119,42 +263,145 @@ class Board:
                 yield Cell(x, y)
 
     def cells_adjacent(self, cell):
-        for x in range(min(0, cell.x - 1), max(self.layout.width - 1, cell.x + 1) + 1):
-            for y in range(min(0, cell.y - 1), max(self.layout.height - 1, cell.y + 1) + 1):
-                yield Cell(x, y)
+        for bdir in [BoardDirection.LEFT, BoardDirection.RIGHT, BoardDirection.UP, BoardDirection.DOWN]:
+            adj = Util.add_cell_bdir(cell, bdir)
+            if self.is_cell_on_board(adj):
+                yield adj
 
     def cells_filled(self):
         for cell in self.cells():
             if self[cell] != Board.CHAR_EMPTY:
                 yield cell 
 
+    def snapshot(self)->'BoardSnapshot':
+        return BoardSnapshot.from_board(self)
+
     def set_game(self, game):
         self.game = game
+        self.char2points = game.char2points
+        self.cross_gtree = None  # Cross-scores depend on the game's letter points
+
+    def update_anchors(self, cell):
+        """Update anchors after the given cell was filled or emptied. Only it and its neighbors can change."""
+        for c in [cell] + list(self.cells_adjacent(cell)):
+            is_anchor = self.is_cell_empty(c) and any([not self.is_cell_empty(adj) for adj in self.cells_adjacent(c)])
+            if is_anchor:
+                self.anchors.add(c)
+            else:
+                self.anchors.discard(c)
+
+    def update_cross_check(self, gtree, cell):
+        for bdir in [BoardDirection.LEFT, BoardDirection.UP]:
+            if not self.is_cell_empty(cell):
+                mask, score = Board.CROSS_CHECK_NONE, None
+            else:
+                prefix, suffix = self.cross_words(cell, bdir)
+                if prefix == '' and suffix == '':
+                    mask, score = Board.CROSS_CHECK_ALL, None
+                else:
+                    mask = Board.cross_check_mask(gtree, prefix, suffix)
+                    score = sum([self.char2points.get(c, 0) for c in prefix + suffix if c.islower()])
+            self.cross_checks[bdir][cell.y][cell.x] = mask
+            self.cross_scores[bdir][cell.y][cell.x] = score
+
+    def update_cross_checks(self, gtree, cells=None):
+        """Refresh cross-checks after letters have been placed in the given cells.
+        Only those cells and the nearest empty cells beyond them, in each of the 4 directions, can change.
+        If cells is None, or the cross-checks were computed for another gtree, all cells are refreshed."""
+        if cells is None or gtree is not self.cross_gtree:
+            self.cross_checks = {bdir: [[Board.CROSS_CHECK_ALL] * self.width for _ in range(self.height)]
+                                    for bdir in [BoardDirection.LEFT, BoardDirection.UP]}
+            self.cross_scores = {bdir: [[None] * self.width for _ in range(self.height)]
+                                    for bdir in [BoardDirection.LEFT, BoardDirection.UP]}
+            self.cross_gtree = gtree
+            cells_affected = self.cells()
+        else:
+            cells_affected = set(cells)
+            for cell in cells:
+                for bdir in [BoardDirection.LEFT, BoardDirection.RIGHT, BoardDirection.UP, BoardDirection.DOWN]:
+                    cursor = Util.add_cell_bdir(cell, bdir)
+                    while self.is_cell_on_board(cursor) and not self.is_cell_empty(cursor):
+                        cursor = Util.add_cell_bdir(cursor, bdir)
+                    if self.is_cell_on_board(cursor):
+                        cells_affected.add(cursor)
+        for cell in cells_affected:
+            self.update_cross_check(gtree, cell)
+
+
+# A compact copy of the letters on a Board: a flat bytearray of width*height chars (0 for empty cells),
+# with the same Zobrist hash as the Board. Copies share the BoardLayout, so cloning a position
+# (e.g. for lookahead or simulation) copies only the bytearray, and make/unmake of a move
+# only touch the cells of its letters.
+class BoardSnapshot:
+    CODE_EMPTY = 0
+
+    __slots__ = ('layout', 'width', 'height', 'cells', 'zobrist', 'filled_count')
+
+    def __init__(self, layout, width:int, height:int, cells:bytearray, zobrist:int, filled_count:int):
+        self.layout = layout
+        self.width = width
+        self.height = height
+        self.cells = cells
+        self.zobrist = zobrist
+        self.filled_count = filled_count
+
+    def __copy__(self):
+        return BoardSnapshot(self.layout, self.width, self.height, bytearray(self.cells), self.zobrist, self.filled_count)
+
+    def __deepcopy__(self, memo=None):
+        return self.__copy__()
+
+    def __eq__(self, other):
+        return (isinstance(other, BoardSnapshot) and self.zobrist == other.zobrist
+                and self.width == other.width and self.cells == other.cells)
+
+    def __getitem__(self, cell):
+        code = self.cells[cell.y * self.width + cell.x]
+        return Board.CHAR_EMPTY if code == BoardSnapshot.CODE_EMPTY else chr(code)
+
+    def __hash__(self):
+        return self.zobrist
+
+    def __setitem__(self, cell, char):
+        index = cell.y * self.width + cell.x
+        code = self.cells[index]
+        if code != BoardSnapshot.CODE_EMPTY:
+            self.zobrist ^= Board.zobrist_key(cell.x, cell.y, chr(code))
+            self.filled_count -= 1
+        if char == Board.CHAR_EMPTY:
+            self.cells[index] = BoardSnapshot.CODE_EMPTY
+        else:
+            self.cells[index] = ord(char)
+            self.zobrist ^= Board.zobrist_key(cell.x, cell.y, char)
+            self.filled_count += 1
+
+    @staticmethod
+    def from_board(board:Board)->'BoardSnapshot':
+        cells = bytearray(board.width * board.height)
+        for y, row in enumerate(board.letters):
+            for x, c in enumerate(row):
+                if c != Board.CHAR_EMPTY:
+                    cells[y * board.width + x] = ord(c)
+        return BoardSnapshot(board.layout, board.width, board.height, cells, board.zobrist, board.filled_count)
+
+    def copy(self)->'BoardSnapshot':
+        return self.__copy__()
+
+    def make_move(self, move):
+        for pl in move.placed_letters:
+            self[pl.cell] = pl.char
+
+    def rows(self)->List[str]:
+        return [''.join([Board.CHAR_EMPTY if c == BoardSnapshot.CODE_EMPTY else chr(c)
+                         for c in self.cells[y * self.width:(y + 1) * self.width]])
+                for y in range(self.height)]
+
+    def to_board(self, config)->Board:
+        return Board(config, layout=self.layout, rows=self.rows())
 
-    def word2points(self, cell2pl, pw:PlacedWord):
-        points = 0
-        word_multiplier = 1
-        for cell in pw.cells():
-            # Letter is being placed on board
-            if cell in cell2pl:
-                pl = cell2pl[cell]
-                letter_multiplier = 1
-                if pl.char.islower():
-                    bst = self.layout[cell]
-                    if bst == BoardCellType.DOUBLE_LETTER:
-                        letter_multiplier = 2
-                    elif bst == BoardCellType.TRIPLE_LETTER:
-                        letter_multiplier = 3
-                    elif bst == BoardCellType.DOUBLE_WORD:
-                        word_multiplier *= 2
-                    elif bst == BoardCellType.TRIPLE_WORD:
-                        word_multiplier *= 3
-                points += self.game.char2points[pl.char] * letter_multiplier
-            elif self[cell].islower():
-                # Letter is non-blank, and already on board
-                points += self.game.char2points[self[cell]]
-        points *= word_multiplier
-        return points
+    def unmake_move(self, move):
+        for pl in move.placed_letters:
+            self[pl.cell] = Board.CHAR_EMPTY
 
 
 class BoardLayout:
@@ -172,6 +419,8 @@ class BoardLayout:
                     , CHAR_LAYOUT_TRIPLE_LETTER: BoardCellType.TRIPLE_LETTER
                     , CHAR_LAYOUT_TRIPLE_WORD: BoardCellType.TRIPLE_WORD }
     bstype2char = Util.reversed_dict(char2bstype)
+    bstype2letter_multiplier = { BoardCellType.DOUBLE_LETTER: 2, BoardCellType.TRIPLE_LETTER: 3 }
+    bstype2word_multiplier = { BoardCellType.DOUBLE_WORD: 2, BoardCellType.TRIPLE_WORD: 3 }
 
     def __init__(self, rows):
         self.letters = [[BoardLayout.char2bstype[c] for c in row] for row in rows]
@@ -179,9 +428,14 @@ class BoardLayout:
         assert(is_rectangle)
         self.height = len(self.letters)
         self.width = len(self.letters[0])
+        self.letter_multipliers = [[BoardLayout.bstype2letter_multiplier.get(t, 1) for t in row] for row in self.letters]
+        self.word_multipliers = [[BoardLayout.bstype2word_multiplier.get(t, 1) for t in row] for row in self.letters]
         self.start_cells = [Cell(x, y) for x in range(self.width) for y in range(self.height)
                             if self[Cell(x, y)] == BoardCellType.START
                             ]
+        if not self.start_cells:
+            # E.g., blank layouts created for testing
+            self.start_cells = [Cell(self.width // 2, self.height // 2)]
 
     def __getitem__(self, cell):
         return self.letters[cell.y][cell.x]
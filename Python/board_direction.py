@@ -11,10 +11,20 @@ class BoardDirection(Enum):
     UP = (0, -1)
     DOWN = (0, 1)
 
+    @staticmethod
+    def axis(bdir):
+        """Return LEFT for horizontal directions, and UP for vertical ones."""
+        return BoardDirection.LEFT if bdir in [BoardDirection.LEFT, BoardDirection.RIGHT] else BoardDirection.UP
+
     @staticmethod
     def is_forward(bdir):
         return bdir in [BoardDirection.RIGHT, BoardDirection.DOWN]
 
+    @staticmethod
+    def perpendicular(bdir):
+        """Return the backward (i.e., UP or LEFT) direction perpendicular to bdir."""
+        return BoardDirection.UP if BoardDirection.axis(bdir) == BoardDirection.LEFT else BoardDirection.LEFT
+
     @staticmethod
     def reversed(bdir):
         if bdir == BoardDirection.LEFT: return BoardDirection.RIGHT
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+from copy import deepcopy
+import unittest
+
+
+from board import Board, BoardSnapshot
+from gtree import GTree
+from move import Move, PlacedLetter, PlacedWord
+from util import Cell
+
+
+class TestBoard(unittest.TestCase):
+    ROWS = ['.......', '.......', '..cat..', '.......', '.......']
+
+    @staticmethod
+    def move_cats():
+        return Move([PlacedLetter(Cell(5, 2), 's')], PlacedWord(Cell(2, 2), Cell(5, 2), 'cats'))
+
+    def test_deepcopy(self):
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'sat'])
+        board = Board(None, layout=None, rows=TestBoard.ROWS)
+        board.update_cross_checks(gtree)
+        board_copy = deepcopy(board)
+        assert(board_copy.layout is board.layout)
+        board_copy.make_move(TestBoard.move_cats(), gtree)
+        assert(board[Cell(5, 2)] == Board.CHAR_EMPTY and board_copy[Cell(5, 2)] == 's')
+        assert(board_copy.zobrist != board.zobrist and board_copy.hooks() != board.hooks())
+        assert(board_copy.cross_checks != board.cross_checks)
+
+        board_copy.unmake_move(TestBoard.move_cats(), gtree)
+        assert(board_copy.letters == board.letters and board_copy.zobrist == board.zobrist)
+        assert(board_copy.hooks() == board.hooks() and board_copy.cross_checks == board.cross_checks)
+
+    def test_snapshot(self):
+        board = Board(None, layout=None, rows=TestBoard.ROWS)
+        snapshot = board.snapshot()
+        assert(len(snapshot.cells) == board.width * board.height)
+        assert(snapshot.zobrist == board.zobrist and snapshot.rows() == TestBoard.ROWS)
+
+        clone = snapshot.copy()
+        assert(clone == snapshot and clone.layout is snapshot.layout)
+        clone.make_move(TestBoard.move_cats())
+        assert(clone[Cell(5, 2)] == 's' and snapshot[Cell(5, 2)] == Board.CHAR_EMPTY)
+        assert(clone != snapshot and clone.filled_count == snapshot.filled_count + 1)
+        board.make_move(TestBoard.move_cats())
+        assert(clone.zobrist == board.zobrist and clone.to_board(None).letters == board.letters)
+
+        clone.unmake_move(TestBoard.move_cats())
+        assert(clone == snapshot and hash(clone) == hash(snapshot))
+
+
+if __name__ == '__main__':
+    unittest.main()
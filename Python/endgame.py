@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+from copy import deepcopy
+import logging
+import math
+import time
+
+
+from rack import Rack
+from search import Search
+from search_cache import SearchCache
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class EndgameTimeout(Exception):
+    pass
+
+
+# Solves two-player endgames: once the bag is empty, both racks are known, and the game is one of
+# perfect information. Endgame.solve runs a negamax search with alpha-beta pruning, deepening one
+# ply at a time until the game tree is solved or time_limit has passed; the best move of the last
+# completed depth is returned.
+#
+# Positions are scored as in Game.turn_execute: the game ends when a player places their last tile,
+# or after two consecutive passes, and the value of a position is the difference of the points the
+# players to move and not to move score from there on. At the depth limit, the unsolved rest of the
+# game is estimated by the points of the tiles held by each player. (See estimate.)
+#
+# The transposition table is keyed on the board's Zobrist hash, both racks, and whether the previous
+# turn was a pass. Entries hold a value with its bound type, the depth it was searched to (inf if
+# the subtree was solved), and the best move, which is searched first when the position recurs.
+# Other moves are ordered by points, moves that place all of the mover's tiles first.
+class Endgame:
+    TIME_LIMIT_SECONDS = 5.0
+    MAX_DEPTH = 64
+
+    # Bound types of transposition table values
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, gtree, board, racks:List[Rack], was_prev_turn_pass=False, time_limit:float=None):
+        """racks: The racks of the player to move, and of the opponent."""
+        self.gtree = gtree
+        self.board = deepcopy(board)  # Moves are made & unmade on a copy
+        self.racks = [deepcopy(rack) for rack in racks]
+        self.was_prev_turn_pass = was_prev_turn_pass
+        self.time_limit = time_limit if time_limit is not None else Endgame.TIME_LIMIT_SECONDS
+        self.search_cache = SearchCache()  # The same rack often recurs on the same board
+        self.char2points = board.char2points
+
+        self.tt:Dict[Tuple, Tuple[float, int, int, Optional[object]]] = {}
+        self.deadline = None
+        self.cutoff_count = 0  # Positions estimated at the depth limit
+        self.node_count = 0
+        self.tt_hits = 0
+        self.depth = 0         # Last depth completed by solve
+        self.is_solved = False
+        self.elapsed = 0.0
+
+    def solve(self)->Tuple[Optional[object], int]:
+        """Return (best move, or None to pass, and its value): the spread of the points scored
+        from here on by the player to move over the opponent."""
+        start = time.perf_counter()
+        self.deadline = start + self.time_limit
+        best_move, best_value = None, None
+        try:
+            for depth in range(1, Endgame.MAX_DEPTH + 1):
+                cutoff_count = self.cutoff_count
+                value, move = self.negamax(0, depth, -math.inf, math.inf, self.was_prev_turn_pass)
+                best_move, best_value = move, value
+                self.depth = depth
+                if self.cutoff_count == cutoff_count:  # Nothing was estimated: the game tree is solved.
+                    self.is_solved = True
+                    break
+        except EndgameTimeout:
+            logger.info(f'Endgame.solve: out of time at depth {self.depth + 1}')
+        if best_value is None:  # Not even depth 1 was completed: play the highest-scoring move.
+            moves = self.find_moves(0)
+            best_move = max(moves, key=lambda m: m.points) if moves else None
+            best_value = best_move.points if best_move else 0
+        self.elapsed = time.perf_counter() - start
+        logger.info(f'Endgame.solve: value={best_value}, depth={self.depth}, solved={self.is_solved}'
+                    + f', nodes={self.node_count}, tt_hits={self.tt_hits}, {self.elapsed:.2f} sec')
+        return best_move, best_value
+
+    def estimate(self, mover:int)->int:
+        rack_points = [sum([self.char2points.get(c, 0) for c in str(rack)]) for rack in self.racks]
+        return rack_points[mover] - rack_points[1 - mover]
+
+    def find_moves(self, mover:int)->List:
+        return Search(self.gtree, self.board, self.search_cache).find_moves(self.racks[mover])
+
+    def negamax(self, mover:int, depth:int, alpha:float, beta:float, was_prev_turn_pass:bool):
+        """Return (value, best move) of the position for the player to move, searched depth plies deep."""
+        self.node_count += 1
+        if time.perf_counter() >= self.deadline:
+            raise EndgameTimeout()
+        if depth == 0:
+            self.cutoff_count += 1
+            return self.estimate(mover), None
+
+        key = (self.board.zobrist, str(self.racks[mover]), str(self.racks[1 - mover]), was_prev_turn_pass)
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_value, entry_type, tt_move = entry
+            if entry_depth >= depth:
+                if entry_type == Endgame.EXACT \
+                        or (entry_type == Endgame.LOWER and entry_value >= beta) \
+                        or (entry_type == Endgame.UPPER and entry_value <= alpha):
+                    self.tt_hits += 1
+                    if entry_depth != math.inf:
+                        self.cutoff_count += 1  # The value was estimated.
+                    return entry_value, tt_move
+
+        rack = self.racks[mover]
+        moves = self.find_moves(mover)
+        moves.sort(key=lambda m: (len(m.placed_letters) < len(rack), -m.points))
+        if tt_move is not None:
+            moves.sort(key=lambda m: m != tt_move)  # Stable, so the rest stay ordered by points
+        moves.append(None)  # Pass
+
+        alpha_in = alpha
+        cutoff_count = self.cutoff_count
+        best_value, best_move = -math.inf, None
+        for move in moves:
+            if move is None:
+                # A second consecutive pass ends the game.
+                value = 0 if was_prev_turn_pass else -self.negamax(1 - mover, depth - 1, -beta, -alpha, True)[0]
+            else:
+                placed_chars = [pl.char for pl in move.placed_letters]
+                self.board.make_move(move, self.gtree)
+                rack.remove_tiles(placed_chars)
+                try:
+                    if len(rack) == 0:  # Placing the last tile ends the game.
+                        value = move.points
+                    else:
+                        # The window is shifted by the points of the move, which are added to the reply's value.
+                        value = move.points - self.negamax(1 - mover, depth - 1, move.points - beta
+                                                           , move.points - alpha, False)[0]
+                finally:
+                    rack.add_chars([Rack.tile(c) for c in placed_chars])
+                    self.board.unmake_move(move, self.gtree)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        entry_depth = math.inf if self.cutoff_count == cutoff_count else depth
+        if best_value <= alpha_in:
+            entry_type = Endgame.UPPER
+        elif best_value >= beta:
+            entry_type = Endgame.LOWER
+        else:
+            entry_type = Endgame.EXACT
+        self.tt[key] = (entry_depth, best_value, entry_type, best_move)
+        return best_value, best_move
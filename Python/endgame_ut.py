@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+
+import unittest
+
+
+from board import Board
+from endgame import Endgame
+from game import Game
+from player import PlayerType
+from rack import Rack
+from search import Search
+from strategy import EndgameStrategy
+from util import Util
+
+
+class TestEndgame(unittest.TestCase):
+    # Words playable by the racks below, through 'cat' or each other.
+    WORDS = ['at', 'cat', 'cats', 'east', 'eat', 'no', 'not', 'note', 'on', 'rat', 'rate', 'tin', 'to', 'ton']
+
+    def setUp(self):
+        self.config, self.gtree, self.layout = Util.small_game_fixture(TestEndgame.WORDS)
+        rows = ['.' * 15] * 15
+        rows[7] = '.....cat.......'
+        self.board = Board(self.config, layout=self.layout, rows=rows)
+
+    def test_solve(self):
+        endgame = Endgame(self.gtree, self.board, [Rack('rates'), Rack('tonic')], time_limit=60)
+        move, value = endgame.solve()
+        assert(endgame.is_solved and endgame.tt_hits > 0)
+
+        # The value is the move's points less the value of the opponent's reply.
+        self.board.make_move(move, self.gtree)
+        rack = Rack('rates')
+        rack.remove_tiles([pl.char for pl in move.placed_letters])
+        reply = Endgame(self.gtree, self.board, [Rack('tonic'), rack], time_limit=60)
+        assert(reply.solve()[1] == move.points - value and reply.is_solved)
+
+    def test_no_moves(self):
+        endgame = Endgame(self.gtree, self.board, [Rack('q'), Rack('v')])
+        assert(endgame.solve() == (None, 0) and endgame.is_solved)
+
+    def test_time_limit(self):
+        # Out of time before depth 1 is completed: the highest-scoring move is played.
+        endgame = Endgame(self.gtree, self.board, [Rack('rates'), Rack('tonic')], time_limit=0)
+        move, value = endgame.solve()
+        assert(not endgame.is_solved and endgame.depth == 0)
+        assert(value == move.points == max([m.points for m in endgame.find_moves(0)]))
+
+    def test_strategy(self):
+        self.config['endgame_seconds'] = 60
+        strategy = EndgameStrategy(seed=1)
+        game = Game(self.config, self.gtree, self.board, player_types=[PlayerType.COMPUTER] * 2
+                    , strategies=[strategy, None], seed=3, verbose=False)
+        game.bag.letters = ''
+        player, opponent = [game.pid2player[pid] for pid in game.ordered_pids]
+        for p, chars in [(player, 'east'), (opponent, 'note')]:
+            p.rack.remove_chars(str(p.rack))
+            p.rack.add_chars(chars)
+        move = strategy.choose_move(player, Search(self.gtree, self.board))
+        assert(move == Endgame(self.gtree, self.board, [Rack('east'), Rack('note')], time_limit=60).solve()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,14 @@
 #!/usr/bin/env python
 
+from copy import copy, deepcopy
 from enum import Enum, auto
 import logging
 from random import randint
-import os
 
 
 from bag import Bag
-from player import Player
+from player import Player, PlayerType
+from rack import Rack
 from turn import TurnType
 from util import Util
 
@@ -26,8 +27,16 @@ class GameState(Enum):
 
 
 class Game:
+    # The game ends after this many successive turns without points (passes & swaps), as in Scrabble.
+    MAX_SCORELESS_TURNS = 6
+
     def __init__(self, config, gtree, board, **kwargs):
-        self.bag = Bag(config[config['counts2chars']])
+        """Keyword args (besides test features):
+            player_types: List of the PlayerType of each player (default: all human)
+            strategies:   List of the Strategy of each player (for computer players; default: BestScoreStrategy)
+            seed:         Seed of the bag's draws, for reproducible games
+            verbose:      If False, nothing is printed for turns taken by computer players"""
+        self.bag = Bag(config[config['counts2chars']], kwargs.get('seed'))
         self.board = board
         self.config = config
         self.cur_turn_id = 1
@@ -37,24 +46,14 @@ class Game:
         self.history:List[Turn] = []
         self.num_players = int(config['player_count'])
         self.was_prev_turn_pass = False
+        self.scoreless_turn_count = 0
         self.winner_id = None  # Remove? 
+        self.verbose = kwargs.get('verbose', True)
 
+        self.char2points = Util.get_char2points(config)
         self.board.set_game(self)
 
-        points2chars = config[config['points2chars']]
-        self.char2points = {}
-        for p in points2chars:
-            for c in points2chars[p]:
-                self.char2points[c] = int(p)
-
-        self.logger = logging.getLogger(__name__)
-        self.logger.setLevel(logging.DEBUG)
-        logfile_path = config['logfile_basename'] + '_' + str(os.getpid()) + '.log'
-        handler = logging.FileHandler(logfile_path)
-        handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s:' + logging.BASIC_FORMAT)
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        self.logger = logging.getLogger(__name__)  # Turns are logged at INFO. (See smaven.py for the log file.)
 
         if Util.TEST_FEATURES:
             if 'test_name1' in kwargs and kwargs['test_name1'] == 'auto': kwargs['test_name1'] = self.config['test_name1']
@@ -65,18 +64,34 @@ class Game:
 
         self._init_players(self.num_players, **kwargs)
 
-    def __deepcopy__(self):
-        raise NotImplemented('Game.__deepcopy__() not yet implemented')
+    # Copies share config, gtree, letter points, and logger, which do not change during a game.
+    def __deepcopy__(self, memo=None):
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.bag = deepcopy(self.bag)
+        game.board = deepcopy(self.board)
+        game.board.game = game
+        game.history = self.history[:]
+        game.pid2player = {}
+        for pid, player in self.pid2player.items():
+            game.pid2player[pid] = copy(player)
+            game.pid2player[pid].game = game
+            game.pid2player[pid].rack = deepcopy(player.rack)
+        return game
 
     def _get_players(self, num_players, **kwargs):
         result = []
+        player_types = kwargs.get('player_types', [PlayerType.HUMAN] * num_players)
+        strategies = kwargs.get('strategies', [None] * num_players)
         for player_id in range(1, num_players + 1):
+            player_type = player_types[player_id - 1]
+            strategy = strategies[player_id - 1]
             # TEST_FEATURE
             name_key = 'test_name' + str(player_id)
             if name_key in kwargs:
-                p = Player(self, player_id, name=self.config[name_key])
+                p = Player(self, player_id, name=self.config[name_key], player_type=player_type, strategy=strategy)
             else:
-                p = Player(self, player_id)
+                p = Player(self, player_id, player_type=player_type, strategy=strategy)
             result.append(p)
         return result
 
@@ -93,9 +108,9 @@ class Game:
             # TEST_FEATURE
             rack_key = 'test_rack' + str(p.player_id)
             if rack_key in kwargs:
-                p.rack = self.config[rack_key]
+                p.rack = Rack(self.config[rack_key])
             else:
-                p.rack = self.bag.draw(self.config['rack_size'])
+                p.rack = Rack(self.bag.draw(self.config['rack_size']))
 
     def exit(self):
         # Clean up resources, notify players, etc.
@@ -113,17 +128,19 @@ class Game:
         self.game_state = GameState.IN_PLAY
         while self.game_state == GameState.IN_PLAY:
             player = self.pid2player[self.cur_player_id]
-            player.show_game_state()
+            if self.verbose or player.player_type == PlayerType.HUMAN:
+                player.show_game_state()
             turn = player.turn_get()
             self.history.append(turn)
             self.logger.info(turn)
             self.turn_execute(turn)
             if self.game_state == GameState.DONE:
                 if turn.turn_type != TurnType.RESIGN:
-                    scores = {p.player_id: p.score for p in self.players}
-                    self.winner_id = sorted(scores, key=lambda p: p[1])[-1]
+                    # Ties go to the player who went first.
+                    self.winner_id = max(self.ordered_pids, key=lambda pid: self.pid2player[pid].score)
                 wid = self.winner_id
-                print(f'Player #{wid} has won! Congratulations, {self.pid2player[wid].name}!')
+                if self.verbose:
+                    print(f'Player #{wid} has won! Congratulations, {self.pid2player[wid].name}!')
                 self.cur_player_id = self.winner_id
             else:
                 self.cur_player_id = self.pid2next[self.cur_player_id]
@@ -133,31 +150,36 @@ class Game:
         if turn.turn_type == TurnType.PLACE:
             self.was_prev_turn_pass = False
             placed_chars = ''.join([pl.char for pl in turn.move.placed_letters])
-            player.rack = Util.remove_chars(player.rack, placed_chars)
-            for pl in turn.move.placed_letters:
-                self.board[pl.cell] = pl.char
-            player.score += self.board.move2points(turn.move)
+            player.rack.remove_tiles(placed_chars)
+            self.board.make_move(turn.move, self.gtree)
+            points = turn.move.points if turn.move.points is not None else self.board.move2points(turn.move)
+            player.score += points
 
             num_letters_to_draw = min(len(placed_chars), len(self.bag))
             if num_letters_to_draw > 0:
                 drawn_letters = self.bag.draw(num_letters_to_draw)
-                player.rack += drawn_letters
-                print(f"After {player.name}'s turn, rack={player.rack}")
-            else:
+                player.rack.add_chars(drawn_letters)
+                if self.verbose:
+                    print(f"After {player.name}'s turn, rack={player.rack}")
+            elif len(player.rack) == 0:
                 self.game_state = GameState.DONE
+                self.game_end_type = GameEndType.PLAYER_PLAYED_LAST_TILE
 
         elif turn.turn_type == TurnType.SWAP:
             self.was_prev_turn_pass = False
-            player.rack = Util.remove_chars(player.rack, turn.discarded)
+            player.rack.remove_chars(turn.discarded)
             self.bag.add(turn.discarded)
             num_letters_to_draw = len(turn.discarded)
             drawn_chars = self.bag.draw(num_letters_to_draw)
-            player.rack += drawn_chars
-            print(f"After {player.name}'s turn, rack={player.rack}")
+            player.rack.add_chars(drawn_chars)
+            if self.verbose:
+                print(f"After {player.name}'s turn, rack={player.rack}")
 
         elif turn.turn_type == TurnType.PASS:
             if self.was_prev_turn_pass:
                 self.game_state = GameState.DONE
+                self.game_end_type = GameEndType.PLAYERS_PASSED
+            self.was_prev_turn_pass = True
 
         elif turn.turn_type == TurnType.RESIGN:
             self.game_state = GameState.DONE
@@ -166,6 +188,14 @@ class Game:
         else:
             raise ValueError(f'Unknown turn type: {turn.turn_type}')
 
+        if turn.turn_type in [TurnType.SWAP, TurnType.PASS]:
+            self.scoreless_turn_count += 1
+            if self.scoreless_turn_count >= Game.MAX_SCORELESS_TURNS:
+                self.game_state = GameState.DONE
+                self.game_end_type = GameEndType.PLAYERS_PASSED
+        else:
+            self.scoreless_turn_count = 0
+
 
 class GameCommunication:
     @staticmethod
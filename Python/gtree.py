@@ -1,16 +1,20 @@
 #!/usr/bin/env python
 
+from array import array
+import hashlib
 import logging
+import os
+import re
+import struct
+import sys
+import time
 
 
-from board import Board
-from board_direction import BoardDirection
-from move import Move, PlacedLetter, PlacedWord
-from typing import Iterable, List, Set
+from typing import Dict, FrozenSet, Iterable, Iterator, List
 
 
 # A node in a GADDAG. (See the Wikipedia page for GADDAG.)
-# TODO: Support serialization & deserialization.
+# Serialization & deserialization are handled by GTree.save & GTree.load.
 class GNode:
     VERBOSE = False
     CHAR_BLANK = ' '
@@ -24,6 +28,8 @@ class GNode:
     # CHAR_ROOT is the char of the root of the Trie.
     CHAR_ROOT = '*'
 
+    __slots__ = ('char', 'children')
+
     def __init__(self, char:str):
         self.char = char
         self.children:Dict[str, GNode] = {}
@@ -61,10 +67,38 @@ class GNode:
 class GTree:
     VERBOSE = False
 
-    def __init__(self, filename=None):
+    # Binary GADDAG file layout (integers are little-endian):
+    #   header:     FILE_MAGIC, version (u32), node_count (u32), edge_count (u32), digest (32 bytes)
+    #   edge_begin: u32[node_count + 1]. The edges of node k are edge_begin[k] .. edge_begin[k+1] - 1.
+    #   node_flags: u8[node_count], padded to a multiple of 4 bytes. (See FLAG_EOW.)
+    #   edge_chars: u8[edge_count], padded to a multiple of 4 bytes.
+    #   edge_child: u32[edge_count]
+    # Node 0 is the root. CHAR_EOW children are not stored as nodes; they are recorded by FLAG_EOW.
+    FILE_MAGIC = b'SMVNGDAG'
+    FILE_VERSION = 1
+    FILE_SUFFIX = '.gaddag'
+    FLAG_EOW = 0x01
+    HEADER_FORMAT = '<8sIII32s'
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+    # Valid words are lines containing only lowercase ASCII letters (plus surrounding whitespace).
+    WORD_PATTERN = re.compile(r'^[ \t]*([a-z]+)[ \t\r]*$', re.MULTILINE)
+    READ_CHUNK_SIZE = 1 << 20
+
+    def __init__(self, filename=None, cache_dir=None):
+        """If cache_dir is given, the GADDAG built from filename is saved there,
+        and later loaded from there for as long as the contents of filename are unchanged.
+        Loading still creates a GNode per node: about 4 sec for 100k words (364k nodes), vs. about 22 sec
+        to build. ArrayGTree opens the same file in about a millisecond, but searches it more slowly."""
         self.root = GNode(GNode.CHAR_ROOT)
+        # Once minimized, subtrees are shared between parents, so words can no longer be added.
+        self.is_minimized = False
+        self.word_set:FrozenSet[str] = None  # Built by has_word, once words are added
         if filename:
-            self.add_wordfile(filename)
+            if cache_dir:
+                self.add_wordfile_cached(filename, cache_dir)
+            else:
+                self.add_wordfile(filename)
 
     def __len__(self):
         return len(self.root)
@@ -74,6 +108,9 @@ class GTree:
 
     def add_word(self, word:str):
         """Add the word once for each hook: first hook->beginning, then hook->end"""
+        if self.is_minimized:
+            raise ValueError('Cannot add words to a minimized GTree')
+        self.word_set = None
         for hook_pos in range(1, len(word)):
             k = hook_pos
             front = ''.join(reversed(word[0:k]))
@@ -83,43 +120,292 @@ class GTree:
         string_end = str(''.join(reversed(word)))
         self.root.add_string(string_end)
 
-    def add_wordfile(self, filename: str):
-        def is_line_valid(s):
-            return all([ord('a') <= ord(c) <= ord('z') for c in s])
+    def add_wordfile(self, filename:str, verbose=VERBOSE):
+        """Add the valid words in a word file, which is streamed in chunks. Progress is logged as words/sec."""
+        start = time.perf_counter()
+        word_count = 0
+        for chunk in GTree.read_words(filename):
+            self.add_wordlist(chunk)
+            word_count += len(chunk)
+            GTree.report_progress('added', word_count, start, verbose)
+        GTree.report_progress('added', word_count, start, verbose, is_done=True)
 
-        with open(filename, 'r') as f:
-            for line in f.readlines():
-                line = line.strip()
-                if is_line_valid(line):
-                    word = line
-                    self.add_word(word)
+    def add_wordfile_cached(self, filename:str, cache_dir:str):
+        digest = GTree.file_digest(filename)
+        cache_path = GTree.cache_path(cache_dir, digest)
+        if os.path.exists(cache_path):
+            try:
+                loaded = GTree.load(cache_path, digest)
+                self.root = loaded.root
+                self.is_minimized = loaded.is_minimized  # Cached GADDAGs are minimized: words cannot be added.
+                self.word_set = None
+                return
+            except ValueError as ex:
+                logging.getLogger(__name__).warning(f'Rebuilding GADDAG cache file {cache_path}: {ex}')
+        self.add_wordfile(filename)
+        self.minimize()
+        os.makedirs(cache_dir, exist_ok=True)
+        self.save(cache_path, digest)
 
     def add_wordlist(self, words:List[str]):
         for word in words:
             self.add_word(word)
 
-    # How much are we duplicating work across hooks? Any way to reduce effort?
-    def find_moves(self, board: Board, rack: str)->Set[Move]:
-        result = set()
-        hooks = board.hooks()
-        for hook in hooks:
-            for bdir in [BoardDirection.LEFT, BoardDirection.UP]:
-                found_moves = self.root.find_moves(move_acc, board, hook, bdir, rack)
-                for move in found_moves:
-                    result.add(move)
+    @staticmethod
+    def read_words(filename:str, chunk_size=READ_CHUNK_SIZE)->Iterable[List[str]]:
+        """Yield lists of the valid words in a word file, reading chunk_size characters at a time."""
+        with open(filename, 'r') as f:
+            rest = ''
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+                data = rest + data
+                end = data.rfind('\n') + 1
+                rest = data[end:]
+                yield GTree.WORD_PATTERN.findall(data, 0, end)
+            if rest:
+                yield GTree.WORD_PATTERN.findall(rest)
+
+    @staticmethod
+    def report_progress(action:str, word_count:int, start:float, verbose=VERBOSE, is_done=False):
+        elapsed = time.perf_counter() - start
+        rate = word_count / elapsed if elapsed > 0 else 0.0
+        msg = (f"GTree.add_wordfile: {'done: ' if is_done else ''}{action} {word_count} words"
+                + f' in {elapsed:.2f} sec ({rate:.0f} words/sec)')
+        logging.getLogger(__name__).info(msg)
+        if verbose:
+            print(msg)
+
+    @staticmethod
+    def cache_path(cache_dir:str, digest:bytes)->str:
+        return os.path.join(cache_dir, digest.hex() + GTree.FILE_SUFFIX)
+
+    @staticmethod
+    def file_digest(filename:str)->bytes:
+        """SHA-256 digest of the contents of a word file. Used to key compiled GADDAG files."""
+        sha = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.digest()
+
+    @staticmethod
+    def compile(filename:str, cache_dir:str, verbose=VERBOSE)->str:
+        """Build the minimized GADDAG for a word file and save it to the cache. Return the path of the compiled file."""
+        digest = GTree.file_digest(filename)
+        gtree = GTree()
+        gtree.add_wordfile(filename, verbose=verbose)
+        node_count_before, node_count_after = gtree.minimize()
+        if verbose:
+            print(f'GADDAG node count: {node_count_before} before minimization, {node_count_after} after')
+        cache_path = GTree.cache_path(cache_dir, digest)
+        os.makedirs(cache_dir, exist_ok=True)
+        gtree.save(cache_path, digest)
+        return cache_path
+
+    @staticmethod
+    def load(path:str, digest:bytes=None)->'GTree':
+        """Load a GADDAG saved by GTree.save. If digest is given, it must match the one stored in the file.
+        Time is spent creating the GNodes, at roughly 100k nodes/sec. (See GTree.__init__.)"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            return GTree.from_bytes(data, digest)
+        except ValueError as ex:
+            raise ValueError(f'{path}: {ex}')
+
+    @staticmethod
+    def from_bytes(data, digest:bytes=None)->'GTree':
+        """Deserialize a GADDAG serialized by GTree.to_bytes."""
+        node_count, edge_count, file_digest, offsets = GTree.read_header(data)
+        if digest is not None and digest != file_digest:
+            raise ValueError('GADDAG was built from a different word file')
+        edge_begin, node_flags, edge_chars, edge_child = GTree.read_sections(data, node_count, edge_count, offsets)
+
+        chars = edge_chars.tobytes().decode('ascii')
+        child_indexes = edge_child.tolist()
+        node_chars = [GNode.CHAR_ROOT] * node_count
+        for char, k in zip(chars, child_indexes):
+            node_chars[k] = char
+        nodes = [GNode(char) for char in node_chars]
+        child_nodes = [nodes[k] for k in child_indexes]
+        eow = GNode(GNode.CHAR_EOW)
+        begins = edge_begin.tolist()
+        for k, node in enumerate(nodes):
+            begin, end = begins[k], begins[k + 1]
+            if begin < end:
+                node.children = dict(zip(chars[begin:end], child_nodes[begin:end]))
+            if node_flags[k] & GTree.FLAG_EOW:
+                node.children[GNode.CHAR_EOW] = eow
+        gtree = GTree()
+        gtree.root = nodes[0]
+        # In a tree, every node but the root has exactly one incoming edge.
+        gtree.is_minimized = edge_count != node_count - 1
+        return gtree
+
+    def minimize(self):
+        """Merge equivalent subtrees, turning the trie into a DAWG-style automaton with shared suffixes.
+        Two nodes are equivalent if they have the same char and equivalent children.
+        Return the node counts before and after minimization."""
+        node_count_before = self.node_count()
+        signature2node = {}
+        id2canon = {}
+
+        def canonical(node):
+            if id(node) in id2canon:
+                return id2canon[id(node)]
+            for char, child in node.children.items():
+                node.children[char] = canonical(child)
+            signature = (node.char, tuple(sorted((char, id(child)) for char, child in node.children.items())))
+            canon = signature2node.setdefault(signature, node)
+            id2canon[id(node)] = canon
+            return canon
+
+        self.root = canonical(self.root)
+        self.is_minimized = True
+        node_count_after = len(signature2node)
+        logging.getLogger(__name__).info(
+                f'GTree.minimize: node count {node_count_before} before, {node_count_after} after')
+        return node_count_before, node_count_after
+
+    def node_count(self)->int:
+        """Return the number of distinct nodes, counting nodes shared by several parents once."""
+        seen = {id(self.root)}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for child in node.children.values():
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    stack.append(child)
+        return len(seen)
+
+    @staticmethod
+    def read_header(data):
+        """Return (node_count, edge_count, digest, section offsets) for a serialized GADDAG."""
+        if len(data) < GTree.HEADER_SIZE:
+            raise ValueError('GADDAG file is truncated')
+        magic, version, node_count, edge_count, digest = struct.unpack_from(GTree.HEADER_FORMAT, data, 0)
+        if magic != GTree.FILE_MAGIC:
+            raise ValueError('Not a GADDAG file')
+        if version != GTree.FILE_VERSION:
+            raise ValueError(f'Unsupported GADDAG file version: {version}')
+
+        def padded(n):
+            return (n + 3) & ~3
+
+        edge_begin_offset = padded(GTree.HEADER_SIZE)
+        node_flags_offset = edge_begin_offset + 4 * (node_count + 1)
+        edge_chars_offset = node_flags_offset + padded(node_count)
+        edge_child_offset = edge_chars_offset + padded(edge_count)
+        end_offset = edge_child_offset + 4 * edge_count
+        if len(data) < end_offset:
+            raise ValueError('GADDAG file is truncated')
+        offsets = (edge_begin_offset, node_flags_offset, edge_chars_offset, edge_child_offset, end_offset)
+        return node_count, edge_count, digest, offsets
+
+    @staticmethod
+    def read_sections(data, node_count, edge_count, offsets):
+        """Return (edge_begin, node_flags, edge_chars, edge_child) as arrays copied out of data."""
+        edge_begin_offset, node_flags_offset, edge_chars_offset, edge_child_offset, end_offset = offsets
+        edge_begin = GTree.u32_array(data[edge_begin_offset:node_flags_offset])
+        node_flags = array('B', data[node_flags_offset:node_flags_offset + node_count])
+        edge_chars = array('B', data[edge_chars_offset:edge_chars_offset + edge_count])
+        edge_child = GTree.u32_array(data[edge_child_offset:end_offset])
+        return edge_begin, node_flags, edge_chars, edge_child
+
+    @staticmethod
+    def u32_array(data)->array:
+        result = array('I')
+        assert(result.itemsize == 4)
+        result.frombytes(data)
+        if sys.byteorder != 'little':
+            result.byteswap()
         return result
 
+    def save(self, path:str, digest:bytes=b''):
+        """Save the GADDAG in the binary format described above."""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_bytes(digest))
+        os.replace(tmp_path, path)
+
+    def to_bytes(self, digest:bytes=b'')->bytes:
+        """Serialize the GADDAG in the binary format described above. Nodes shared by several parents are saved once."""
+        node2index = {id(self.root): 0}
+        nodes = [self.root]
+        edge_begin = array('I')
+        node_flags = bytearray()
+        edge_chars = bytearray()
+        edge_child = array('I')
+        k = 0
+        while k < len(nodes):  # Breadth-first, so that each node is indexed before its edges are written
+            node = nodes[k]
+            edge_begin.append(len(edge_child))
+            flags = 0
+            for char, child in node.children.items():
+                if char == GNode.CHAR_EOW:
+                    flags |= GTree.FLAG_EOW
+                    continue
+                if id(child) not in node2index:
+                    node2index[id(child)] = len(nodes)
+                    nodes.append(child)
+                edge_chars.append(ord(char))
+                edge_child.append(node2index[id(child)])
+            node_flags.append(flags)
+            k += 1
+        edge_begin.append(len(edge_child))
+        if sys.byteorder != 'little':
+            edge_begin.byteswap()
+            edge_child.byteswap()
+
+        def pad(b):
+            return b + bytes(-len(b) % 4)
+
+        header = struct.pack(GTree.HEADER_FORMAT, GTree.FILE_MAGIC, GTree.FILE_VERSION
+                             , len(nodes), len(edge_child), digest.ljust(32, b'\0'))
+        return b''.join([pad(header)
+                        , edge_begin.tobytes()
+                        , pad(bytes(node_flags))
+                        , pad(bytes(edge_chars))
+                        , edge_child.tobytes()
+                        ])
+
     def has_word(self, word)->bool:
         """Check to see if the given word is in the GTree.
-        Useful to check whether secondary words created by a Move are valid."""
-        if len(word) == 1:
-            chars = word + GNode.CHAR_EOW
-        else:
-            chars = word[0] + GNode.CHAR_REV + word[1:] + GNode.CHAR_EOW
-        cursor = self.root
-        for c in chars.lower():
-            if c not in cursor.children:
-                return False
-            else:
-                cursor = cursor.children[c]
-        return True
+        Useful to check whether secondary words created by a Move are valid. (See GTree.words.)"""
+        word_set = self.word_set if self.word_set is not None else self.build_word_set()
+        return word.lower() in word_set
+
+    def has_words(self, words:Iterable[str])->List[bool]:
+        """Return whether each of words is in the GTree."""
+        word_set = self.word_set if self.word_set is not None else self.build_word_set()
+        return [word.lower() in word_set for word in words]
+
+    def build_word_set(self)->FrozenSet[str]:
+        self.word_set = frozenset(GTree.words(self.root))
+        return self.word_set
+
+    # Whole words are looked up in a set of the words, which is read out of the GADDAG the first time,
+    # so it is available for GADDAGs loaded from compiled files, too. A lookup in the GADDAG walks a
+    # node per char of the word; a set lookup hashes the word once, and most misses are decided by the
+    # hash alone, so neither a perfect hash nor a filter of misses (e.g. a bloom filter) would be faster.
+    @staticmethod
+    def words(root)->Iterator[str]:
+        """Yield each word of the GADDAG at root once. A word w of 2+ letters is read from the string
+        w[0] + CHAR_REV + w[1:], and a 1-letter word from the string w. (See GTree.add_word.)"""
+        for c, node in root.children.items():
+            if GNode.CHAR_EOW in node.children:
+                yield c
+            rev = node.children.get(GNode.CHAR_REV)
+            if rev is None:
+                continue
+            stack = [(rev, c)]
+            while stack:
+                node, prefix = stack.pop()
+                for char, child in node.children.items():
+                    if char == GNode.CHAR_EOW:
+                        yield prefix
+                    else:
+                        stack.append((child, prefix + char))
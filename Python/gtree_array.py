@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+
+import mmap
+import os
+import sys
+
+
+from gtree import GNode, GTree
+from typing import Iterable, Iterator, List, Tuple
+
+
+# A read-only GADDAG backed by the flat arrays of a compiled GADDAG file (See GTree.save.)
+# The file is opened with mmap, so processes that open the same file share a single copy of it.
+# Nodes are exposed as lightweight ArrayGNode views with the same char & children interface as GNode,
+# so ArrayGTree can be used wherever a GTree is searched.
+class ArrayGTree:
+    VERBOSE = False
+
+    def __init__(self, filename=None, cache_dir=None):
+        """Open the compiled GADDAG for word file filename, compiling it into cache_dir first if needed."""
+        self.file = None
+        self.mm = None
+        if filename:
+            if not cache_dir:
+                raise ValueError('ArrayGTree requires cache_dir when built from a word file')
+            cache_path = GTree.cache_path(cache_dir, GTree.file_digest(filename))
+            if not os.path.exists(cache_path):
+                cache_path = GTree.compile(filename, cache_dir)
+            self.open(cache_path)
+
+    def __del__(self):
+        self.close()
+
+    def __len__(self):
+        return self.node_count
+
+    def __str__(self):
+        return self.root.__str__()
+
+    def close(self):
+        # Views into the mmap must be released before the mmap itself can be closed.
+        for name in ['edge_begin', 'edge_child']:
+            view = getattr(self, name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def open(self, path:str):
+        self.close()
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.node_count, self.edge_count, self.digest, offsets = GTree.read_header(self.mm)
+        edge_begin_offset, node_flags_offset, edge_chars_offset, edge_child_offset, end_offset = offsets
+        if sys.byteorder == 'little':
+            view = memoryview(self.mm)
+            self.edge_begin = view[edge_begin_offset:node_flags_offset].cast('I')
+            self.edge_child = view[edge_child_offset:end_offset].cast('I')
+            view.release()
+        else:
+            self.edge_begin, _, _, self.edge_child = GTree.read_sections(
+                    self.mm, self.node_count, self.edge_count, offsets)
+        self.node_flags_offset = node_flags_offset
+        self.edge_chars_offset = edge_chars_offset
+        self.root = ArrayGNode(self, 0, GNode.CHAR_ROOT)
+
+    def child_index(self, index:int, char:str)->int:
+        """Return the index of the child of node index reached via char, or -1 if there is none."""
+        begin = self.edge_chars_offset + self.edge_begin[index]
+        end = self.edge_chars_offset + self.edge_begin[index + 1]
+        pos = self.mm.find(char.encode('ascii'), begin, end)
+        return -1 if pos < 0 else self.edge_child[pos - self.edge_chars_offset]
+
+    def edges(self, index:int)->Iterator[Tuple[str, int]]:
+        """Yield (char, child index) for each non-EOW child of node index."""
+        begin = self.edge_begin[index]
+        end = self.edge_begin[index + 1]
+        chars = self.mm[self.edge_chars_offset + begin:self.edge_chars_offset + end].decode('ascii')
+        for k, char in enumerate(chars):
+            yield char, self.edge_child[begin + k]
+
+    def is_eow(self, index:int)->bool:
+        return bool(self.mm[self.node_flags_offset + index] & GTree.FLAG_EOW)
+
+    def has_word(self, word)->bool:
+        """Check to see if the given word is in the GADDAG. (See GTree.has_word.)
+        Words are looked up in the mapped arrays, rather than a set of the words as in GTree, which
+        would take a walk of the whole GADDAG to build, and a copy of it in each process."""
+        if not word:
+            return False
+        if len(word) == 1:
+            chars = word
+        else:
+            chars = word[0] + GNode.CHAR_REV + word[1:]
+        index = 0
+        for c in chars.lower():
+            index = self.child_index(index, c)
+            if index < 0:
+                return False
+        return self.is_eow(index)
+
+    def has_words(self, words:Iterable[str])->List[bool]:
+        """Return whether each of words is in the GADDAG."""
+        return [self.has_word(word) for word in words]
+
+
+class ArrayGNode:
+    __slots__ = ('gtree', 'index', 'char')
+
+    # Index of the (childless) EOW nodes, which are not stored in the arrays.
+    INDEX_EOW = -1
+
+    def __init__(self, gtree:ArrayGTree, index:int, char:str):
+        self.gtree = gtree
+        self.index = index
+        self.char = char
+
+    def __eq__(self, other):
+        return isinstance(other, ArrayGNode) and self.gtree is other.gtree and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    def __len__(self):
+        return 1 + len(self.children)
+
+    def __str__(self, indent_level=0):
+        indent_str = '  '
+        children = self.children
+        result = (
+            f'{indent_str * indent_level}{self.char}\n'
+            + '\n'.join([children[c].__str__(indent_level + 1) for c in children])
+            )
+        return result
+
+    @property
+    def children(self)->'ArrayGNodeChildren':
+        return ArrayGNodeChildren(self)
+
+
+# Read-only mapping from char to child ArrayGNode, mirroring GNode.children.
+class ArrayGNodeChildren:
+    __slots__ = ('node',)
+
+    def __init__(self, node:ArrayGNode):
+        self.node = node
+
+    def __contains__(self, char):
+        return self.get(char) is not None
+
+    def __getitem__(self, char):
+        child = self.get(char)
+        if child is None:
+            raise KeyError(char)
+        return child
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, char, default=None):
+        node = self.node
+        if node.index == ArrayGNode.INDEX_EOW:
+            return default
+        if char == GNode.CHAR_EOW:
+            if node.gtree.is_eow(node.index):
+                return ArrayGNode(node.gtree, ArrayGNode.INDEX_EOW, GNode.CHAR_EOW)
+            return default
+        index = node.gtree.child_index(node.index, char)
+        return default if index < 0 else ArrayGNode(node.gtree, index, char)
+
+    def items(self):
+        return [(child.char, child) for child in self.values()]
+
+    def keys(self):
+        return [child.char for child in self.values()]
+
+    def values(self):
+        node = self.node
+        if node.index == ArrayGNode.INDEX_EOW:
+            return []
+        gtree = node.gtree
+        result = [ArrayGNode(gtree, index, char) for char, index in gtree.edges(node.index)]
+        if gtree.is_eow(node.index):
+            result.append(ArrayGNode(gtree, ArrayGNode.INDEX_EOW, GNode.CHAR_EOW))
+        return result
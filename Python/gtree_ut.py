@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 
+import os
+import tempfile
 import unittest
 import yaml
 
 
-from gtree import GTree
+from gtree import GNode, GTree
+from gtree_array import ArrayGTree
 
 
 class TestGTree(unittest.TestCase):
@@ -27,6 +30,123 @@ class TestGTree(unittest.TestCase):
         for word in words:
             assert(gtree.has_word(word))
 
+    def test_add_wordfile(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wordfile = os.path.join(tmp_dir, 'words')
+            with open(wordfile, 'w') as f:
+                f.write('net\nnot\n\nPet\npot \nco-op\nnets')
+            gtree = GTree()
+            gtree.add_wordfile(wordfile)
+        for word in ['net', 'not', 'pot', 'nets']:
+            assert(gtree.has_word(word))
+        for word in ['pet', 'co', 'op']:
+            assert(not gtree.has_word(word))
+
+    def test_minimize(self):
+        words = ['net', 'not', 'pet', 'pot', 'nets', 'pets']
+        gtree = GTree()
+        gtree.add_wordlist(words)
+        node_count_before, node_count_after = gtree.minimize()
+        assert(node_count_before == gtree.node_count() + node_count_before - node_count_after)
+        assert(node_count_after < node_count_before)
+        for word in words:
+            assert(gtree.has_word(word))
+        for word in ['nots', 'pe', 'ts', 'tep']:
+            assert(not gtree.has_word(word))
+        self.assertRaises(ValueError, gtree.add_word, 'pit')
+
+    def test_save_load(self):
+        words = ['net', 'not', 'pet', 'pot', 'a']
+        gtree = GTree()
+        gtree.add_wordlist(words)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test' + GTree.FILE_SUFFIX)
+            gtree.save(path)
+            loaded = GTree.load(path)
+            gtree.minimize()
+            gtree.save(path)
+            loaded_minimized = GTree.load(path)
+        assert(len(loaded) == len(gtree))
+        assert(not loaded.is_minimized)
+        assert(loaded_minimized.is_minimized)
+        assert(loaded_minimized.node_count() == gtree.node_count())
+        for word in words:
+            assert(loaded.has_word(word))
+        assert(not loaded.has_word('nop'))
+
+    def test_words(self):
+        words = ['net', 'not', 'pet', 'pot', 'nets', 'a', 'an']
+        gtree = GTree()
+        gtree.add_wordlist(words)
+        assert(sorted(GTree.words(gtree.root)) == sorted(words))
+        assert(gtree.has_words(['pot', 'NET', 'po', 'z']) == [True, True, False, False])
+        gtree.add_word('pots')  # After a lookup
+        assert(gtree.has_word('pots'))
+        gtree.minimize()
+        assert(sorted(GTree.words(gtree.root)) == sorted(words + ['pots']))
+
+    def test_wordfile_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wordfile = os.path.join(tmp_dir, 'words')
+            with open(wordfile, 'w') as f:
+                f.write('bet\nbat\nBad\n')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            gtree = GTree(wordfile, cache_dir=cache_dir)
+            cache_path = GTree.cache_path(cache_dir, GTree.file_digest(wordfile))
+            assert(os.path.exists(cache_path))
+
+            cached = GTree(wordfile, cache_dir=cache_dir)
+            assert(len(cached) == len(gtree))
+            assert(cached.has_word('bat'))
+            assert(not cached.has_word('bad'))
+
+    def test_wordfile_cache_add_word(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wordfile = os.path.join(tmp_dir, 'words')
+            with open(wordfile, 'w') as f:
+                f.write('at\nit\n')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            GTree(wordfile, cache_dir=cache_dir)
+            cached = GTree(wordfile, cache_dir=cache_dir)
+        # at & it share the subtree of t, so adding ate would also add ite.
+        assert(cached.is_minimized)
+        self.assertRaises(ValueError, cached.add_word, 'ate')
+        assert(not cached.has_word('ite'))
+
+
+class TestArrayGTree(unittest.TestCase):
+    def test_has_word(self):
+        words = ['net', 'not', 'pet', 'pot', 'a']
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            wordfile = os.path.join(tmp_dir, 'words')
+            with open(wordfile, 'w') as f:
+                f.write('\n'.join(words))
+            gtree = ArrayGTree(wordfile, cache_dir=tmp_dir)
+            for word in words:
+                assert(gtree.has_word(word))
+            assert(not gtree.has_word('ne'))
+            assert(not gtree.has_word('pit'))
+            assert(not gtree.has_word(''))
+            assert(gtree.has_words(['a', 'pet', 'ten']) == [True, True, False])
+            gtree.close()
+
+    def test_children(self):
+        gtree = GTree()
+        gtree.add_wordlist(['jay', 'jab'])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'test' + GTree.FILE_SUFFIX)
+            gtree.save(path)
+            agtree = ArrayGTree()
+            agtree.open(path)
+            node_a = agtree.root.children['j'].children[GNode.CHAR_REV].children['a']
+            assert(sorted(node_a.children.keys()) == ['b', 'y'])
+            node_y = node_a.children['y']
+            assert(GNode.CHAR_EOW in node_y.children)
+            assert(list(node_y.children[GNode.CHAR_EOW].children.values()) == [])
+            assert('q' not in node_a.children)
+            assert(sorted(agtree.root.children) == sorted(gtree.root.children))
+            agtree.close()
+
 
 if __name__ == '__main__':
     runner = unittest.main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+
+from array import array
+import hashlib
+import logging
+from math import comb
+import mmap
+import os
+import struct
+import sys
+import time
+
+
+from rack import Rack
+from typing import Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+
+# Values of rack leaves: the tiles left on a rack after a move, in points. A computer player
+# ranks moves by equity = points + value of the leave. (See EquityStrategy.)
+# The table covers every multiset of up to max_size tiles (default: rack_size), indexed by a
+# minimal perfect hash: the colex rank of the sorted slots of the leave (See Rack.char2slot.)
+# among all multisets of its size, plus the number of smaller multisets. So a lookup is a few
+# list indexes & adds, and only the values are stored. Multisets that cannot be drawn from the
+# bag (e.g. 'qq') have value 0.
+# Values are computed by value_heuristic when the table is built, and saved to a file that is
+# opened with mmap, so processes that open the same file share a single copy of it.
+class LeaveTable:
+    # Binary leave table file layout (little-endian):
+    #   header: FILE_MAGIC, version (u32), max_size (u32), slot_count (u32), digest (32 bytes)
+    #   values: f32[LeaveTable.size(max_size)]
+    # digest is the SHA-256 digest of the parameters of the values. (See LeaveTable.params_digest.)
+    FILE_MAGIC = b'SMVNLEAV'
+    FILE_VERSION = 1
+    FILE_SUFFIX = '.leaves'
+    HEADER_FORMAT = '<8sIII32s'
+    HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+    # Penalties of value_heuristic, in points
+    DUPLICATE_PENALTY = 3.0      # Per extra copy of a letter
+    BALANCE_PENALTY = 2.0        # Per vowel or consonant beyond one more than the other
+    VOWELS = 'aeiou'
+
+    # RANKS[k][slot]: the rank added by slot at position k of a sorted leave
+    MAX_SIZE = 32
+    RANKS = [[comb(slot + k, k + 1) for slot in range(Rack.SLOT_COUNT)] for k in range(MAX_SIZE)]
+
+    # Tables opened by LeaveTable.cached, by path
+    path2table = {}
+
+    def __init__(self, path:str=None):
+        self.file = None
+        self.mm = None
+        self.values = None
+        self.max_size = 0
+        self.digest = None
+        self.char_ranks:List[Dict[str, int]] = []
+        self.size_offsets:List[int] = []
+        if path:
+            self.open(path)
+
+    def __del__(self):
+        self.close()
+
+    def __len__(self):
+        return len(self.values) if self.values is not None else 0
+
+    def close(self):
+        # Views into the mmap must be released before the mmap itself can be closed.
+        if isinstance(self.values, memoryview):
+            self.values.release()
+        self.values = None
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def open(self, path:str):
+        self.close()
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.max_size, self.digest = LeaveTable.read_header(self.mm)
+        except ValueError as ex:
+            self.close()
+            raise ValueError(f'{path}: {ex}')
+        begin = LeaveTable.HEADER_SIZE
+        end = begin + 4 * LeaveTable.size(self.max_size)
+        if sys.byteorder == 'little':
+            view = memoryview(self.mm)
+            self.values = view[begin:end].cast('f')
+            view.release()
+        else:
+            self.values = LeaveTable.f32_array(self.mm[begin:end])
+        self.set_index(self.max_size)
+
+    def set_index(self, max_size:int):
+        self.max_size = max_size
+        self.char_ranks = [{Rack.slot2char(slot): rank for slot, rank in enumerate(LeaveTable.RANKS[k])}
+                           for k in range(max_size)]
+        self.size_offsets = [LeaveTable.size(n - 1) for n in range(max_size + 1)]
+
+    def index(self, leave:str)->int:
+        """Return the index of the value of leave, whose chars must be sorted as by str(Rack)."""
+        result = self.size_offsets[len(leave)]
+        char_ranks = self.char_ranks
+        for k, c in enumerate(leave):
+            result += char_ranks[k][c]
+        return result
+
+    def value(self, leave:str)->float:
+        """Return the value of leave, whose chars must be sorted as by str(Rack)."""
+        return self.values[self.index(leave)]
+
+    def rack_value(self, rack:Rack)->float:
+        return self.values[self.index(str(rack))]
+
+    @staticmethod
+    def move_leave(rack:Rack, move)->str:
+        """Return the (sorted) leave of rack after move."""
+        counts = rack.counts[:]
+        for pl in move.placed_letters:
+            counts[Rack.char2slot(Rack.tile(pl.char))] -= 1
+        return ''.join([Rack.slot2char(k) * n for k, n in enumerate(counts)])
+
+    @staticmethod
+    def size(max_size:int)->int:
+        """Return the number of multisets of up to max_size slots."""
+        return comb(Rack.SLOT_COUNT + max_size, max_size) if max_size >= 0 else 0
+
+    @staticmethod
+    def char2count(config)->Dict[str, int]:
+        """Return the number of tiles of each letter in the bag, per the counts2chars entry of config."""
+        count2chars = config[config['counts2chars']]
+        return {c: int(count) for count in count2chars for c in count2chars[count]}
+
+    @staticmethod
+    def char2value(config)->Dict[str, float]:
+        """Return the value of keeping each letter, per the leave_values entry of config."""
+        char2value = {}
+        if 'leave_values' in config:
+            value2chars = config[config['leave_values']]
+            for value in value2chars:
+                for c in value2chars[value]:
+                    char2value[c] = float(value)
+        return char2value
+
+    @staticmethod
+    def value_heuristic(counts:List[int], char2value:Dict[str, float])->float:
+        """Return the value of the leave with the given count of each slot: the sum of its letters'
+        values, less penalties for duplicate letters and for too many vowels or consonants."""
+        value = 0.0
+        vowel_count = consonant_count = 0
+        for slot, n in enumerate(counts):
+            if n == 0:
+                continue
+            char = Rack.slot2char(slot)
+            value += n * char2value.get(char, 0.0)
+            if slot == Rack.SLOT_BLANK:
+                continue
+            value -= LeaveTable.DUPLICATE_PENALTY * (n - 1)
+            if char in LeaveTable.VOWELS:
+                vowel_count += n
+            else:
+                consonant_count += n
+        return value - LeaveTable.BALANCE_PENALTY * max(0, abs(vowel_count - consonant_count) - 1)
+
+    @staticmethod
+    def params_digest(char2count:Dict[str, int], char2value:Dict[str, float], max_size:int)->bytes:
+        params = (sorted(char2count.items()), sorted(char2value.items()), max_size
+                  , LeaveTable.DUPLICATE_PENALTY, LeaveTable.BALANCE_PENALTY, LeaveTable.VOWELS)
+        return hashlib.sha256(repr(params).encode('utf-8')).digest()
+
+    @staticmethod
+    def build_values(char2count:Dict[str, int], char2value:Dict[str, float], max_size:int)->array:
+        """Return the values of all leaves of up to max_size tiles drawn from a bag of char2count."""
+        start = time.perf_counter()
+        values = array('f', bytes(4 * LeaveTable.size(max_size)))
+        slot_limits = [char2count.get(Rack.slot2char(slot), 0) for slot in range(Rack.SLOT_COUNT)]
+        ranks = LeaveTable.RANKS
+        size_offsets = [LeaveTable.size(n - 1) for n in range(max_size + 1)]
+        # (Value, vowel count, consonant count) of n tiles of each slot, as summed by value_heuristic
+        slot_terms = []
+        for slot in range(Rack.SLOT_COUNT):
+            char = Rack.slot2char(slot)
+            terms = [(0.0, 0, 0)]
+            for n in range(1, slot_limits[slot] + 1):
+                value = n * char2value.get(char, 0.0)
+                if slot == Rack.SLOT_BLANK:
+                    terms.append((value, 0, 0))
+                else:
+                    value -= LeaveTable.DUPLICATE_PENALTY * (n - 1)
+                    terms.append((value, n, 0) if char in LeaveTable.VOWELS else (value, 0, n))
+            slot_terms.append(terms)
+        leave_count = 0
+
+        # Choose the count of each slot in turn, summing the terms of value_heuristic as we go.
+        # rank is the colex rank of the slots chosen so far.
+        def visit(slot:int, size:int, rank:int, value:float, vowel_count:int, consonant_count:int):
+            nonlocal leave_count
+            if slot == Rack.SLOT_COUNT:
+                values[size_offsets[size] + rank] = (
+                        value - LeaveTable.BALANCE_PENALTY * max(0, abs(vowel_count - consonant_count) - 1))
+                leave_count += 1
+                return
+            visit(slot + 1, size, rank, value, vowel_count, consonant_count)
+            terms = slot_terms[slot]
+            for n in range(1, min(slot_limits[slot], max_size - size) + 1):
+                rank += ranks[size + n - 1][slot]
+                term_value, term_vowels, term_consonants = terms[n]
+                visit(slot + 1, size + n, rank, value + term_value, vowel_count + term_vowels
+                      , consonant_count + term_consonants)
+
+        visit(0, 0, 0, 0.0, 0, 0)
+        logger.info(f'LeaveTable.build_values: {leave_count} leaves in {time.perf_counter() - start:.2f} sec')
+        return values
+
+    @staticmethod
+    def build(config, path:str, max_size:int=None):
+        """Compute the values of the leaves of config's bag, and save them to path."""
+        max_size = max_size if max_size is not None else int(config['rack_size'])
+        if max_size > LeaveTable.MAX_SIZE:
+            raise ValueError(f'Leave tables are limited to {LeaveTable.MAX_SIZE} tiles')
+        char2count = LeaveTable.char2count(config)
+        char2value = LeaveTable.char2value(config)
+        values = LeaveTable.build_values(char2count, char2value, max_size)
+        if sys.byteorder != 'little':
+            values.byteswap()
+        header = struct.pack(LeaveTable.HEADER_FORMAT, LeaveTable.FILE_MAGIC, LeaveTable.FILE_VERSION
+                             , max_size, Rack.SLOT_COUNT, LeaveTable.params_digest(char2count, char2value, max_size))
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(values.tobytes())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def cached(config, cache_dir:str=None, max_size:int=None)->'LeaveTable':
+        """Return the leave table for config from cache_dir (default: dictionary_cache_dir in config),
+        building it first if needed. Tables are opened once per process."""
+        max_size = max_size if max_size is not None else int(config['rack_size'])
+        cache_dir = cache_dir if cache_dir else config['dictionary_cache_dir']
+        digest = LeaveTable.params_digest(LeaveTable.char2count(config), LeaveTable.char2value(config), max_size)
+        path = os.path.join(cache_dir, digest.hex() + LeaveTable.FILE_SUFFIX)
+        if path not in LeaveTable.path2table:
+            if not os.path.exists(path):
+                os.makedirs(cache_dir, exist_ok=True)
+                LeaveTable.build(config, path, max_size)
+            LeaveTable.path2table[path] = LeaveTable(path)
+        return LeaveTable.path2table[path]
+
+    @staticmethod
+    def read_header(data):
+        """Return (max_size, digest) for a leave table file."""
+        if len(data) < LeaveTable.HEADER_SIZE:
+            raise ValueError('Leave table file is truncated')
+        magic, version, max_size, slot_count, digest = struct.unpack_from(LeaveTable.HEADER_FORMAT, data, 0)
+        if magic != LeaveTable.FILE_MAGIC:
+            raise ValueError('Not a leave table file')
+        if version != LeaveTable.FILE_VERSION:
+            raise ValueError(f'Unsupported leave table file version: {version}')
+        if slot_count != Rack.SLOT_COUNT:
+            raise ValueError(f'Leave table file has {slot_count} slots, not {Rack.SLOT_COUNT}')
+        if len(data) < LeaveTable.HEADER_SIZE + 4 * LeaveTable.size(max_size):
+            raise ValueError('Leave table file is truncated')
+        return max_size, digest
+
+    @staticmethod
+    def f32_array(data)->array:
+        result = array('f')
+        assert(result.itemsize == 4)
+        result.frombytes(data)
+        if sys.byteorder != 'little':
+            result.byteswap()
+        return result
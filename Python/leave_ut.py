@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import itertools
+import os
+import tempfile
+import unittest
+import yaml
+
+
+from leave import LeaveTable
+from rack import Rack
+
+
+class TestLeaveTable(unittest.TestCase):
+    def test_index(self):
+        # The index is a minimal perfect hash of the multisets of up to max_size slots.
+        table = LeaveTable()
+        table.set_index(3)
+        chars = [Rack.slot2char(slot) for slot in range(Rack.SLOT_COUNT)]
+        indexes = set()
+        for size in range(4):
+            for leave in itertools.combinations_with_replacement(chars, size):
+                indexes.add(table.index(''.join(leave)))
+        assert(indexes == set(range(LeaveTable.size(3))))
+
+    def test_build(self):
+        with open('config.yml', 'r') as stream:
+            config = yaml.safe_load(stream)
+        char2value = LeaveTable.char2value(config)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table = LeaveTable.cached(config, tmp_dir, max_size=3)
+            assert(table.max_size == 3 and len(table) == LeaveTable.size(3))
+            assert(LeaveTable.cached(config, tmp_dir, max_size=3) is table)
+            assert(len(os.listdir(tmp_dir)) == 1)
+            for leave in ['', 's', 'ers', 'eee', 'iou', 'qu_', '__']:
+                rack = Rack(leave)
+                assert(str(rack) == ''.join(sorted(leave, key=Rack.char2slot)))
+                assert(table.rack_value(rack) == LeaveTable.value_heuristic(rack.counts, char2value))
+            assert(table.value('s') > table.value('') > table.value('q'))
+            assert(table.value('er') > table.value('ee'))
+            assert(table.value('qq') == 0.0)  # Not in the bag
+            table.close()
+            LeaveTable.path2table.clear()
+
+    def test_read_header(self):
+        with self.assertRaises(ValueError):
+            LeaveTable.read_header(b'SMVNGDAG' + bytes(LeaveTable.HEADER_SIZE))
+
+
+if __name__ == '__main__':
+    unittest.main()
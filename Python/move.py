@@ -10,15 +10,17 @@ from util import Cell, Util
 
 class Move:
     def __init__(self, placed_letters:List['PlacedLetter']
-                    , primary_word:'PlacedWord', secondary_words=None):
+                    , primary_word:'PlacedWord', secondary_words=None, points:int=None):
         self.placed_letters = placed_letters
         self.primary_word = primary_word
         self.secondary_words = secondary_words if secondary_words else []
+        self.points = points  # Set when scored during search
 
     def __deepcopy__(self, memo=None):
        move = Move([deepcopy(pl) for pl in self.placed_letters]
                     , deepcopy(self.primary_word)
-                    , [deepcopy(sw) for sw in deepcopy(secondary_words)]
+                    , [deepcopy(sw) for sw in self.secondary_words]
+                    , self.points
                     )
        return move
 
@@ -47,11 +49,12 @@ class Move:
 # Note: The use here of lowercase and uppercase does not work for most languages.
 class PlacedLetter:
     def __init__(self, cell:Cell, char:str, is_blank:bool=False):
-        self.char = upper(char) if is_blank else char.lower()
+        # Blanks are represented by uppercase chars.
+        self.char = char.upper() if (is_blank or char.isupper()) else char
         self.cell = cell
 
     def __deepcopy__(self, memo=None):
-        return PlacedLetter(self.char, self.cell)
+        return PlacedLetter(self.cell, self.char, self.is_blank())
 
     def __eq__(self, other):
         return self.char == other.char and self.cell == other.cell
@@ -60,7 +63,7 @@ class PlacedLetter:
         return f"'{self.char}'@{Util.cell2str(self.cell)}"
 
     def is_blank(self):
-        return isupper(self.char)
+        return self.char.isupper()
 
     @property
     def x(self):
@@ -81,6 +84,8 @@ class PlacedWord:
         return PlacedWord(self.cell_begin, self.cell_end, self.word)
 
     def __eq__(self, other):
+        if not isinstance(other, PlacedWord):
+            return NotImplemented
         return (self.cell_begin == other.cell_begin
                 and self.cell_end == other.cell_end
                 and self.word == other.word
@@ -104,14 +109,9 @@ class PlacedWord:
             ValueError('Internal error in Board.points_word')
 
     def updated(self, cursor, bdir, char):
-        next_cell_begin = (
-                self.cell_begin if BoardDirection.is_forward(bdir)
-                else Util.add_cell_bdir(self.cell_begin, bdir)
-                )
-        next_cell_end = (
-                self.cell_end if not BoardDirection.is_forward(bdir)
-                else Util.add_cell_bdir(self.cell_end, bdir)
-                )
+        """Return the word extended by char, which is at cursor. (The word can be empty, with cursor at both ends.)"""
+        next_cell_begin = self.cell_begin if BoardDirection.is_forward(bdir) else cursor
+        next_cell_end = cursor if BoardDirection.is_forward(bdir) else self.cell_end
         next_word = Util.updated_str_with_char(self.word, bdir, char)
 
         return PlacedWord(next_cell_begin, next_cell_end, next_word)
@@ -6,7 +6,9 @@ from enum import auto, Enum
 from bag import Bag
 from board_direction import BoardDirection
 from move import Move, PlacedLetter, PlacedWord
+from rack import Rack
 from search import Search
+from strategy import BestScoreStrategy
 from turn import Turn, TurnType
 from util import Cell, Util
 
@@ -23,17 +25,26 @@ class Command:
 # TODO: Replace both turn_get() and turn_report() with reference to GameCommunication static methods
 #       (I.e., add a layer of indirection to support both Human and Computer play)
 class Player:
-    def __init__(self, game, player_id, name=None):
+    def __init__(self, game, player_id, name=None, player_type=None, strategy=None):
         self.game = game
         self.player_id = player_id
-        self.name = self.get_name_from_user() if name is None else name
-        self.rack = ''
-        self.player_type = PlayerType.HUMAN
+        self.player_type = player_type if player_type else PlayerType.HUMAN
+        if name is None:
+            name = self.get_name_from_user() if self.player_type == PlayerType.HUMAN else f'Computer #{player_id}'
+        self.name = name
+        self.rack = Rack()
+        self.strategy = strategy  # How a computer player chooses its turns (See strategy.py.)
+        if self.strategy is None and self.player_type == PlayerType.COMPUTER:
+            self.strategy = BestScoreStrategy()
 
         # self.connection  # IP addr & port, etc. 
         self.color = None  # Set by game in GUI mode
         self.score = 0
 
+        # Time spent searching for moves, by computer players
+        self.search_count = 0
+        self.search_seconds = 0.0
+
     def get_name_from_user(self):
         return input(f'Player #{self.player_id} name: ')
 
@@ -49,6 +60,8 @@ class Player:
     # TODO: In a distributed system with a central server, the Turn object should be created at the server, not here.
     # TODO: Use argparse
     def turn_get(self):
+        if self.player_type == PlayerType.COMPUTER:
+            return self.strategy.turn_get(self)
         is_cmd_valid = False
         while not is_cmd_valid:
             entry = input(f'Enter command for player #{self.player_id}: ')
@@ -90,13 +103,13 @@ class Player:
 
                 do_reject_move = False
 
-                hooks_played = set(self.game.board.hooks()).intersection([pl.cell for pl in placed_letters])
+                hooks_played = [pl.cell for pl in placed_letters if self.game.board.is_hook(pl.cell)]
                 if len(hooks_played) == 0:
                     print(f'Invalid move: Word must cross a starting cell or be adjacent to a previously played tile')
                     do_reject_move = True
 
                 normalized_placed_chars = ''.join(map(lambda c: '_' if c.isupper() else c, placed_chars))
-                if not Util.is_subset(normalized_placed_chars, self.rack):
+                if not self.rack.is_superset(normalized_placed_chars):
                     print(f'Invalid move: Letters placed ({placed_chars}) are not present in the rack')
                     do_reject_move = True
 
@@ -114,16 +127,23 @@ class Player:
                     print(f'Invalid move: Cell after last character is not empty')
                     do_reject_move = True
 
-                search = Search(self.game.gtree, self.game.board)
-                placed_word = PlacedWord(cell_begin, cell_end, w)
-                secondary_words = search.get_secondary_words(placed_letters , placed_word, self.rack, False)
-                for sw in secondary_words:
-                    if not self.game.gtree.has_word(sw):
-                        print(f'Invalid move: Secondary word found ({sw} is not in the game dictionary')
+                # Each placed letter with letters on board next to it, across the word, forms a secondary word.
+                cross_words = []
+                for pl in placed_letters:
+                    prefix, suffix = self.game.board.cross_words(pl.cell, back)
+                    if prefix or suffix:
+                        cross_words.append(prefix + pl.char + suffix)
+                for sw, is_valid in zip(cross_words, self.game.gtree.has_words(cross_words)):
+                    if not is_valid:
+                        print(f'Invalid move: Secondary word found ({sw} is not in the game dictionary)')
                         do_reject_move = True
                 if do_reject_move:
                     continue
 
+                search = Search(self.game.gtree, self.game.board)
+                placed_word = PlacedWord(cell_begin, cell_end, w)
+                secondary_words = search.get_secondary_words(placed_letters , placed_word, self.rack, False)
+
                 cell_begin = Cell(beg_x, beg_y)
                 if cmd == 'across':
                     cell_end = Cell(beg_x + len(w) - 1, beg_y)
@@ -148,7 +168,7 @@ class Player:
                     continue
 
                 discarded_letters = ''.join(args[1:])
-                if not Util.is_subset(discarded_letters, self.rack):
+                if not self.rack.is_superset(discarded_letters):
                     print(f'Invalid move: You can only discard letters that are in your rack')
                     continue
                 elif len(self.game.bag) < len(discarded_letters):
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+import yaml
+
+
+from board import Board, BoardLayout
+from game import Game
+from gtree import GTree
+from player import PlayerType
+from turn import TurnType
+
+
+class TestPlayer(unittest.TestCase):
+    def test_turn_get_cross_words(self):
+        with open('config.yml', 'r') as stream:
+            config = yaml.safe_load(stream)
+        config['test_rack1'] = 'at'
+        layout = BoardLayout(['.......'] * 7)
+        rows = ['.......', '.......', '.......', '..cat..', '.......', '.......', '.......']
+        # at, across under the c & a of cat, forms ca & at down.
+        for words, turn_type in [(['at', 'ca', 'cat'], TurnType.PLACE), (['at', 'cat'], TurnType.PASS)]:
+            gtree = GTree()
+            gtree.add_wordlist(words)
+            game = Game(config, gtree, Board(config, layout=layout, rows=rows)
+                        , player_types=[PlayerType.HUMAN] * 2, test_name1='auto', test_name2='auto', test_rack1='auto')
+            with patch('builtins.input', side_effect=['across at 2 4', 'pass']), patch('builtins.print'):
+                turn = game.pid2player[1].turn_get()
+            assert(turn.turn_type == turn_type)
+            if turn_type == TurnType.PLACE:
+                assert(sorted([sw.word for sw in turn.move.secondary_words]) == ['at', 'ca'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+
+from bag import Bag
+from typing import Iterable
+
+
+# The letters in a player's rack, stored as counts: one slot for each letter a..z, plus one for blanks.
+# A bitmask of the slots with nonzero counts gives O(1) membership tests, e.g. during search.
+# Note: As elsewhere, placed blanks are represented by uppercase chars. (See PlacedLetter.)
+class Rack:
+    SLOT_COUNT = 27
+    SLOT_BLANK = 26
+    MASK_BLANK = 1 << SLOT_BLANK
+    MASK_LETTERS = MASK_BLANK - 1
+
+    __slots__ = ('counts', 'mask', 'size')
+
+    def __init__(self, chars:str=''):
+        self.counts = [0] * Rack.SLOT_COUNT
+        self.mask = 0
+        self.size = 0
+        self.add_chars(chars)
+
+    def __contains__(self, char):
+        return self.counts[Rack.char2slot(char)] > 0
+
+    def __deepcopy__(self, memo=None):
+        rack = Rack()
+        rack.counts = self.counts[:]
+        rack.mask = self.mask
+        rack.size = self.size
+        return rack
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            other = Rack(other)
+        return isinstance(other, Rack) and self.counts == other.counts
+
+    def __hash__(self):
+        return hash(tuple(self.counts))
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return ''.join([Rack.slot2char(k) * n for k, n in enumerate(self.counts)])
+
+    @staticmethod
+    def char2slot(char:str)->int:
+        if char == Bag.CHAR_BLANK:
+            return Rack.SLOT_BLANK
+        return ord(char) - ord('a')
+
+    @staticmethod
+    def slot2char(slot:int)->str:
+        return Bag.CHAR_BLANK if slot == Rack.SLOT_BLANK else chr(ord('a') + slot)
+
+    @staticmethod
+    def tile(char:str)->str:
+        """Return the rack char of the tile that places char: the blank for uppercase chars."""
+        return Bag.CHAR_BLANK if char.isupper() else char
+
+    def add(self, char:str):
+        slot = Rack.char2slot(char)
+        self.counts[slot] += 1
+        self.mask |= 1 << slot
+        self.size += 1
+
+    def add_chars(self, chars:Iterable[str]):
+        for c in chars:
+            self.add(c)
+
+    def count(self, char:str)->int:
+        return self.counts[Rack.char2slot(char)]
+
+    def has_blank(self)->bool:
+        return self.counts[Rack.SLOT_BLANK] > 0
+
+    def is_superset(self, chars:Iterable[str])->bool:
+        """Check whether every char (with multiplicity) can be taken from the rack."""
+        counts = self.counts[:]
+        for c in chars:
+            slot = Rack.char2slot(c)
+            if counts[slot] == 0:
+                return False
+            counts[slot] -= 1
+        return True
+
+    def remove(self, char:str):
+        slot = Rack.char2slot(char)
+        count = self.counts[slot]
+        if count == 0:
+            raise ValueError(f'Letter not in rack: {char}')
+        self.counts[slot] = count - 1
+        if count == 1:
+            self.mask &= ~(1 << slot)
+        self.size -= 1
+
+    def remove_chars(self, chars:Iterable[str]):
+        for c in chars:
+            self.remove(c)
+
+    def remove_tiles(self, placed_chars:Iterable[str]):
+        """Remove the tiles used to place the given chars. (Uppercase chars are placed using blanks.)"""
+        for c in placed_chars:
+            self.remove(Rack.tile(c))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import unittest
+
+
+from bag import Bag
+from rack import Rack
+
+
+class TestRack(unittest.TestCase):
+    def test_add_remove(self):
+        rack = Rack('abca_')
+        assert(len(rack) == 5)
+        assert(str(rack) == 'aabc_')
+        assert(rack.count('a') == 2 and 'c' in rack and 'd' not in rack and rack.has_blank())
+        rack.remove('a')
+        rack.remove('c')
+        assert('a' in rack and 'c' not in rack)
+        assert(rack.mask == Rack.MASK_BLANK | (1 << Rack.char2slot('a')) | (1 << Rack.char2slot('b')))
+        self.assertRaises(ValueError, rack.remove, 'c')
+        rack.add_chars('cc')
+        assert(rack == 'abcc_')
+
+    def test_is_superset(self):
+        rack = Rack('abbc')
+        assert(rack.is_superset('b'))
+        assert(rack.is_superset('abbc'))
+        assert(not rack.is_superset('abbbc'))
+        assert(not rack.is_superset(Bag.CHAR_BLANK))
+
+    def test_remove_tiles(self):
+        rack = Rack('ab_')
+        rack.remove_tiles('aZ')
+        assert(rack == 'b')
+
+
+if __name__ == '__main__':
+    runner = unittest.main()
@@ -1,33 +1,612 @@
 #!/usr/bin/env python
 
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+import heapq
+import logging
+import multiprocessing
+import time
 
 from bag import Bag
 from board import Board
 from board_direction import BoardDirection
 from move import Move, PlacedLetter, PlacedWord
+from rack import Rack
+from search_cache import SearchCache
+from search_stats import SearchStats
+from search_trace import SearchTrace
 from gtree import GNode
 from typing import Iterable, List
 from util import Cell, Util
 
 
-# TODO: Add copying to the appropriate places to avoid aliasing
+logger = logging.getLogger(__name__)
+
+# The Search used by worker processes of Search.find_moves_parallel, inherited via fork.
+_fork_search = None
+
+
+# Move generation walks the GADDAG from each hook, first backward (LEFT or UP) from the hook, then,
+# after CHAR_REV, forward from the cell after the hook. (See the GADDAG Wikipedia page.)
+#
+# Search.find_moves uses a backtracking generator: a single mutable state (rack counts, stacks of
+# placed letters and word chars) is updated before each recursive step and restored after it, so the
+# traversal itself allocates almost nothing. Move objects are only built for accepted words.
+#
+# Each distinct move is generated exactly once:
+#   * A move is generated from the first of its placed letters that lies on a hook, reading along
+#     the primary word: letters from the rack are never placed on another hook before CHAR_REV.
+#   * A move that places a single letter is generated with the direction of its longest word:
+#     across if it forms an across word, else down. (One-letter primary words are not moves.)
+# duplicates_avoided counts the search paths cut short by these rules.
+#
+#
+# Moves are scored as they are built: the search keeps running totals of the primary word's letter
+# points and word multiplier, and of the points of the secondary words, whose letters already on
+# board are summed up in the board's cross-scores. Blanks score 0 points; word multipliers still apply.
+# Every Move found holds its points, so moves need not be rescored with Board.move2points.
+# Search.best_moves uses these totals, plus an upper bound on what the unplaced tiles could add,
+# to skip branches that cannot beat the k-th best move found so far. (See score_bound.)
+#
+# A blank is only placed as a letter when no tile of that letter is left in the rack, so a blank does not
+# double the branches of every letter in the rack. Moves that place a blank where a tile of the same letter
+# could go instead are left out: they score no more, and keep a tile rather than the blank. Since real tiles
+# are placed first, a blank may end up on a cell where its letter would score more than on the cell of a real
+# tile; once a word is complete, the tiles of each such letter are moved to the cells where they score the most.
+# Until then, such a blank is scored as a tile, so the running totals (and score bounds) are never below the
+# points of the best assignment. (See assign_blanks.) A Search created with enumerate_blanks tries the blank
+# for each letter, alongside the real tile, so every designation of the blanks is found.
+#
+# A Search created with a SearchStats counts pruned branches and times the phases of its searches,
+# using instrumented versions of gen_node, gen_children, and build_move, which are bound to that Search
+# only. So searches without stats run the plain methods, with no extra work per node.
+#
+# Debug logging is guarded by is_debug (and by isEnabledFor in SearchState), so that nothing is
+# formatted unless DEBUG is enabled for this module. Each node expanded by gen_node can also be
+# written to a structured trace. (See SearchTrace.)
+#
+# find_moves_hook_bdir & find_moves_ss are the original SearchState-copying implementation,
+# which is kept as a reference for tests and benchmarks. (See search_bench.py.) Like a Search with
+# enumerate_blanks, it tries every designation of blanks.
 class Search:
-    def __init__(self, gtree, board):
+    # find_moves searches serially when there are fewer (hook, direction) pairs than this.
+    PARALLEL_MIN_ITEMS = 16
+    # Work items are dealt out in this many chunks per worker, to even out the load.
+    PARALLEL_CHUNKS_PER_WORKER = 4
+
+    def __init__(self, gtree, board, cache:SearchCache=None, stats:SearchStats=None, enumerate_blanks=False):
         self.gtree = gtree
         self.board = board
+        self.cache = cache  # Results of earlier searches, possibly shared with other Search objects
+        self.stats = stats
+        self.enumerate_blanks = enumerate_blanks
+        if stats is not None:
+            self.gen_node = self.gen_node_stats
+            self.gen_children = self.gen_children_stats
+            self.build_move = self.build_move_stats
+        if board.cross_gtree is not gtree:
+            start = time.perf_counter()
+            board.update_cross_checks(gtree)
+            if stats is not None:
+                stats.add_seconds('cross_checks', time.perf_counter() - start)
 
-    def find_moves(self, rack)->List[Move]:
-        self.board.game.logger.debug(f'Search.find_moves: rack={rack}, board={board}')
-        result = []
-        for hook in self.board.hooks():
-            for bdir in [BoardDirection.LEFT, BoardDirection.UP]:
-                found_hook_bdir = self.find_moves_hook_bdir(hook, bdir, rack)
-                result.extend(found_hook_bdir)
+        config = board.config if board.config else {}
+        self.char2points = board.char2points
+        self.bingo_points = int(config['bingo_points']) if 'bingo_points' in config else 0
+        self.rack_size = int(config['rack_size']) if 'rack_size' in config else None
+
+        # Backtracking state, valid during gen_moves_hook_bdir
+        self.hook = None
+        self.bdir = None
+        self.rack = None
+        self.placed_cells = []   # Cells of letters placed from the rack, in order of placement
+        self.placed_chars = []   # Chars of letters placed from the rack (uppercase for blanks)
+        self.word_chars = []     # Chars of the primary word: backward from the hook, then forward after it
+        self.backward_len = 0    # Number of word_chars placed before CHAR_REV
+        self.blank_count = 0     # Number of blanks in the rack before any letters are placed
+        self.rack_mask = 0       # Rack.mask of the rack before any letters are placed
+        self.moves = None
+        self.hook_cells = None
+        self.nodes_visited = 0
+        self.duplicates_avoided = 0
+        self.is_debug = logger.isEnabledFor(logging.DEBUG)
+        self.is_tracing = SearchTrace.is_enabled()
+
+        # Running score totals, valid during gen_moves_hook_bdir
+        self.main_points = 0      # Letter points of the primary word, with letter multipliers
+        self.main_multiplier = 1  # Product of the word multipliers of the cells placed on
+        self.cross_points = 0     # Points of the secondary words
+
+        # Best-move state, used by best_moves
+        self.best_count = None    # k, or None to collect all moves
+        self.best_heap = None     # Min-heap of (points, -sequence number, Move)
+        self.best_seq = 0
+        self.bound_tables = None  # See init_score_bound
+        self.branches_pruned = 0
+
+    def best_moves(self, rack, k=1)->List[Move]:
+        """Return the k highest-scoring moves (fewer if there are fewer moves), best first.
+        Ties are broken in favor of the move found first."""
+        if self.is_debug:
+            logger.debug('Search.best_moves: rack=%s, k=%s', rack, k)
+        if self.cache is None:
+            return self.gen_best_moves(rack, k)
+        key = SearchCache.key(self.board, rack, k, self.enumerate_blanks)
+        moves = self.cache.get(key)
+        if moves is None:
+            moves = self.gen_best_moves(rack, k)
+            self.cache.put(key, moves)
+        return moves
+
+    def gen_best_moves(self, rack, k)->List[Move]:
+        self.best_count = k
+        self.best_heap = []
+        self.best_seq = 0
+        try:
+            start = time.perf_counter()
+            hooks = self.board.hooks()
+            hook_cells = set(hooks)
+            hooks_end = time.perf_counter()
+            # Search the most promising hooks first, so that weaker ones can be pruned as a whole.
+            hook_bounds = []
+            for hook in hooks:
+                for bdir in [BoardDirection.LEFT, BoardDirection.UP]:
+                    hook_bounds.append((self.hook_score_bound(hook, bdir, rack), hook, bdir))
+            hook_bounds.sort(key=lambda hb: -hb[0])
+            bounds_end = time.perf_counter()
+            mark = self.stats_mark() if self.stats is not None else None
+            for bound, hook, bdir in hook_bounds:
+                if len(self.best_heap) == self.best_count and bound <= self.best_heap[0][0]:
+                    self.branches_pruned += 1
+                    continue
+                self.gen_moves_hook_bdir(hook, bdir, rack, hook_cells)
+            if mark is not None:
+                self.add_stats(mark, hooks_end - start, time.perf_counter() - bounds_end, bounds_end - hooks_end)
+            return [move for _, _, move in sorted(self.best_heap, reverse=True)]
+        finally:
+            self.best_count = None
+            self.best_heap = None
+
+    def find_moves(self, rack, workers=1)->List[Move]:
+        """Find all moves. With workers > 1, hooks are searched in a process pool, if that is worthwhile.
+        Either way, moves are returned in the same order."""
+        if self.is_debug:
+            logger.debug('Search.find_moves: rack=%s, board=%s', rack, self.board)
+        if self.cache is None:
+            return self.gen_moves(rack, workers)
+        key = SearchCache.key(self.board, rack, enumerate_blanks=self.enumerate_blanks)
+        moves = self.cache.get(key)
+        if moves is None:
+            moves = self.gen_moves(rack, workers)
+            self.cache.put(key, moves)
+        return moves
+
+    def gen_moves(self, rack, workers=1)->List[Move]:
+        start = time.perf_counter()
+        hooks = self.board.hooks()
+        items = [(hook, bdir) for hook in hooks for bdir in [BoardDirection.LEFT, BoardDirection.UP]]
+        hook_cells = set(hooks)
+        hooks_end = time.perf_counter()
+        mark = self.stats_mark() if self.stats is not None else None
+        if workers > 1 and len(items) >= Search.PARALLEL_MIN_ITEMS \
+                and 'fork' in multiprocessing.get_all_start_methods():
+            result = self.find_moves_parallel(rack, items, workers)
+        else:
+            if workers > 1 and len(items) >= Search.PARALLEL_MIN_ITEMS:
+                logger.info('Search.find_moves: fork is not available, so searching serially')
+            result = []
+            for hook, bdir in items:
+                result.extend(self.gen_moves_hook_bdir(hook, bdir, rack, hook_cells))
+        if mark is not None:
+            self.add_stats(mark, hooks_end - start, time.perf_counter() - hooks_end)
         return result
 
+    def stats_mark(self):
+        """Return the counters & time of building moves so far, for add_stats."""
+        return (self.nodes_visited, self.duplicates_avoided, self.branches_pruned
+                , self.stats.phase2seconds['build_moves'])
+
+    def add_stats(self, mark, hooks_seconds:float, traversal_seconds:float, bounds_seconds:float=0.0):
+        """Add the counters & timings of a search to the stats. mark is the stats_mark from before the
+        traversal, whose time includes that of building moves."""
+        nodes_visited, duplicates_avoided, branches_pruned, build_seconds = mark
+        stats = self.stats
+        stats.nodes_visited += self.nodes_visited - nodes_visited
+        stats.duplicates_avoided += self.duplicates_avoided - duplicates_avoided
+        stats.pruned_by_bound += self.branches_pruned - branches_pruned
+        stats.add_seconds('hooks', hooks_seconds)
+        stats.add_seconds('bounds', bounds_seconds)
+        stats.add_seconds('traversal', traversal_seconds - (stats.phase2seconds['build_moves'] - build_seconds))
+
+    def find_moves_parallel(self, rack, items, workers)->List[Move]:
+        """Search the given (hook, bdir) items in forked worker processes, which share the GADDAG
+        (and board) with this one, copy-on-write. Results are merged in the order of items."""
+        global _fork_search
+        chunk_count = min(len(items), workers * Search.PARALLEL_CHUNKS_PER_WORKER)
+        chunks = [list(range(k, len(items), chunk_count)) for k in range(chunk_count)]
+        item_moves = [None] * len(items)
+        _fork_search = self
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+                futures = [executor.submit(gen_moves_items, [items[k] for k in chunk], str(rack)) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    chunk_moves, nodes_visited, duplicates_avoided, stats = future.result()
+                    for k, moves in zip(chunk, chunk_moves):
+                        item_moves[k] = moves
+                    self.nodes_visited += nodes_visited
+                    self.duplicates_avoided += duplicates_avoided
+                    if stats is not None:
+                        self.stats.merge(stats, is_timed=False)  # Traversal is timed by the caller.
+        finally:
+            _fork_search = None
+        return [move for moves in item_moves for move in moves]
+
+    def gen_moves_hook_bdir(self, hook, bdir, rack, hook_cells=None)->List[Move]:
+        """Find the moves that place a letter from the rack on hook, and form a primary word along bdir.
+        Moves that place letters on any of hook_cells before hook are left to those hooks. (See above.)"""
+        self.hook_cells = hook_cells if hook_cells is not None else set(self.board.hooks())
+        self.hook = hook
+        self.bdir = bdir
+        self.rack = deepcopy(rack) if isinstance(rack, Rack) else Rack(rack)
+        self.blank_count = self.rack.counts[Rack.SLOT_BLANK]
+        self.rack_mask = self.rack.mask
+        self.backward_len = 0
+        self.main_points = 0
+        self.main_multiplier = 1
+        self.cross_points = 0
+        self.moves = []
+        if self.best_count is not None:
+            self.init_score_bound()
+        dx, dy = bdir.value
+        self.gen_children(self.gtree.root, hook.x, hook.y, dx, dy, False)
+        moves = self.moves
+        self.moves = None
+        return moves
+
+    def gen_node(self, node, x, y, dx, dy, is_forward):
+        """Apply node to cell (x, y), then continue with its children.
+        (dx, dy) is the direction of travel; is_forward is True once CHAR_REV has been passed."""
+        self.nodes_visited += 1
+        if self.is_tracing:
+            SearchTrace.logger.debug(SearchTrace.FORMAT, self.hook.x, self.hook.y, self.bdir.name, x, y, node.char
+                                     , len(self.word_chars), len(self.placed_cells)
+                                     , self.main_points * self.main_multiplier + self.cross_points)
+        board = self.board
+        char = node.char
+        is_on_board = 0 <= x < board.width and 0 <= y < board.height
+        letter = board.letters[y][x] if is_on_board else Board.CHAR_EMPTY
+
+        if char == GNode.CHAR_EOW:
+            # The word must not continue onto letters on board, on either end.
+            if letter != Board.CHAR_EMPTY:
+                return
+            if not is_forward:
+                after_x, after_y = self.hook.x - dx, self.hook.y - dy
+                if (0 <= after_x < board.width and 0 <= after_y < board.height
+                        and board.letters[after_y][after_x] != Board.CHAR_EMPTY):
+                    return
+            if len(self.placed_cells) == 1:
+                if len(self.word_chars) == 1:
+                    return
+                if self.bdir == BoardDirection.UP and board.cross_score(self.hook, self.bdir) is not None:
+                    self.duplicates_avoided += 1  # Generated with BoardDirection.LEFT
+                    return
+            points = self.main_points * self.main_multiplier + self.cross_points
+            if self.rack_size is not None and len(self.placed_cells) == self.rack_size:
+                points += self.bingo_points
+            placed_chars = word_chars = None
+            if self.rack.counts[Rack.SLOT_BLANK] != self.blank_count and not self.enumerate_blanks:
+                # Blanks were placed: place the tiles of their letters where they score the most.
+                placed_chars, word_chars = self.placed_chars, self.word_chars
+                points = self.assign_blanks(is_forward, points)
+            if self.best_count is None:
+                self.moves.append(self.build_move(is_forward, points))
+            elif len(self.best_heap) < self.best_count:
+                self.best_seq += 1
+                heapq.heappush(self.best_heap, (points, -self.best_seq, self.build_move(is_forward, points)))
+            elif points > self.best_heap[0][0]:
+                self.best_seq += 1
+                heapq.heapreplace(self.best_heap, (points, -self.best_seq, self.build_move(is_forward, points)))
+            if placed_chars is not None:
+                self.placed_chars, self.word_chars = placed_chars, word_chars
+        elif char == GNode.CHAR_REV:
+            if letter != Board.CHAR_EMPTY:
+                return
+            self.backward_len = len(self.word_chars)
+            self.gen_children(node, self.hook.x - dx, self.hook.y - dy, -dx, -dy, True)
+        else:  # char is alphabetic
+            if not is_on_board:
+                return
+            if letter != Board.CHAR_EMPTY:
+                if letter.lower() == char:
+                    main_points = self.main_points
+                    self.main_points += self.char2points.get(letter, 0)  # Blanks (uppercase) score 0
+                    self.word_chars.append(letter)
+                    self.gen_children(node, x + dx, y + dy, dx, dy, is_forward)
+                    self.word_chars.pop()
+                    self.main_points = main_points
+                return
+            if not board.cross_checks[BoardDirection.axis(self.bdir)][y][x] & Board.char2mask(char):
+                return
+            if not is_forward and (x, y) in self.hook_cells and (x, y) != self.hook:
+                self.duplicates_avoided += 1  # Generated from hook (x, y)
+                return
+            rack = self.rack
+            main_points, main_multiplier, cross_points = self.main_points, self.main_multiplier, self.cross_points
+            letter_multiplier = board.layout.letter_multipliers[y][x]
+            word_multiplier = board.layout.word_multipliers[y][x]
+            cross_score = board.cross_scores[BoardDirection.axis(self.bdir)][y][x]
+            for slot in [Rack.char2slot(char), Rack.SLOT_BLANK]:
+                if rack.counts[slot] == 0:
+                    continue
+                if slot != Rack.SLOT_BLANK:
+                    placed_char = char
+                    letter_points = self.char2points.get(char, 0) * letter_multiplier
+                else:
+                    placed_char = char.upper()
+                    # Scored as a tile of char, if it can trade cells with one. (See assign_blanks.)
+                    letter_points = 0 if self.enumerate_blanks or not self.rack_mask & Board.char2mask(char) \
+                        else self.char2points.get(char, 0) * letter_multiplier
+                self.main_points = main_points + letter_points
+                self.main_multiplier = main_multiplier * word_multiplier
+                if cross_score is not None:
+                    self.cross_points = cross_points + (cross_score + letter_points) * word_multiplier
+                rack.counts[slot] -= 1
+                if rack.counts[slot] == 0:
+                    rack.mask &= ~(1 << slot)
+                self.placed_cells.append(Cell(x, y))
+                self.placed_chars.append(placed_char)
+                self.word_chars.append(placed_char)
+                if self.best_count is not None and self.is_bound_below_best(x, y, is_forward):
+                    self.branches_pruned += 1
+                else:
+                    self.gen_children(node, x + dx, y + dy, dx, dy, is_forward)
+                self.word_chars.pop()
+                self.placed_chars.pop()
+                self.placed_cells.pop()
+                if rack.counts[slot] == 0:
+                    rack.mask |= 1 << slot
+                rack.counts[slot] += 1
+                if not self.enumerate_blanks:
+                    break  # The blank is only placed if no tile of char is left. (See above.)
+            self.main_points, self.main_multiplier, self.cross_points = main_points, main_multiplier, cross_points
+
+    def gen_children(self, node, x, y, dx, dy, is_forward):
+        """Continue with the children of node at cell (x, y). If that cell is empty, children with
+        letters that cannot be placed there (per the rack and cross-checks) are skipped."""
+        board = self.board
+        if (0 <= x < board.width and 0 <= y < board.height and board.letters[y][x] == Board.CHAR_EMPTY
+                and not self.rack.counts[Rack.SLOT_BLANK]):
+            placeable = board.cross_checks[BoardDirection.axis(self.bdir)][y][x] & self.rack.mask
+            for c, child in node.children.items():
+                if c.isalpha() and not placeable & Board.char2mask(c):
+                    continue
+                self.gen_node(child, x, y, dx, dy, is_forward)
+        else:
+            for child in node.children.values():
+                self.gen_node(child, x, y, dx, dy, is_forward)
+
+    def gen_node_stats(self, node, x, y, dx, dy, is_forward):
+        """gen_node, counting the branch it prunes, if any, by cause. (See SearchStats.)"""
+        stats = self.stats
+        board = self.board
+        char = node.char
+        is_on_board = 0 <= x < board.width and 0 <= y < board.height
+        letter = board.letters[y][x] if is_on_board else Board.CHAR_EMPTY
+        if char == GNode.CHAR_EOW or char == GNode.CHAR_REV:
+            after_x, after_y = self.hook.x - dx, self.hook.y - dy
+            if letter != Board.CHAR_EMPTY or (char == GNode.CHAR_EOW and not is_forward
+                                              and 0 <= after_x < board.width and 0 <= after_y < board.height
+                                              and board.letters[after_y][after_x] != Board.CHAR_EMPTY):
+                stats.pruned_by_board += 1
+        elif not is_on_board or (letter != Board.CHAR_EMPTY and letter.lower() != char):
+            stats.pruned_by_board += 1
+        elif letter == Board.CHAR_EMPTY:
+            if not board.cross_checks[BoardDirection.axis(self.bdir)][y][x] & Board.char2mask(char):
+                stats.pruned_by_cross_check += 1
+            elif not self.rack.counts[Rack.char2slot(char)] and not self.rack.counts[Rack.SLOT_BLANK]:
+                stats.pruned_by_rack += 1
+        Search.gen_node(self, node, x, y, dx, dy, is_forward)
+
+    def gen_children_stats(self, node, x, y, dx, dy, is_forward):
+        """gen_children, counting the children it skips by cause. (See SearchStats.)"""
+        board = self.board
+        if (0 <= x < board.width and 0 <= y < board.height and board.letters[y][x] == Board.CHAR_EMPTY
+                and not self.rack.counts[Rack.SLOT_BLANK]):
+            cross_check = board.cross_checks[BoardDirection.axis(self.bdir)][y][x]
+            for c, child in node.children.items():
+                if c.isalpha():
+                    mask = Board.char2mask(c)
+                    if not self.rack.mask & mask:
+                        self.stats.pruned_by_rack += 1
+                        continue
+                    if not cross_check & mask:
+                        self.stats.pruned_by_cross_check += 1
+                        continue
+                self.gen_node(child, x, y, dx, dy, is_forward)
+        else:
+            for child in node.children.values():
+                self.gen_node(child, x, y, dx, dy, is_forward)
+
+    def build_move_stats(self, is_forward, points=None)->Move:
+        """build_move, counting & timing the moves built. (See SearchStats.)"""
+        start = time.perf_counter()
+        move = Search.build_move(self, is_forward, points)
+        self.stats.add_seconds('build_moves', time.perf_counter() - start)
+        self.stats.moves += 1
+        return move
+
+    def init_score_bound(self):
+        """Precompute tables for score_bound, for the current hook, direction and rack.
+        Only cells that the remaining tiles could reach are considered: those on the line through the hook,
+        within rack-size empty cells of it on either side."""
+        board = self.board
+        layout = board.layout
+        axis = BoardDirection.axis(self.bdir)
+        tile_count = len(self.rack)
+
+        # Empty cells on the line through the hook, before & after each position along it.
+        line = [(x, self.hook.y) for x in range(board.width)] if axis == BoardDirection.LEFT \
+            else [(self.hook.x, y) for y in range(board.height)]
+        is_empty = [board.letters[y][x] == Board.CHAR_EMPTY for x, y in line]
+        empty_before = [0] * len(line)
+        empty_after = [0] * len(line)
+        for k in range(1, len(line)):
+            empty_before[k] = empty_before[k - 1] + is_empty[k - 1]
+            empty_after[-k - 1] = empty_after[-k] + is_empty[-k]
+
+        empty_cells = [self.hook]
+        board_letter_points = 0
+        for dx, dy in [self.bdir.value, BoardDirection.reversed(self.bdir).value]:
+            x, y = self.hook.x + dx, self.hook.y + dy
+            empty_count = 1
+            while 0 <= x < board.width and 0 <= y < board.height:
+                letter = board.letters[y][x]
+                if letter == Board.CHAR_EMPTY:
+                    if empty_count == tile_count:
+                        break
+                    empty_count += 1
+                    empty_cells.append(Cell(x, y))
+                else:
+                    board_letter_points += self.char2points.get(letter, 0)
+                x, y = x + dx, y + dy
+
+        max_tile_points = max([0] + [self.char2points.get(c, 0) for c in str(self.rack)])
+        # Unless blanks are enumerated, a blank may be scored as a tile. (See assign_blanks.)
+        tile_points = sorted([max_tile_points if c == Bag.CHAR_BLANK and not self.enumerate_blanks
+                              else self.char2points.get(c, 0) for c in str(self.rack)], reverse=True)
+        letter_multipliers = sorted([layout.letter_multipliers[c.y][c.x] for c in empty_cells], reverse=True)
+        word_multipliers = sorted([layout.word_multipliers[c.y][c.x] for c in empty_cells], reverse=True)
+        cell_cross_points = []
+        for c in empty_cells:
+            cross_score = board.cross_scores[axis][c.y][c.x]
+            if cross_score is not None:
+                cell_cross_points.append((cross_score + max_tile_points * layout.letter_multipliers[c.y][c.x])
+                                         * layout.word_multipliers[c.y][c.x])
+        cell_cross_points.sort(reverse=True)
+
+        # Indexed by the number of tiles still to be placed: the most that they could add
+        #   main_points: to the primary word's letter points (incl. letters on board it could reach)
+        #   multiplier:  to the primary word's multiplier (as a factor)
+        #   cross_points: in secondary words
+        main_points = [board_letter_points]
+        multiplier = [1]
+        cross_points = [0]
+        for k in range(tile_count):
+            main_points.append(main_points[k] + tile_points[k] * letter_multipliers[min(k, len(empty_cells) - 1)])
+            multiplier.append(multiplier[k] * (word_multipliers[k] if k < len(word_multipliers) else 1))
+            cross_points.append(cross_points[k] + (cell_cross_points[k] if k < len(cell_cross_points) else 0))
+        line_index = self.hook.x if axis == BoardDirection.LEFT else self.hook.y
+        self.bound_tables = (main_points, multiplier, cross_points, tile_count
+                             , empty_before, empty_after, empty_after[line_index])
+
+    def hook_score_bound(self, hook, bdir, rack)->int:
+        """Return an upper bound of the points of the moves found from hook along bdir."""
+        self.hook = hook
+        self.bdir = bdir
+        self.rack = rack if isinstance(rack, Rack) else Rack(rack)
+        self.init_score_bound()
+        main_points, multiplier, cross_points, tile_count, empty_before, empty_after, hook_empty_after \
+            = self.bound_tables
+        line_index = hook.x if BoardDirection.axis(bdir) == BoardDirection.LEFT else hook.y
+        remaining = min(tile_count, empty_before[line_index] + 1 + hook_empty_after)
+        bound = main_points[remaining] * multiplier[remaining] + cross_points[remaining]
+        if self.rack_size is not None and remaining >= self.rack_size:
+            bound += self.bingo_points
+        return bound
+
+    def is_bound_below_best(self, x, y, is_forward):
+        """Check whether the current branch cannot produce a move that would be among the best moves."""
+        return (len(self.best_heap) == self.best_count
+                and self.score_bound(x, y, is_forward) <= self.best_heap[0][0])
+
+    def score_bound(self, x, y, is_forward):
+        """Return an upper bound of the points of any move that extends the current backtracking state,
+        whose last letter was placed on (x, y)."""
+        main_points, multiplier, cross_points, tile_count, empty_before, empty_after, hook_empty_after \
+            = self.bound_tables
+        line_index = x if BoardDirection.axis(self.bdir) == BoardDirection.LEFT else y
+        # The backward direction (bdir) is toward lower indices along the line.
+        if is_forward:
+            reachable = empty_after[line_index]
+        else:
+            reachable = empty_before[line_index] + hook_empty_after
+        placed_count = len(self.placed_cells)
+        remaining = min(tile_count - placed_count, reachable)
+        bound = ((self.main_points + main_points[remaining]) * self.main_multiplier * multiplier[remaining]
+                 + self.cross_points + cross_points[remaining])
+        if self.rack_size is not None and placed_count + remaining >= self.rack_size:
+            bound += self.bingo_points
+        return bound
+
+    def assign_blanks(self, is_forward, points:int)->int:
+        """For each letter placed both as a blank and as a tile, move the tiles to the cells of the letter
+        where they score the most, and return the points of the move with that assignment.
+        points must be the running total, in which these blanks are scored as tiles. (See gen_node.)
+        placed_chars & word_chars are replaced by updated copies if the assignment changes, so the caller
+        must restore them."""
+        board = self.board
+        layout = board.layout
+        cross_scores = board.cross_scores[BoardDirection.axis(self.bdir)]
+        dx, dy = self.bdir.value  # Backward direction
+        backward_len = self.backward_len if is_forward else len(self.word_chars)
+        placed_chars = self.placed_chars
+        for blank_char in set([c for c in placed_chars if c.isupper()]):
+            char = blank_char.lower()
+            ks = [k for k, c in enumerate(placed_chars) if c.lower() == char]
+            tile_ks = [k for k in ks if placed_chars[k] == char]
+            if not tile_ks:
+                continue
+
+            # The points a tile of char adds on the cell of placed letter k, per point of char
+            def gain(k):
+                x, y = self.placed_cells[k]
+                letter_multiplier = layout.letter_multipliers[y][x]
+                result = letter_multiplier * self.main_multiplier
+                if cross_scores[y][x] is not None:
+                    result += letter_multiplier * layout.word_multipliers[y][x]
+                return result
+
+            ks.sort(key=gain, reverse=True)  # Stable: tiles keep their cells on ties
+            points -= self.char2points.get(char, 0) * sum([gain(k) for k in ks[len(tile_ks):]])
+            tile_ks = set(ks[:len(tile_ks)])
+            if all([(placed_chars[k] == char) == (k in tile_ks) for k in ks]):
+                continue
+            if placed_chars is self.placed_chars:
+                self.placed_chars = placed_chars = placed_chars[:]
+                self.word_chars = self.word_chars[:]
+            for k in ks:
+                placed_chars[k] = char if k in tile_ks else blank_char
+                x, y = self.placed_cells[k]
+                offset = (x - self.hook.x) * dx + (y - self.hook.y) * dy  # Cells from the hook, backward
+                self.word_chars[offset if offset >= 0 else backward_len - offset - 1] = placed_chars[k]
+        return points
+
+    def build_move(self, is_forward, points=None)->Move:
+        """Build the Move for the current backtracking state, which holds a complete word."""
+        backward_len = self.backward_len if is_forward else len(self.word_chars)
+        backward = self.word_chars[:backward_len]
+        backward.reverse()
+        word = ''.join(backward + self.word_chars[backward_len:])
+        dx, dy = self.bdir.value  # Backward direction
+        forward_len = len(self.word_chars) - backward_len
+        cell_begin = Cell(self.hook.x + dx * (backward_len - 1), self.hook.y + dy * (backward_len - 1))
+        cell_end = Cell(self.hook.x - dx * forward_len, self.hook.y - dy * forward_len)
+
+        placed_letters = [PlacedLetter(cell, char) for cell, char in zip(self.placed_cells, self.placed_chars)]
+        secondary_words = []
+        for pl in placed_letters:
+            if self.board.cross_score(pl.cell, self.bdir) is not None:
+                prefix, suffix = self.board.cross_words(pl.cell, self.bdir)
+                back = BoardDirection.perpendicular(self.bdir)
+                sw_begin = Cell(pl.cell.x + back.value[0] * len(prefix), pl.cell.y + back.value[1] * len(prefix))
+                sw_end = Cell(pl.cell.x - back.value[0] * len(suffix), pl.cell.y - back.value[1] * len(suffix))
+                secondary_words.append(PlacedWord(sw_begin, sw_end, prefix + pl.char + suffix))
+        return Move(placed_letters, PlacedWord(cell_begin, cell_end, word), secondary_words, points)
+
     def find_moves_hook_bdir(self, hook, bdir, rack)->Iterable[Move]:
-        self.board.game.logger.debug(f'Search.find_moves_hook_bdir: hook={hook}, bdir={bdir}, rack={rack}')
+        if self.is_debug:
+            logger.debug('Search.find_moves_hook_bdir: hook=%s, bdir=%s, rack=%s', hook, bdir, rack)
         for node in self.gtree.root.children.values():
             placed_letters = []
             primary_word = PlacedWord(hook, hook, '')
@@ -37,40 +616,58 @@ class Search:
             yield from self.find_moves_ss(ss)
 
     def find_moves_ss(self, ss)->Iterable[Move]:
-        self.board.game.logger.debug(f'Search.find_moves_ss: ss={ss}')
-        if ss.cursor is None:
-            return
+        """Yield the moves that complete the word being built by ss, continuing from ss.node.
+        ss.cursor is the next cell to be filled (None if off board); ss.node has not yet been applied to it."""
+        if self.is_debug:
+            logger.debug('Search.find_moves_ss: ss=%s', ss)
+        self.nodes_visited += 1
         if ss.node.char == GNode.CHAR_EOW:
-            if not ss.is_next_cell_letter(self.board):
-                yield deepcopy(move_acc)
+            # The word must not continue onto letters on board, on either end.
+            if ss.is_cursor_letter(self.board):
+                return
+            if not BoardDirection.is_forward(ss.bdir) and ss.is_after_hook_letter(self.board):
+                return
+            yield deepcopy(ss.move_acc)
         elif ss.node.char == GNode.CHAR_REV:
-            if not ss.is_next_cell_letter(self.board):
-                ss_arg = deepcopy(self)
-                ss_arg.reverse_search_direction()
-                yield from self.find_moves_ss(ss_arg)
+            if ss.is_cursor_letter(self.board):
+                return
+            ss_arg = deepcopy(ss)
+            ss_arg.reverse_search_direction(self.board)
+            yield from self.find_moves_children(ss_arg)
         else:  # node.char is alphabetic
-            is_char_on_board = self.board[ss.cursor] == ss.node.char
-            if is_char_on_board:
-                ss_arg = deepcopy(ss)
-                ss_arg.update_char_on_board(self.board)
-                if ss_arg.cursor:
-                    yield from self.find_moves_ss(ss_arg)
-            else:
-                is_char_in_rack = ss.node.char in ss.rack
-                if is_char_in_rack:
+            if ss.cursor is None:
+                return
+            if not self.board.is_cell_empty(ss.cursor):
+                if self.board[ss.cursor].lower() == ss.node.char:
                     ss_arg = deepcopy(ss)
-                    ss_arg.update_char_in_rack(self.gtree, self.board)
-                    if ss_arg.cursor:
-                        yield from self.find_moves_ss(ss_arg)
+                    ss_arg.update_char_on_board(self.board)
+                    yield from self.find_moves_children(ss_arg)
+                return
+            if not self.board.cross_check(ss.cursor, ss.bdir) & Board.char2mask(ss.node.char):
+                return
 
-                is_blank_in_rack = GNode.CHAR_BLANK in ss.rack
-                if is_blank_in_rack:
-                    ss_arg = deepcopy(ss)
-                    ss_arg.update_blank_in_rack(self.board)
-                    yield from self.find_moves_ss(ss_arg)
+            is_char_in_rack = ss.node.char in ss.rack
+            if is_char_in_rack:
+                ss_arg = deepcopy(ss)
+                ss_arg.update_char_in_rack(self.gtree, self.board)
+                yield from self.find_moves_children(ss_arg)
+
+            is_blank_in_rack = Bag.CHAR_BLANK in ss.rack
+            if is_blank_in_rack:
+                ss_arg = deepcopy(ss)
+                ss_arg.update_blank_in_rack(self.gtree, self.board)
+                yield from self.find_moves_children(ss_arg)
+
+    def find_moves_children(self, ss)->Iterable[Move]:
+        for node in ss.node.children.values():
+            ss_arg = deepcopy(ss)
+            ss_arg.node = node
+            yield from self.find_moves_ss(ss_arg)
 
     def get_secondary_words(self, placed_letters, primary_word, rack, do_update_move_acc=True):
-        self.board.game.logger.debug(f'Search.get_secondary_words: placed_letters={placed_letters}, primary_word={primary_word}, rack={rack}, do_update_move_acc={do_update_move_acc}')
+        if self.is_debug:
+            logger.debug('Search.get_secondary_words: placed_letters=%s, primary_word=%s, rack=%s, do_update_move_acc=%s'
+                         , placed_letters, primary_word, rack, do_update_move_acc)
         cell_beg = primary_word.cell_begin
         cell_end = primary_word.cell_end
         primary_bdir = BoardDirection.LEFT if cell_beg.y == cell_end.y else BoardDirection.UP
@@ -86,7 +683,7 @@ class Search:
             node = self.gtree.root.children[pl.char]
             cursor = pl.cell
             ss = SearchState(move_acc, node, cursor, primary_bdir, rack)
-            sw = ss.get_secondary_word(self.gtree, self.board)
+            sw = ss.get_secondary_word(self.gtree, self.board, pl.char)
             if sw:
                 result.append(sw)
         return result
@@ -101,7 +698,7 @@ class SearchState:
         self.rack = rack
 
     def __deepcopy__(self, memo=None):
-        ss = SearchState(self.move_acc, self.node, self.cursor, self.bdir, self.rack)
+        ss = SearchState(deepcopy(self.move_acc), self.node, self.cursor, self.bdir, self.rack)
         return ss
 
     def __eq__(self, other):  # For unit tests
@@ -120,17 +717,17 @@ class SearchState:
                     )
         return result
 
-    def get_secondary_word(self, gtree, board):
-        board.game.logger.debug(f'SearchState.get_secondary_word (self={self}: gtree=<gtree>, board=<board>')
-        if self.bdir in [BoardDirection.LEFT, BoardDirection.RIGHT]:
-            back = BoardDirection.UP
-        else:
-            back = BoardDirection.LEFT
+    def get_secondary_word(self, gtree, board, char):
+        """Return the secondary word formed by placing char at the cursor, if any, and if it is valid.
+        Validity is read from the board's cross-checks when they are current for gtree."""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SearchState.get_secondary_word (self=%s: gtree=<gtree>, board=<board>, char=%s', self, char)
+        back = BoardDirection.perpendicular(self.bdir)
         forward = BoardDirection.reversed(back)
 
         begin = self.cursor
         end = self.cursor
-        word = board[self.cursor]
+        word = char
 
         while True:
             next_begin = Util.add_cell_bdir(begin, back)
@@ -146,9 +743,24 @@ class SearchState:
                 word = word + board[end]
             else:
                 break
-        if gtree.has_word(word):
+        if begin == end:
+            return None
+        if board.cross_gtree is gtree:
+            is_valid = board.cross_check(self.cursor, self.bdir) & Board.char2mask(char)
+        else:
+            is_valid = gtree.has_word(word)
+        if is_valid:
             return PlacedWord(begin, end, word)
 
+    def is_after_hook_letter(self, board):
+        """In the backward phase of a search, check whether the cell after the hook (i.e., first placed letter) holds a letter."""
+        hook = self.move_acc.placed_letters[0].cell
+        cell = Util.add_cell_bdir(hook, BoardDirection.reversed(self.bdir))
+        return board.is_cell_on_board(cell) and not board.is_cell_empty(cell)
+
+    def is_cursor_letter(self, board):
+        return self.cursor is not None and not board.is_cell_empty(self.cursor)
+
     def is_next_cursor_letter(self, board):
         cell = self.next_cursor(board)
         return cell is not None and board[cell] != Board.CHAR_EMPTY
@@ -159,25 +771,28 @@ class SearchState:
         return cell if board.is_cell_on_board(cell) else None
 
     def reverse_search_direction(self, board, do_copy=False):
-        # board.game.logger.debug(f'SearchState.reverse_search_direction: board=<board>, do_copy={do_copy}')
+        """Move the cursor to just after the hook (i.e., the first placed letter), and search forward from there."""
+        # logger.debug(f'SearchState.reverse_search_direction: board=<board>, do_copy={do_copy}')
 
-        ss = self.copy() if do_copy else self
-        ss.cursor = move_acc.placed_letters[0].cell
+        ss = deepcopy(self) if do_copy else self
+        ss.cursor = ss.move_acc.placed_letters[0].cell
         ss.bdir = BoardDirection.reversed(ss.bdir)
         ss.cursor = ss.next_cursor(board)
+        return ss if do_copy else None
 
     def update_blank_in_rack(self, gtree, board, do_copy=False)->'SearchState':
         assert(Bag.CHAR_BLANK in self.rack)
-        board.game.logger.debug(f'SearchState.update_blank_in_rack (self={self}): gtree=<gtree>, board=<board>, do_copy={do_copy}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SearchState.update_blank_in_rack (self=%s): gtree=<gtree>, board=<board>, do_copy=%s', self, do_copy)
 
-        ss = self.copy() if do_copy else self
-        ss.move_acc.placed_letters.append(PlacedLetter(ss.cursor, ss.node.char.upper()))
+        ss = deepcopy(self) if do_copy else self
+        ss.move_acc.placed_letters.append(PlacedLetter(ss.cursor, ss.node.char, is_blank=True))
         ss.move_acc.primary_word = ss.move_acc.primary_word.updated(
                 ss.cursor
                 , ss.bdir
                 , ss.node.char.upper()
                 )
-        new_secondary_word = ss.get_secondary_word(gtree, board)
+        new_secondary_word = ss.get_secondary_word(gtree, board, ss.node.char.upper())
         if new_secondary_word:
             ss.move_acc.secondary_words.append(new_secondary_word)
         ss.cursor = ss.next_cursor(board)
@@ -186,16 +801,17 @@ class SearchState:
 
     def update_char_in_rack(self, gtree, board, do_copy=False)->'SearchState':
         assert(self.node.char in self.rack)
-        board.game.logger.debug(f'SearchState.update_char_in_rack (self={self}): gtree=<gtree>, board=<board>, do_copy={do_copy}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SearchState.update_char_in_rack (self=%s): gtree=<gtree>, board=<board>, do_copy=%s', self, do_copy)
 
-        ss = self.copy() if do_copy else self
+        ss = deepcopy(self) if do_copy else self
         ss.move_acc.placed_letters.append(PlacedLetter(ss.cursor, ss.node.char))
         ss.move_acc.primary_word = ss.move_acc.primary_word.updated(
                                         ss.cursor
                                         , ss.bdir
                                         , ss.node.char
                                         )
-        new_secondary_word = ss.get_secondary_word(gtree, board)
+        new_secondary_word = ss.get_secondary_word(gtree, board, ss.node.char)
         if new_secondary_word:
             ss.move_acc.secondary_words.append(new_secondary_word)
         ss.cursor = ss.next_cursor(board)
@@ -203,13 +819,29 @@ class SearchState:
         return ss if do_copy else None
 
     def update_char_on_board(self, board, do_copy=False)->'SearchState':
-        assert(board[self.cursor] == self.node.char)
-        board.game.logger.debug(f'SearchState.update_char_on_board (self={self}): board=<board>, do_copy={do_copy}')
+        assert(board[self.cursor].lower() == self.node.char)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('SearchState.update_char_on_board (self=%s): board=<board>, do_copy=%s', self, do_copy)
 
-        ss = self.copy() if do_copy else self
+        ss = deepcopy(self) if do_copy else self
         # Do not update placed_letters
         ss.move_acc.primary_word = ss.move_acc.primary_word.updated(ss.cursor, ss.bdir, board[ss.cursor])
         # Do not update secondary_word
         ss.cursor = ss.next_cursor(board)
         # Do not update rack
         return ss if do_copy else None
+
+
+def gen_moves_items(items, rack:str):
+    """Find the moves for each (hook, bdir) in items, in a worker process of Search.find_moves_parallel.
+    Return the lists of moves, along with the numbers of nodes visited & duplicates avoided, and the stats
+    of the search, if it has any."""
+    search = _fork_search
+    search.is_tracing = False  # The trace is written by a thread of the parent process.
+    search.nodes_visited = 0
+    search.duplicates_avoided = 0
+    if search.stats is not None:
+        search.stats = SearchStats()
+    hook_cells = set(search.board.hooks())
+    moves = [search.gen_moves_hook_bdir(hook, bdir, rack, hook_cells) for hook, bdir in items]
+    return moves, search.nodes_visited, search.duplicates_avoided, search.stats
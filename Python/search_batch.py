@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import json
+import logging
+import multiprocessing
+import sys
+import time
+import yaml
+
+
+from board import Board
+from search import Search
+from typing import Dict, Iterable, Iterator, TextIO
+from util import Util
+
+
+logger = logging.getLogger(__name__)
+
+# The SearchBatch used by worker processes of SearchBatch.run, inherited via fork.
+_fork_batch = None
+
+
+# Searches many (board, rack) positions with one dictionary, e.g. for offline analysis.
+# Positions are read as JSONL (one object per line) or as YAML (a mapping of names to positions,
+# like test_search.yml). Each position has a board (a string of rows, or a list of rows) and a rack,
+# and optionally an id (the name, for YAML) and best (the number of highest-scoring moves to keep).
+# Results are written as JSONL, in the order of the positions.
+class SearchBatch:
+    # Number of positions submitted to the pool ahead of the one being written out, per worker.
+    QUEUE_DEPTH_PER_WORKER = 8
+
+    def __init__(self, config, gtree, layout, best=None):
+        self.config = config
+        self.gtree = gtree
+        self.layout = layout
+        self.best = best
+        self.position_count = 0
+        self.elapsed = 0.0
+
+    @staticmethod
+    def read_positions(stream:TextIO, is_yaml=False)->Iterator[Dict]:
+        if is_yaml:
+            for name, position in yaml.safe_load(stream).items():
+                position = dict(position)
+                position.setdefault('id', name)
+                yield position
+        else:
+            for k, line in enumerate(stream):
+                if line.strip():
+                    position = json.loads(line)
+                    position.setdefault('id', k)
+                    yield position
+
+    @staticmethod
+    def move2dict(move)->Dict:
+        return { 'points': move.points
+                 , 'word': move.primary_word.word
+                 , 'begin': list(move.primary_word.cell_begin)
+                 , 'end': list(move.primary_word.cell_end)
+                 , 'placed': [[pl.cell.x, pl.cell.y, pl.char] for pl in move.placed_letters]
+                 , 'secondary_words': [sw.word for sw in move.secondary_words]
+                 }
+
+    def search_position(self, position:Dict)->Dict:
+        rows = position['board']
+        if isinstance(rows, str):
+            rows = Util.get_rows_from_config(rows)
+        best = position.get('best', self.best)
+        # Boards whose size does not match the layout (e.g. in test_search.yml) get a blank layout.
+        is_layout_match = self.layout.height == len(rows) and self.layout.width == len(rows[0])
+        board = Board(self.config, layout=self.layout if is_layout_match else None, rows=rows)
+        search = Search(self.gtree, board)
+        moves = search.find_moves(position['rack']) if best is None else search.best_moves(position['rack'], best)
+        return { 'id': position['id']
+                 , 'rack': position['rack']
+                 , 'moves': [SearchBatch.move2dict(move) for move in moves]
+                 }
+
+    def run(self, positions:Iterable[Dict], workers=1)->Iterator[Dict]:
+        """Yield the result of each position, in order. With workers > 1, positions are searched
+        in forked worker processes, which share the dictionary with this one."""
+        global _fork_batch
+        start = time.perf_counter()
+        self.position_count = 0
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            for position in positions:
+                yield self.search_position(position)
+                self.position_count += 1
+        else:
+            _fork_batch = self
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+                    futures = deque()
+                    for position in positions:
+                        futures.append(executor.submit(search_position, position))
+                        if len(futures) >= workers * SearchBatch.QUEUE_DEPTH_PER_WORKER:
+                            yield futures.popleft().result()
+                            self.position_count += 1
+                    while futures:
+                        yield futures.popleft().result()
+                        self.position_count += 1
+            finally:
+                _fork_batch = None
+        self.elapsed = time.perf_counter() - start
+
+    def write_results(self, positions:Iterable[Dict], out:TextIO, workers=1):
+        for result in self.run(positions, workers):
+            out.write(json.dumps(result) + '\n')
+        rate = self.position_count / self.elapsed if self.elapsed > 0 else 0.0
+        print(f'Searched {self.position_count} positions in {self.elapsed:.2f} s: {rate:.1f} positions/sec'
+              , file=sys.stderr)
+
+
+def search_position(position:Dict)->Dict:
+    """Search a position in a worker process of SearchBatch.run."""
+    return _fork_batch.search_position(position)
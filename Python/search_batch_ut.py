@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+import io
+import json
+import unittest
+import yaml
+
+
+from board import BoardLayout
+from gtree import GTree
+from search_batch import SearchBatch
+
+
+class TestSearchBatch(unittest.TestCase):
+    def test_test_search_positions(self):
+        with open('test_search.yml', 'r') as stream:
+            test_config = yaml.safe_load(stream)
+        gtree = GTree()
+        gtree.add_wordlist(sorted({w for t in test_config.values() for w in t['dictionary']}))
+        layout = BoardLayout(['.' * 15] * 15)
+        batch = SearchBatch(None, gtree, layout)
+        with open('test_search.yml', 'r') as stream:
+            serial_results = list(batch.run(SearchBatch.read_positions(stream, is_yaml=True)))
+        assert(batch.position_count == len(test_config))
+        assert([r['id'] for r in serial_results] == list(test_config))
+        words_found = {r['id']: {m['word'].lower() for m in r['moves']} for r in serial_results}
+        assert('bad' in words_found['test_empty_board'] and 'cab' in words_found['test_empty_board'])
+
+        with open('test_search.yml', 'r') as stream:
+            parallel_results = list(batch.run(SearchBatch.read_positions(stream, is_yaml=True), workers=2))
+        assert(parallel_results == serial_results)
+
+    def test_jsonl(self):
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'eat', 'scat', 'sea', 'tea'])
+        layout = BoardLayout(['.....', '.....', '.....'])
+        positions = ( json.dumps({ 'board': ['.....', '.cat.', '.....'], 'rack': 'se' }) + '\n\n'
+                      + json.dumps({ 'id': 'x', 'board': '.....\n..a..\n.....', 'rack': 'te', 'best': 1 }) + '\n' )
+        out = io.StringIO()
+        SearchBatch(None, gtree, layout).write_results(SearchBatch.read_positions(io.StringIO(positions)), out)
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert([r['id'] for r in results] == [0, 'x'])
+        assert({m['word'] for m in results[0]['moves']} == {'cats', 'scat'})
+        assert(len(results[1]['moves']) == 1 and results[1]['moves'][0]['word'] in ['eat', 'tea'])
+
+
+if __name__ == '__main__':
+    unittest.main()
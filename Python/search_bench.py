@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+import argparse
+import os
+import random
+import sys
+import time
+import yaml
+
+
+from board import Board, BoardLayout
+from board_direction import BoardDirection
+from gtree import GTree
+from search import Search
+from util import Util
+
+
+# Compares the backtracking move generator (Search.find_moves) with the reference
+# SearchState-copying one (Search.find_moves_hook_bdir), in GADDAG nodes visited per second.
+class SearchBench:
+    SYNTHETIC_WORD_COUNT = 20000
+    SYNTHETIC_SEED = 2018
+
+    @staticmethod
+    def synthetic_words(count=SYNTHETIC_WORD_COUNT, seed=SYNTHETIC_SEED):
+        """Return a reproducible list of pseudo-words, for when no dictionary file is available."""
+        rng = random.Random(seed)
+        letters = 'eeeeaaaiiioooonnrrttllssuuddgbcmpfhvwykjxqz'
+        words = set()
+        while len(words) < count:
+            words.add(''.join(rng.choice(letters) for _ in range(rng.randint(2, 8))))
+        return sorted(words)
+
+    @staticmethod
+    def run_search(search, rack, use_reference):
+        search.nodes_visited = 0
+        start = time.perf_counter()
+        if use_reference:
+            moves = []
+            for hook in search.board.hooks():
+                for bdir in [BoardDirection.LEFT, BoardDirection.UP]:
+                    moves.extend(search.find_moves_hook_bdir(hook, bdir, rack))
+        else:
+            moves = search.find_moves(rack)
+        elapsed = time.perf_counter() - start
+        return len(moves), search.nodes_visited, elapsed
+
+
+def main(args):
+    with open(args.configfile, 'r') as stream:
+        config = yaml.safe_load(stream)
+
+    gtree = GTree()
+    dictionary_file = args.dictionary if args.dictionary else config['dictionary_file']
+    if os.path.exists(dictionary_file):
+        gtree.add_wordfile(dictionary_file)
+    else:
+        print(f'Dictionary file {dictionary_file} not found: using synthetic words')
+        gtree.add_wordlist(SearchBench.synthetic_words())
+
+    layout = BoardLayout(Util.get_rows_from_config(config['layout_scrabble']))
+    board = Board(config, layout=layout, rows=Util.get_rows_from_config(config[args.board]))
+    search = Search(gtree, board, enumerate_blanks=True)  # As the reference does
+
+    for name, use_reference in [('reference (SearchState copies)', True), ('backtracking', False)]:
+        move_count, nodes, elapsed = 0, 0, 0.0
+        for _ in range(args.repeat):
+            move_count, n, e = SearchBench.run_search(search, args.rack, use_reference)
+            nodes += n
+            elapsed += e
+        print(f'{name:32s}: {move_count} moves, {nodes // args.repeat} nodes/search'
+              + f', {elapsed / args.repeat * 1000:.1f} ms/search, {nodes / elapsed:.0f} nodes/sec')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog=sys.argv[0], description='Benchmark move generation')
+    parser.add_argument('-c', '--configfile', default='config.yml')
+    parser.add_argument('-d', '--dictionary', default=None)
+    parser.add_argument('-b', '--board', help='Config entry of the board', default='test_board_scrabble')
+    parser.add_argument('-r', '--rack', default='etaoin_')
+    parser.add_argument('-n', '--repeat', type=int, default=3)
+    main(parser.parse_args())
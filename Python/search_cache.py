@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+from collections import OrderedDict
+import logging
+
+
+from rack import Rack
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# A bounded LRU cache of search results, e.g. for self-play, analysis UIs, and hints,
+# which search the same board again, often with the same rack in another order.
+# Results are keyed on the board's Zobrist hash (See Board.zobrist.) and the sorted rack,
+# so a cache must only be shared by searches with the same dictionary, layout, and letter points.
+# Its size is the total number of moves held: least recently used results are evicted beyond max_moves.
+# The cached Move objects are shared by all lookups, so they must not be modified.
+class SearchCache:
+    DEFAULT_MAX_MOVES = 1 << 20
+
+    def __init__(self, max_moves:int=DEFAULT_MAX_MOVES):
+        self.max_moves = max_moves
+        self.key2moves = OrderedDict()
+        self.move_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.key2moves)
+
+    @staticmethod
+    def key(board, rack, best_count:Optional[int]=None, enumerate_blanks=False)->Tuple:
+        """Return the key of the search of board with rack. best_count is k for Search.best_moves(rack, k).
+        enumerate_blanks is that of the Search."""
+        rack_str = str(rack) if isinstance(rack, Rack) else str(Rack(rack))
+        return (board.zobrist, board.width, board.height, rack_str, best_count, enumerate_blanks)
+
+    def clear(self):
+        self.key2moves.clear()
+        self.move_count = 0
+
+    def get(self, key)->Optional[List]:
+        moves = self.key2moves.get(key)
+        if moves is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.key2moves.move_to_end(key)
+        return list(moves)
+
+    def put(self, key, moves:List):
+        if len(moves) > self.max_moves:
+            return
+        if key in self.key2moves:
+            self.move_count -= len(self.key2moves.pop(key))
+        self.key2moves[key] = list(moves)
+        self.move_count += len(moves)
+        while self.move_count > self.max_moves:
+            _, evicted = self.key2moves.popitem(last=False)
+            self.move_count -= len(evicted)
+            self.evictions += 1
+
+    def stats(self)->Dict[str, int]:
+        return { 'entries': len(self.key2moves)
+                 , 'moves': self.move_count
+                 , 'hits': self.hits
+                 , 'misses': self.misses
+                 , 'evictions': self.evictions
+                 }
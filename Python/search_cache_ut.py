@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+import unittest
+
+
+from board import Board
+from gtree import GTree
+from move import Move, PlacedLetter, PlacedWord
+from search import Search
+from search_cache import SearchCache
+from util import Cell
+
+
+class TestSearchCache(unittest.TestCase):
+    def test_zobrist(self):
+        rows = ['.....', '.cat.', '.....']
+        board = Board(None, layout=None, rows=rows)
+        assert(board.zobrist != 0)
+        assert(board.zobrist == Board(None, layout=None, rows=rows).zobrist)
+
+        zobrist = board.zobrist
+        board[Cell(4, 1)] = 's'
+        assert(board.zobrist == Board(None, layout=None, rows=['.....', '.cats', '.....']).zobrist)
+        board[Cell(4, 1)] = 'S'
+        assert(board.zobrist == Board(None, layout=None, rows=['.....', '.catS', '.....']).zobrist)
+        board[Cell(4, 1)] = Board.CHAR_EMPTY
+        assert(board.zobrist == zobrist)
+        assert(Board(None, layout=None, rows=['.....', '..cat', '.....']).zobrist != zobrist)
+
+    def test_lru(self):
+        cache = SearchCache(max_moves=5)
+        cache.put('a', [1, 2])
+        cache.put('b', [3, 4])
+        assert(cache.get('a') == [1, 2])  # b is now least recently used
+        cache.put('c', [5, 6])
+        assert(cache.get('b') is None and cache.get('c') == [5, 6])
+        cache.put('d', [7] * 6)  # Too big to cache
+        assert(cache.get('d') is None)
+        assert(cache.stats() == { 'entries': 2, 'moves': 4, 'hits': 2, 'misses': 2, 'evictions': 1 })
+
+    def test_search(self):
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'east', 'eat', 'sat', 'scat', 'sea', 'seat', 'tea', 'teas'])
+        board = Board(None, layout=None, rows=['.......', '.......', '..cat..', '.......', '.......'])
+        cache = SearchCache()
+        moves = Search(gtree, board, cache).find_moves('se_')
+        assert([str(m) for m in Search(gtree, board, cache).find_moves('_es')] == [str(m) for m in moves])
+        assert(cache.hits == 1 and cache.misses == 1)
+
+        Search(gtree, board, cache).best_moves('es_', 3)
+        board.make_move(Move([PlacedLetter(Cell(1, 2), 's')], PlacedWord(Cell(1, 2), Cell(4, 2), 'scat'), []), gtree)
+        Search(gtree, board, cache).find_moves('es_')
+        assert(cache.hits == 1 and cache.misses == 3 and len(cache) == 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,7 +21,7 @@ class TestSearchState(unittest.TestCase):
     def get_config():
         filename = 'test_search_state.yml'
         with open(filename, 'r') as stream:
-            config = yaml.load(stream)
+            config = yaml.safe_load(stream)
             return config
 
     def test_is_next_cursor_letter(self, verbose=VERBOSE):
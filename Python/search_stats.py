@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+from typing import Dict
+
+
+# Counters & per-phase timings of the searches made by a Search created with stats. (See Search.)
+# Branches are pruned by:
+#   rack:        No tile of the rack can place the child's letter.
+#   board:       The word would run off the board, into a different letter on board, or onto letters
+#                beyond either end.
+#   cross_check: The letter would form an invalid secondary word.
+#   bound:       The branch cannot beat the k-th best move found so far. (best_moves only)
+# Phases:
+#   cross_checks: Refreshing the board's cross-checks, which validate the secondary words of the search.
+#   hooks:        Finding the hooks (anchors & start cells) of the board.
+#   bounds:       Computing the score bounds of hooks. (best_moves only)
+#   traversal:    Walking the GADDAG, which also keeps the running scores of moves.
+#   build_moves:  Building the Move objects of the words found, with their secondary words.
+class SearchStats:
+    PHASES = ['cross_checks', 'hooks', 'bounds', 'traversal', 'build_moves']
+
+    def __init__(self):
+        self.nodes_visited = 0
+        self.moves = 0
+        self.duplicates_avoided = 0
+        self.pruned_by_rack = 0
+        self.pruned_by_board = 0
+        self.pruned_by_cross_check = 0
+        self.pruned_by_bound = 0
+        self.phase2seconds = {phase: 0.0 for phase in SearchStats.PHASES}
+
+    def add_seconds(self, phase:str, seconds:float):
+        self.phase2seconds[phase] += seconds
+
+    def merge(self, other:'SearchStats', is_timed=True):
+        """Add the counts (and timings, if is_timed) of other, e.g. from a worker process, to these."""
+        for name, value in vars(other).items():
+            if name != 'phase2seconds':
+                setattr(self, name, getattr(self, name) + value)
+        if is_timed:
+            for phase, seconds in other.phase2seconds.items():
+                self.phase2seconds[phase] += seconds
+
+    def as_dict(self)->Dict:
+        result = {name: value for name, value in vars(self).items() if name != 'phase2seconds'}
+        result['seconds'] = dict(self.phase2seconds)
+        return result
+
+    def report(self)->str:
+        total = sum(self.phase2seconds.values())
+        phases = ', '.join([f'{phase} {seconds * 1000:.1f} ms' for phase, seconds in self.phase2seconds.items()])
+        return (f'{self.nodes_visited} nodes visited, {self.moves} moves, {self.duplicates_avoided} duplicate paths avoided\n'
+                + f'Pruned by rack: {self.pruned_by_rack}, board: {self.pruned_by_board}'
+                + f', cross-check: {self.pruned_by_cross_check}, bound: {self.pruned_by_bound}\n'
+                + f'Time: {total * 1000:.1f} ms ({phases})')
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+import json
+import logging
+import logging.handlers
+import queue
+
+
+# An opt-in structured trace of Search: one JSONL record per node expanded by the backtracking search.
+# (See Search.gen_node.) Records are logged to LOGGER_NAME, and handed to a background thread by a
+# queue handler, which writes them out, so the search does not wait on formatting or I/O.
+# While tracing is off, the search only checks a flag per node. (See Search.is_tracing.)
+# Only serial searches are traced: worker processes of parallel searches do not write records.
+class SearchTrace:
+    LOGGER_NAME = 'search.trace'
+    FIELDS = ['hook_x', 'hook_y', 'bdir', 'x', 'y', 'char', 'word_len', 'placed', 'points']
+    FORMAT = ', '.join([f'{field}=%s' for field in FIELDS])  # For other handlers of the records
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.propagate = False
+    listener = None
+
+    @staticmethod
+    def is_enabled()->bool:
+        return SearchTrace.listener is not None and SearchTrace.logger.isEnabledFor(logging.DEBUG)
+
+    @staticmethod
+    def start(path:str):
+        """Start writing the trace to path."""
+        SearchTrace.stop()
+        records = queue.SimpleQueue()
+        file_handler = logging.FileHandler(path, mode='w')
+        file_handler.setFormatter(TraceFormatter())
+        SearchTrace.listener = logging.handlers.QueueListener(records, file_handler)
+        SearchTrace.listener.start()
+        SearchTrace.logger.addHandler(TraceQueueHandler(records))
+        SearchTrace.logger.setLevel(logging.DEBUG)
+
+    @staticmethod
+    def stop():
+        """Write out the records still queued, and close the trace file."""
+        listener = SearchTrace.listener
+        if listener is None:
+            return
+        SearchTrace.listener = None
+        SearchTrace.logger.setLevel(logging.NOTSET)
+        for handler in list(SearchTrace.logger.handlers):
+            SearchTrace.logger.removeHandler(handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+class TraceQueueHandler(logging.handlers.QueueHandler):
+    """Queues records as they are. (QueueHandler formats them first, in the logging thread.)"""
+    def prepare(self, record):
+        return record
+
+
+class TraceFormatter(logging.Formatter):
+    """Formats a record whose args are the values of SearchTrace.FIELDS as a JSON object."""
+    def format(self, record):
+        return json.dumps(dict(zip(SearchTrace.FIELDS, record.args)))
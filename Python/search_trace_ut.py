@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+
+import json
+import os
+import tempfile
+import unittest
+
+
+from board import Board
+from gtree import GTree
+from search import Search
+from search_trace import SearchTrace
+
+
+class TestSearchTrace(unittest.TestCase):
+    def test_trace(self):
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'eat', 'tea', 'sat'])
+        board = Board(None, layout=None, rows=['.....', '.cat.', '.....'])
+        assert(not SearchTrace.is_enabled() and not Search(gtree, board).is_tracing)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'trace.jsonl')
+            SearchTrace.start(path)
+            try:
+                search = Search(gtree, board)
+                assert(search.is_tracing)
+                moves = search.find_moves('aset')
+            finally:
+                SearchTrace.stop()
+            assert(not SearchTrace.is_enabled())
+            with open(path, 'r') as f:
+                records = [json.loads(line) for line in f]
+        assert(len(moves) > 0 and len(records) == search.nodes_visited)
+        assert(all([list(record) == SearchTrace.FIELDS for record in records]))
+        assert(set([(r['hook_x'], r['hook_y']) for r in records]) == set([(c.x, c.y) for c in board.hooks()]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,13 @@ import unittest
 import yaml
 
 
-from board import Board
+from board import Board, BoardLayout
+from board_direction import BoardDirection
 from gtree import GTree
+from move import Move, PlacedLetter, PlacedWord
 from search import Search
+from search_stats import SearchStats
+from util import Cell, Util
 
 
 class TestSearch(unittest.TestCase):
@@ -18,7 +22,7 @@ class TestSearch(unittest.TestCase):
             print(f'\n\n===Test: {test_name}===')
 
         with open('test_search.yml', 'r') as stream:
-            config = yaml.load(stream)
+            config = yaml.safe_load(stream)
 
         config_test = config[test_name]
         if verbose:
@@ -50,7 +54,7 @@ class TestSearch(unittest.TestCase):
             else:
                 print(f'\t<None>')
 
-        board = Board(config_test, layout=None, rows=config_board)
+        board = Board(config_test, layout=None, rows=Util.get_rows_from_config(config_board))
         gtree = GTree()
         gtree.add_wordlist(config_dictionary)
         search = Search(gtree, board)
@@ -59,8 +63,8 @@ class TestSearch(unittest.TestCase):
         # Words actually found
         words_found = []
         for move in moves_found:
-            words_found.append(move.primary_word)
-            words_found.extend(move.secondary_words)
+            words_found.append(move.primary_word.word)
+            words_found.extend([sw.word for sw in move.secondary_words])
 
         if verbose:
             print(f'*** Number of moves found={len(moves_found)}')
@@ -68,9 +72,16 @@ class TestSearch(unittest.TestCase):
                 print(f'==> {move}')
 
         if config_words_found:
-            assert(all([ word in words_found
-                    for word in config_words_found
-                    ]))
+            # An entry can be a word, or map a primary word to the secondary words expected with it.
+            for entry in config_words_found:
+                if isinstance(entry, dict):
+                    for primary, secondaries in entry.items():
+                        assert(any([move.primary_word.word == primary
+                                    and sorted([sw.word for sw in move.secondary_words]) == sorted(secondaries)
+                                    for move in moves_found
+                                    ]))
+                else:
+                    assert(entry in words_found)
 
         # Words not expected to be found
         if 'words_not_found' in config_test:
@@ -82,7 +93,7 @@ class TestSearch(unittest.TestCase):
     def show_test_search_config():
         filename = 'test_search.yml'
         with open(filename, 'r') as stream:
-            config = yaml.load(stream)
+            config = yaml.safe_load(stream)
 
         for k in config:
             print(f'Test name: {k}')
@@ -92,6 +103,149 @@ class TestSearch(unittest.TestCase):
                 else:
                     print(f'\t{test_prop}: {config[k][test_prop]}')
 
+    def test_cross_checks(self):
+        board = Board(None, layout=None, rows=['.....', '.....', '.be..', '.....', '.....'])
+        gtree = GTree()
+        gtree.add_wordlist(['be', 'bet', 'abe', 'at', 'et'])
+        board.update_cross_checks(gtree)
+        assert(board.cross_check(Cell(3, 2), BoardDirection.RIGHT) == Board.CROSS_CHECK_ALL)
+        assert(board.cross_check(Cell(3, 2), BoardDirection.DOWN) == Board.char2mask('t'))
+        assert(board.cross_check(Cell(0, 2), BoardDirection.UP) == Board.char2mask('a'))
+        assert(board.cross_check(Cell(2, 3), BoardDirection.LEFT) == Board.char2mask('t'))
+        assert(board.cross_check(Cell(1, 2), BoardDirection.LEFT) == Board.CROSS_CHECK_NONE)
+
+        # Incremental updates agree with a full refresh
+        board.make_move(Move([PlacedLetter(Cell(2, 1), 'a'), PlacedLetter(Cell(2, 3), 't')]
+                             , PlacedWord(Cell(2, 1), Cell(2, 3), 'abet'), []), gtree)
+        assert(board.cross_gtree is gtree)
+        cross_checks = board.cross_checks
+        board.update_cross_checks(gtree)
+        assert(cross_checks == board.cross_checks)
+        assert(board.cross_check(Cell(3, 2), BoardDirection.DOWN) == Board.char2mask('t'))
+        assert(board.cross_check(Cell(1, 3), BoardDirection.LEFT) == Board.char2mask('e'))
+        assert(board.cross_check(Cell(2, 3), BoardDirection.LEFT) == Board.CROSS_CHECK_NONE)
+
+        # Letters set directly drop the cross-checks, which Search refreshes.
+        board[Cell(4, 2)] = 't'
+        assert(board.cross_gtree is None)
+        Search(gtree, board)
+        assert(board.cross_gtree is gtree and board.cross_check(Cell(3, 2), BoardDirection.DOWN) == Board.CROSS_CHECK_NONE)
+
+    def test_anchors(self):
+        board = Board(None, layout=None, rows=['.....', '.....', '.....', '.....', '.....'])
+        assert(board.is_empty())
+        assert(board.hooks() == [Cell(2, 2)])
+        board[Cell(2, 2)] = 'a'
+        board[Cell(3, 2)] = 'b'
+        assert(not board.is_empty())
+        expected = [Cell(2, 1), Cell(3, 1), Cell(1, 2), Cell(4, 2), Cell(2, 3), Cell(3, 3)]
+        assert(board.hooks() == expected)
+        assert(board.is_hook(Cell(4, 2)) and not board.is_hook(Cell(3, 2)) and not board.is_hook(Cell(0, 0)))
+        board[Cell(3, 2)] = Board.CHAR_EMPTY
+        assert(board.hooks() == [Cell(2, 1), Cell(1, 2), Cell(3, 2), Cell(2, 3)])
+
+    def test_best_moves(self):
+        config = { 'points2chars': 'points2chars_test', 'points2chars_test': { 0: '_', 1: 'aest', 3: 'c' }
+                   , 'rack_size': 3, 'bingo_points': 20 }
+        layout = BoardLayout(['3.....3', '.......', '...@...', '#..*..#', '.......', '.......', '2.....2'])
+        rows = ['.......', '.......', '.......', '..cat..', '.......', '.......', '.......']
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'east', 'eat', 'sat', 'scat', 'sea', 'seat', 'tea', 'teas'])
+        for rack in ['s', 'set', 'se_']:
+            board = Board(config, layout=layout, rows=rows)
+            expected = sorted([m.points for m in Search(gtree, board).find_moves(rack)], reverse=True)
+            for k in [1, 3, 100]:
+                moves = Search(gtree, board).best_moves(rack, k)
+                assert([m.points for m in moves] == expected[:k])
+
+        # scats is not a word: s to either end of cat (1 + 3 + 1 + 1)
+        assert(Search(gtree, Board(config, layout=layout, rows=rows)).best_moves('s', 1)[0].points == 6)
+        # east, down through the a of cat, on the double word at (3, 2): (1 + 1 + 1 + 1) * 2 + bingo
+        move = Search(gtree, Board(config, layout=layout, rows=rows)).best_moves('set', 1)[0]
+        assert(move.primary_word.word == 'east' and move.points == 28)
+        # seA, down from the s of scat, with a blank: (1 + 1 + 0) + scat (1 + 3 + 1 + 1) + bingo
+        move = Search(gtree, Board(config, layout=layout, rows=rows)).best_moves('se_', 1)[0]
+        assert(move.primary_word.word == 'seA' and move.points == 28)
+
+    def test_blanks(self):
+        config = { 'points2chars': 'points2chars_test', 'points2chars_test': { 0: '_', 1: 'a', 3: 'c' } }
+        layout = BoardLayout(['.......', '.......', '.......', '...*3..', '.......', '.......', '.......'])
+        gtree = GTree()
+        gtree.add_wordlist(['ca', 'cc'])
+        board = Board(config, layout=layout, rows=['.......'] * 7)
+        moves = Search(gtree, board).find_moves('c_')
+        all_moves = Search(gtree, board, enumerate_blanks=True).find_moves('c_')
+        # cc & cA, across & down, with either letter on the start: each once, vs. cC & Cc for cc
+        assert(len(moves) == 8 and len(all_moves) == 12)
+        # The tile goes on the triple letter, though the blank is placed after it: (3 * 3 + 0)
+        move = max(moves, key=lambda m: m.points)
+        assert([(pl.cell, pl.char) for pl in sorted(move.placed_letters, key=lambda pl: pl.cell.x)]
+               == [(Cell(3, 3), 'C'), (Cell(4, 3), 'c')] and move.primary_word.word == 'Cc')
+        assert(move.points == 9 and board.moves2points([move]) == [9])
+        assert(max([m.points for m in all_moves]) == 9 and Search(gtree, board).best_moves('c_', 1)[0].points == 9)
+
+    def test_move2points(self):
+        config = { 'points2chars': 'points2chars_test', 'points2chars_test': { 0: '_', 1: 'aest', 3: 'c' }
+                   , 'rack_size': 3, 'bingo_points': 20 }
+        layout = BoardLayout(['3.....3', '.......', '...@...', '#..*..#', '.......', '.......', '2.....2'])
+        rows = ['.......', '.......', '.......', '..cat..', '.......', '.......', '.......']
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'east', 'eat', 'sat', 'scat', 'sea', 'seat', 'tea', 'teas'])
+        board = Board(config, layout=layout, rows=rows)
+        moves = Search(gtree, board).find_moves('se_')
+        assert(len(moves) > 0)
+        assert(board.moves2points(moves) == [m.points for m in moves])
+
+        # Scoring is the same once the move's letters are on board.
+        for move in moves:
+            board = Board(config, layout=layout, rows=rows)
+            for pl in move.placed_letters:
+                board[pl.cell] = pl.char
+            assert(board.move2points(move) == move.points)
+
+    def test_find_moves_parallel(self):
+        board = Board(None, layout=None, rows=['.......', '.......', '..cat..', '...e...', '..sea..', '.......'])
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'east', 'eat', 'sat', 'scat', 'sea', 'seat', 'tea', 'teas'])
+        serial_moves = Search(gtree, board).find_moves('aest_')
+        parallel_min_items = Search.PARALLEL_MIN_ITEMS
+        try:
+            Search.PARALLEL_MIN_ITEMS = 0
+            parallel_moves = Search(gtree, board).find_moves('aest_', workers=2)
+        finally:
+            Search.PARALLEL_MIN_ITEMS = parallel_min_items
+        assert(len(serial_moves) > 0)
+        assert([str(m) for m in parallel_moves] == [str(m) for m in serial_moves])
+
+    def test_stats(self):
+        board = Board(None, layout=None, rows=['.......', '.......', '..cat..', '...e...', '..sea..', '.......'])
+        gtree = GTree()
+        gtree.add_wordlist(['at', 'cat', 'cats', 'east', 'eat', 'sat', 'scat', 'sea', 'seat', 'tea', 'teas'])
+        moves = Search(gtree, board).find_moves('aes_')
+        search = Search(gtree, board, stats=SearchStats())
+        assert([str(m) for m in search.find_moves('aes_')] == [str(m) for m in moves])
+        stats = search.stats
+        assert(stats.moves == len(moves) and stats.nodes_visited == search.nodes_visited)
+        assert(stats.pruned_by_board > 0 and stats.pruned_by_cross_check > 0 and stats.pruned_by_rack > 0)
+        assert(all([seconds >= 0.0 for seconds in stats.phase2seconds.values()]))
+        assert(stats.phase2seconds['traversal'] > 0.0 and stats.phase2seconds['build_moves'] > 0.0)
+
+        # Workers' counts are merged.
+        parallel_min_items = Search.PARALLEL_MIN_ITEMS
+        try:
+            Search.PARALLEL_MIN_ITEMS = 0
+            parallel_search = Search(gtree, board, stats=SearchStats())
+            parallel_search.find_moves('aes_', workers=2)
+        finally:
+            Search.PARALLEL_MIN_ITEMS = parallel_min_items
+        counts = lambda d: {k: v for k, v in d.items() if k != 'seconds'}
+        assert(counts(parallel_search.stats.as_dict()) == counts(stats.as_dict()))
+
+        # Stats accumulate over searches.
+        best = search.best_moves('aes_', 2)
+        assert(stats.nodes_visited == search.nodes_visited and stats.pruned_by_bound == search.branches_pruned)
+        assert(stats.moves >= len(moves) + len(best))
+
     def test_board_edge(self):
         TestSearch.run_config_test('test_board_edge')
 
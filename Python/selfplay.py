@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+import logging
+import time
+
+
+from board import Board
+from game import Game, GameState
+from player import PlayerType
+from strategy import BestScoreStrategy, Strategy
+from turn import TurnType
+from typing import Dict, List
+
+
+logger = logging.getLogger(__name__)
+
+
+# Plays complete computer-vs-computer games without any input or output, e.g. as a benchmark of
+# the whole game loop. Game k is played with bag seed (seed + k), so each game is reproducible.
+# Players use the strategies named in strategy_names, in order of play (default: BestScoreStrategy).
+class SelfPlay:
+    def __init__(self, config, gtree, layout):
+        self.config = config
+        self.gtree = gtree
+        self.layout = layout
+
+        self.game_count = 0
+        self.turn_count = 0
+        self.move_count = 0  # Turns that placed letters
+        self.search_count = 0
+        self.search_seconds = 0.0
+        self.elapsed = 0.0
+
+    def play_game(self, seed:int, strategy_names:List[str]=None)->Dict:
+        """Play one game, and return its summary."""
+        board = Board(self.config, layout=self.layout)
+        player_count = int(self.config['player_count'])
+        strategy_names = strategy_names if strategy_names else [BestScoreStrategy.NAME] * player_count
+        strategies = [Strategy.create(name, f'{seed}:{k}') for k, name in enumerate(strategy_names)]
+        game = Game(self.config, self.gtree, board, player_types=[PlayerType.COMPUTER] * player_count
+                    , strategies=strategies, seed=seed, verbose=False)
+        try:
+            game.play_one_game()
+        finally:
+            for strategy in strategies:
+                strategy.close()
+        assert(game.game_state == GameState.DONE)
+
+        players = [game.pid2player[pid] for pid in game.ordered_pids]
+        self.game_count += 1
+        self.turn_count += len(game.history)
+        self.move_count += len([t for t in game.history if t.turn_type == TurnType.PLACE])
+        self.search_count += sum([p.search_count for p in players])
+        self.search_seconds += sum([p.search_seconds for p in players])
+        return { 'seed': seed
+                 , 'strategies': strategy_names
+                 , 'scores': [p.score for p in players]
+                 , 'winner_id': game.winner_id
+                 , 'turns': len(game.history)
+                 }
+
+    def prepare(self, strategy_names:List[str]=None):
+        """Prepare the named strategies for play (See Strategy.prepare.), before any game is timed."""
+        for name in sorted(set(strategy_names if strategy_names else [BestScoreStrategy.NAME])):
+            Strategy.create(name).prepare(self.config)
+
+    def play_games(self, game_count:int, seed:int=0, strategy_names:List[str]=None)->List[Dict]:
+        self.prepare(strategy_names)
+        start = time.perf_counter()
+        results = [self.play_game(seed + k, strategy_names) for k in range(game_count)]
+        self.elapsed += time.perf_counter() - start
+        return results
+
+    def report(self)->str:
+        elapsed = self.elapsed if self.elapsed > 0 else float('nan')
+        latency = self.search_seconds / self.search_count * 1000 if self.search_count else 0.0
+        return (f'{self.game_count} games, {self.move_count} moves in {self.elapsed:.2f} s'
+                + f': {self.game_count / elapsed:.2f} games/sec, {self.move_count / elapsed:.1f} moves/sec'
+                + f', {latency:.1f} ms/search')
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import unittest
+
+
+from selfplay import SelfPlay
+from util import Util
+
+
+class TestSelfPlay(unittest.TestCase):
+    WORDS = ['at', 'cat', 'cats', 'east', 'eat', 'eats', 'in', 'it', 'no', 'not', 'note', 'on', 'one'
+             , 'rat', 'rate', 'sat', 'sea', 'seat', 'set', 'sit', 'tea', 'tin', 'to', 'toe', 'ton', 'tone']
+
+    def test_play_games(self):
+        config, gtree, layout = Util.small_game_fixture(TestSelfPlay.WORDS)
+
+        selfplay = SelfPlay(config, gtree, layout)
+        results = selfplay.play_games(2, seed=7)
+        assert(selfplay.game_count == 2 and selfplay.move_count > 0)
+        assert(selfplay.search_count >= selfplay.move_count and selfplay.search_seconds > 0)
+        for result in results:
+            scores = result['scores']
+            assert(scores[result['winner_id'] - 1] == max(scores))
+
+        # Games are reproducible from their seeds.
+        assert(SelfPlay(config, gtree, layout).play_games(1, seed=8) == results[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
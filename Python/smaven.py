@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import argparse
+import logging
 import string
 import sys
 import yaml
@@ -10,24 +11,67 @@ from bag import Bag
 from board import Board, BoardLayout
 from game import Game
 from gtree import GTree
+from gtree_array import ArrayGTree
 from move import Move, PlacedLetter, PlacedWord
 import os
-from player import Player
+from player import Player, PlayerType
 from search import Search
+from search_batch import SearchBatch
+from search_stats import SearchStats
+from search_trace import SearchTrace
+from selfplay import SelfPlay
+from strategy import Strategy
+from tournament import Tournament
 from turn import Turn
 from util import Util
 
 
 class Command:
+    COMPILE_DICT = 'compile-dict'
     SEARCH = 'search'
+    BATCH = 'batch'
     EXPERIMENT = 'experiment'
     PLAYERS = 'players'
     ML = 'ml'
 
 
+def load_gtree(config, dictionary_file, backend=None):
+    """Load the dictionary using the GADDAG backend named in config (or by backend)."""
+    backend = backend if backend else config['dictionary_backend']
+    cache_dir = config['dictionary_cache_dir']
+    if backend == 'array':
+        return ArrayGTree(dictionary_file, cache_dir=cache_dir)
+    elif backend == 'gnode':
+        return GTree(dictionary_file, cache_dir=cache_dir)
+    else:
+        raise ValueError(f'Unknown dictionary backend: {backend}')
+
+
+def setup_logging(config, args):
+    """Log to a file per process, at the level given by args. Search debug logging is only formatted
+    at DEBUG, and the search trace is only written if args.trace is given."""
+    logfile_path = config['logfile_basename'] + '_' + str(os.getpid()) + '.log'
+    handler = logging.FileHandler(logfile_path)
+    handler.setFormatter(logging.Formatter('%(asctime)s:' + logging.BASIC_FORMAT))
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    root_logger.setLevel(getattr(logging, args.log_level))
+    if args.trace:
+        SearchTrace.start(args.trace)
+
+
 def main(config, args):
     if Util.TEST_FEATURES:
-        print(f'args={args}')
+        print(f'args={args}', file=sys.stderr)
+
+    dictionary_file = args.dictionary if args.dictionary else config['dictionary_file']
+    cache_dir = config['dictionary_cache_dir']
+
+    if args.command == Command.COMPILE_DICT:
+        print(f'Compiling dictionary {dictionary_file}....')
+        path = GTree.compile(dictionary_file, cache_dir, verbose=True)
+        print(f'Compiled dictionary written to {path}')
+        return
 
     if args.layoutfile is None or len(args.layoutfile) == 0:
         raise ValueError('search feature requires layoutfile to be set')
@@ -55,17 +99,33 @@ def main(config, args):
             print(f'Rack: {args.rack}')
 
         print('Creating dictionary....')
-        gtree = GTree('/usr/share/dict/words')
+        gtree = load_gtree(config, dictionary_file, args.backend)
 
-        game = Game(config, gtree, board)
-        search = Search(gtree, board)
-        moves = search.find_moves(args.rack)
+        search = Search(gtree, board, stats=SearchStats() if args.stats else None, enumerate_blanks=args.all_blanks)
+        if args.best is not None:
+            moves = search.best_moves(args.rack, args.best)
+        else:
+            moves = search.find_moves(args.rack, args.workers)
         if moves:
             for move in moves:
-                print(f'Move found: {move}')
+                print(f'Move found: ({move.points} points) {move}')
         else:
                 print(f'No moves found')
+        if args.verbose:
+            print(f'Search: {len(moves)} moves, {search.nodes_visited} nodes visited'
+                  + f', {search.duplicates_avoided} duplicate paths avoided'
+                  + f', {search.branches_pruned} branches pruned')
+        if args.stats:
+            print(f'Search stats:\n{search.stats.report()}')
+
 
+    elif args.command == Command.BATCH:
+        gtree = load_gtree(config, dictionary_file, args.backend)
+        batch = SearchBatch(config, gtree, layout, best=args.best)
+        is_yaml = args.input.endswith(('.yml', '.yaml'))
+        with (sys.stdin if args.input == '-' else open(args.input, 'r')) as in_stream, \
+                (sys.stdout if args.output == '-' else open(args.output, 'w')) as out_stream:
+            batch.write_results(SearchBatch.read_positions(in_stream, is_yaml), out_stream, args.workers)
 
     elif args.command == Command.EXPERIMENT:
         # TODO: Init Board (BoardLayout, Bag)
@@ -73,7 +133,19 @@ def main(config, args):
         raise NotImplementedError('Experiment feature not yet implemented')
 
     elif args.command == Command.PLAYERS:
-        gtree = GTree('/usr/share/dict/words')
+        gtree = load_gtree(config, dictionary_file, args.backend)
+        if args.players_mode == 'cc':
+            selfplay = SelfPlay(config, gtree, layout)
+            for result in selfplay.play_games(args.games, args.seed if args.seed is not None else 0):
+                if args.verbose:
+                    print(f'Game (seed={result["seed"]}): scores={result["scores"]}'
+                          + f', winner=#{result["winner_id"]}, turns={result["turns"]}')
+            print(selfplay.report())
+            return
+
+        char2player_type = { 'c': PlayerType.COMPUTER, 'h': PlayerType.HUMAN }
+        players_mode = args.players_mode if args.players_mode else 'hh'
+        player_types = [char2player_type[c] for c in players_mode]
         if args.testboard:
             do_use_board_config = args.testboard[0] == '@'
             board_rows = ( Util.get_rows_from_config(config[args.testboard[1:]])
@@ -82,17 +154,16 @@ def main(config, args):
             board = Board(config, layout=layout, rows=board_rows)
         else:
             board = Board(config, layout, None)
-        game = Game(config, gtree, board, **{'test_name1':'auto', 'test_name2':'auto', 'test_rack1':'auto', 'test_rack2':'auto'})
+        game = Game(config, gtree, board, player_types=player_types, seed=args.seed
+                    , **{'test_name1':'auto', 'test_name2':'auto', 'test_rack1':'auto', 'test_rack2':'auto'})
         game.play()
 
-    elif args.command == Command.ML:  # Train computer strategy via ML
-        # TODO: bag = ...
-        # TODO: layout = ...
-        # TODO: board = ...
-        # TODO: <computer_players> = ...
-        # TODO: game = Game(Players w/ strategy, BoardLayout, Board, Bag)
-        # TODO: game.play_game()
-        raise NotImplementedError('ML (machine learning) feature not yet implemented')
+    elif args.command == Command.ML:  # Evaluate computer strategies, by playing tournaments between them
+        # TODO: Train strategy parameters (e.g., weights) against the results
+        gtree = load_gtree(config, dictionary_file, args.backend)
+        tournament = Tournament(config, gtree, layout, args.strategies)
+        tournament.run(args.games, args.seed, args.workers)
+        print(tournament.report())
 
     else:
         raise ValueError(f'Feature not specified')
@@ -112,9 +183,18 @@ if __name__ == '__main__':
 
     parser.add_argument('-c', '--configfile'
             , help='File that contains game configuration', default='config.yml')
+    parser.add_argument('-d', '--dictionary'
+            , help='Word file used to build the dictionary (default: dictionary_file in config)', default=None)
+    parser.add_argument('--backend', choices=['gnode', 'array']
+            , help='GADDAG backend: GNode objects, or arrays mapped from the compiled file (default: dictionary_backend in config)'
+            , default=None)
     parser.add_argument('-l', '--layoutfile'
             , help='File that contains the layout of the board', default='@layout_scrabble')
     parser.add_argument('-v', '--verbose', action='store_true')
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO'
+            , help='Level of the messages written to the log file (logfile_basename in config)')
+    parser.add_argument('--trace', default=None
+            , help='JSONL file to which each node expanded by searches is written')
 
     display_mode_group = parser.add_mutually_exclusive_group(required=False)
     display_mode_group.add_argument('-t', '--text'
@@ -126,14 +206,34 @@ if __name__ == '__main__':
     subparsers = parser.add_subparsers(title='commands', dest='command')
 
     # Commands
+    parser_compile_dict = subparsers.add_parser(Command.COMPILE_DICT, help='Build the dictionary (GADDAG) file cache ahead of time')
     parser_search = subparsers.add_parser(Command.SEARCH, help='Find valid moves for a given board, rack, and dictionary')
+    parser_batch = subparsers.add_parser(Command.BATCH, help='Find valid moves for many (board, rack) positions')
     parser_experiment = subparsers.add_parser(Command.EXPERIMENT, help='Use a shell to experiment')
     parser_players = subparsers.add_parser(Command.PLAYERS, help='Play a game: Human vs Human, or Computer vs Human')
-    parser_ml = subparsers.add_parser(Command.ML, help='Develop a strategy by playing Computer vs Computer')
+    parser_ml = subparsers.add_parser(Command.ML, help='Evaluate strategies by playing tournaments, Computer vs Computer')
+
+    # Compile-dict args
 
     # Search args
     parser_search.add_argument('-b', '--boardfile', help='File that contains letters present on board', default='@test_board_scrabble')
     parser_search.add_argument('-r', '--rack', help='Rack that contains letters to be used in search', default='etaoins')
+    parser_search.add_argument('-j', '--workers', type=int, default=1
+            , help='Number of processes used to search (small boards are searched serially)')
+    parser_search.add_argument('-k', '--best', type=int, default=None
+            , help='Only list the given number of highest-scoring moves')
+    parser_search.add_argument('--stats', action='store_true'
+            , help='Show node counts, pruned branches by cause, and the time of each phase of the search')
+    parser_search.add_argument('--all-blanks', action='store_true'
+            , help='List every designation of blanks, including blanks played where a tile of the same letter could go')
+
+    # Batch args
+    parser_batch.add_argument('-i', '--input', default='-'
+            , help='JSONL file of positions, or YAML file (.yml/.yaml) like test_search.yml (default: stdin)')
+    parser_batch.add_argument('-o', '--output', default='-', help='JSONL file of results (default: stdout)')
+    parser_batch.add_argument('-j', '--workers', type=int, default=1, help='Number of processes used to search')
+    parser_batch.add_argument('-k', '--best', type=int, default=None
+            , help='Only keep the given number of highest-scoring moves of each position')
 
     # Player args
     parser_players.add_argument('--testboard', help='File that contains letters present on board', default='@test_board_scrabble')
@@ -141,6 +241,10 @@ if __name__ == '__main__':
     parser_players.add_argument('--ch', nargs='?', dest='players_mode', const='ch', help='Computer vs Human')
     parser_players.add_argument('--hc', nargs='?', dest='players_mode', const='hc', help='Human vs Computer')
     parser_players.add_argument('--hh', nargs='?', dest='players_mode', const='hh', help='Human vs Human')
+    parser_players.add_argument('-n', '--games', type=int, default=10
+            , help='Number of games played, Computer vs Computer (which plays without input or output)')
+    parser_players.add_argument('--seed', type=int, default=None
+            , help='Seed of the bag draws, for reproducible games (Computer vs Computer: seed of the first game)')
     parser_players.add_argument('--test_name1', help='Name of player #1', default='auto')
     parser_players.add_argument('--test_name2', help='Name of player #2', default='auto')
     parser_players.add_argument('--test_rack1', help='Letters initially in the rack of player #1', default='auto')
@@ -150,18 +254,27 @@ if __name__ == '__main__':
     # TODO: Specify how input is obtained: keyboard/server:port/etc.
 
     # ML args (feature selection not modifiable from command line)
+    parser_ml.add_argument('-s', '--strategies', nargs='+', choices=sorted(Strategy.name2class), default=['best', 'random']
+            , help='Strategies that play each other')
+    parser_ml.add_argument('-n', '--games', type=int, default=100, help='Number of games played by each pair of strategies')
+    parser_ml.add_argument('-j', '--workers', type=int, default=1, help='Number of processes used to play games')
+    parser_ml.add_argument('--seed', type=int, default=0, help='Seed of the bag draws of the first game')
     # TODO: Input file containing weights
     # TODO: Output files containing game stats, and modified weights
 
     args = parser.parse_args()
-    if args.command not in [Command.SEARCH, Command.EXPERIMENT, Command.PLAYERS, Command.ML]:
+    if args.command not in [Command.COMPILE_DICT, Command.SEARCH, Command.BATCH, Command.EXPERIMENT, Command.PLAYERS, Command.ML]:
         parser.print_help()
         parser.exit()
 
-    with open('config.yml', 'r') as config_stream:
+    with open(args.configfile, 'r') as config_stream:
         try:
-            config = yaml.load(config_stream)
+            config = yaml.safe_load(config_stream)
         except yaml.YAMLError as ex:
             print(ex, file=sys.stderr)
 
-    main(config, args)
+    setup_logging(config, args)
+    try:
+        main(config, args)
+    finally:
+        SearchTrace.stop()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from copy import deepcopy
+import math
+import mmap
+import multiprocessing
+import pickle
+from random import Random
+import struct
+import time
+
+
+from bag import Bag
+from endgame import Endgame
+from leave import LeaveTable
+from rack import Rack
+from search import Search
+from turn import Turn, TurnType
+from typing import List
+
+
+# The SimulationStrategy of a worker process of SimulationStrategy.pool, inherited via fork.
+_fork_simulation = None
+
+
+# How a computer player chooses its turn. Strategies are created per game, by name (See Strategy.create.),
+# with a seed, so that games between strategies are reproducible.
+class Strategy:
+    NAME = None
+    name2class = {}
+
+    def __init__(self, seed=None):
+        self.rng = Random(seed)
+
+    @staticmethod
+    def create(name:str, seed=None)->'Strategy':
+        if name not in Strategy.name2class:
+            raise ValueError(f'Unknown strategy: {name} (Known strategies: {", ".join(sorted(Strategy.name2class))})')
+        return Strategy.name2class[name](seed)
+
+    @staticmethod
+    def register(cls):
+        """Class decorator that makes a Strategy subclass available to Strategy.create."""
+        Strategy.name2class[cls.NAME] = cls
+        return cls
+
+    def choose_move(self, player, search:Search):
+        """Return the Move to play, or None to swap or pass."""
+        raise NotImplementedError('Strategy.choose_move')
+
+    def prepare(self, config):
+        """Build or open what the strategy needs for games of config (e.g. tables), once per process.
+        Called before play starts (See SelfPlay.prepare.), so that it is not timed as part of a turn,
+        and is shared by forked workers."""
+        pass
+
+    def close(self):
+        """Release any resources (e.g. worker processes) held across turns. Called when the game is over."""
+        pass
+
+    def turn_get(self, player)->Turn:
+        """Play the move chosen by choose_move. If there is none, swap the whole rack if possible, else pass."""
+        game = player.game
+        start = time.perf_counter()
+        move = self.choose_move(player, Search(game.gtree, game.board))
+        player.search_seconds += time.perf_counter() - start
+        player.search_count += 1
+        if move is not None:
+            return Turn(player.player_id, TurnType.PLACE, move.points, move, Bag.DRAWN_UNKNOWN, Bag.DISCARDED_NONE)
+        if len(player.rack) > 0 and len(game.bag) >= int(game.config['rack_size']):
+            return Turn(player.player_id, TurnType.SWAP, 0, None, Bag.DRAWN_UNKNOWN, str(player.rack))
+        return Turn(player.player_id, TurnType.PASS, 0, None, Bag.DRAWN_NONE, Bag.DISCARDED_NONE)
+
+
+@Strategy.register
+class BestScoreStrategy(Strategy):
+    """Play the highest-scoring move."""
+    NAME = 'best'
+
+    def choose_move(self, player, search):
+        moves = search.best_moves(player.rack, 1)
+        return moves[0] if moves else None
+
+
+@Strategy.register
+class RandomMoveStrategy(Strategy):
+    """Play a move chosen at random, as a baseline."""
+    NAME = 'random'
+
+    def choose_move(self, player, search):
+        moves = search.find_moves(player.rack)
+        return self.rng.choice(moves) if moves else None
+
+
+@Strategy.register
+class EquityStrategy(Strategy):
+    """Play the move with the highest equity: its points plus the value of its leave. (See LeaveTable.)
+    Once the bag is empty, leaves are not drawn to, so moves are ranked by points."""
+    NAME = 'equity'
+
+    def __init__(self, seed=None, leave_table:LeaveTable=None):
+        super().__init__(seed)
+        self.leave_table = leave_table
+
+    def prepare(self, config):
+        if self.leave_table is None:
+            self.leave_table = LeaveTable.cached(config)
+
+    def choose_move(self, player, search):
+        moves = search.find_moves(player.rack)
+        if not moves or len(player.game.bag) == 0:
+            return max(moves, key=lambda m: m.points) if moves else None
+        if self.leave_table is None:
+            self.prepare(player.game.config)  # Opened by SelfPlay.prepare, unless played outside of it
+        rack = player.rack
+        table = self.leave_table
+        return max(moves, key=lambda m: m.points + table.value(LeaveTable.move_leave(rack, m)))
+
+
+@Strategy.register
+class EndgameStrategy(EquityStrategy):
+    """Play as EquityStrategy until the bag is empty. Then, in two-player games, play the move found by
+    the endgame solver (See Endgame.) within endgame_seconds (in config)."""
+    NAME = 'endgame'
+
+    def choose_move(self, player, search):
+        game = player.game
+        if len(game.bag) > 0 or game.num_players != 2:
+            return super().choose_move(player, search)
+        opponent = game.pid2player[game.pid2next[player.player_id]]
+        time_limit = float(game.config.get('endgame_seconds', Endgame.TIME_LIMIT_SECONDS))
+        endgame = Endgame(game.gtree, game.board, [player.rack, opponent.rack], game.was_prev_turn_pass, time_limit)
+        move, _ = endgame.solve()
+        return move
+
+
+@Strategy.register
+class SimulationStrategy(Strategy):
+    """Play the move with the best average outcome over simulated continuations of the game.
+    The highest-scoring candidate moves are each evaluated by rollouts: the opponent's rack and our
+    draws are taken at random from the unseen tiles (the bag & the opponents' racks), then the
+    players alternate playing their highest-scoring moves for PLIES plies. The outcome of a rollout
+    is our points minus the opponent's. Rollouts continue, round by round, until TIME_BUDGET_SECONDS
+    have passed; candidates whose outcome is clearly worse than the best one's are dropped early."""
+    NAME = 'sim'
+
+    CANDIDATE_COUNT = 8
+    PLIES = 2                    # Plies played after the candidate move: opponent, us, ...
+    TIME_BUDGET_SECONDS = 0.5
+    ROLLOUTS_PER_ROUND = 2       # Rollouts of each candidate per round
+    MIN_ROLLOUTS = 4             # Rollouts of a candidate before it can be dropped
+    Z = 2.0                      # A candidate is dropped if its upper bound is below the best's lower bound
+    WORKERS = 1                  # Number of processes running rollouts
+    STATE_HEADER_FORMAT = '<QQ'  # Turn id & size of the pickled state of the turn in state_mm
+    STATE_CAPACITY = 1 << 20     # Initial size of state_mm
+
+    # With workers > 1, rollouts run in a pool of processes forked on the first turn simulated, and
+    # reused for the rest of the game (See close.), so the GADDAG is shared rather than copied. The state
+    # of each turn is pickled once, into shared memory mapped before the workers are forked, and each
+    # worker reads it at its first rollout of the turn; tasks only carry (turn id, candidate, seed).
+    # At most one rollout per worker is in flight, so simulate waits for no more than one rollout past
+    # the time budget, and no rollout is left running when it returns (nor when state_mm is rewritten).
+    def __init__(self, seed=None, time_budget=None, workers=None):
+        super().__init__(seed)
+        self.time_budget = time_budget if time_budget is not None else SimulationStrategy.TIME_BUDGET_SECONDS
+        self.workers = workers if workers is not None else SimulationStrategy.WORKERS
+        self.rollout_count = 0  # Totals over all turns
+        self.dropped_count = 0
+        self.pool = None
+        self.pool_game = None   # The game the pool was forked for
+        self.state_mm = None    # Shared with the pool's workers
+
+        # State of the current turn, used by rollout
+        self.game = None
+        self.turn_id = 0
+        self.board = None
+        self.candidates = None
+        self.leaves = None
+        self.unseen = None
+
+    def choose_move(self, player, search):
+        candidates = search.best_moves(player.rack, SimulationStrategy.CANDIDATE_COUNT)
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        game = player.game
+        self.game = game
+        self.turn_id += 1
+        self.board = game.board
+        self.candidates = candidates
+        self.leaves = []
+        for move in candidates:
+            leave = deepcopy(player.rack)
+            leave.remove_tiles([pl.char for pl in move.placed_letters])
+            self.leaves.append(str(leave))
+        self.unseen = game.bag.letters + ''.join([str(p.rack) for p in game.pid2player.values() if p is not player])
+        try:
+            outcomes = self.simulate()
+        finally:
+            self.game = None
+            self.board = None
+        means = [sum(o) / len(o) if o else -math.inf for o in outcomes]
+        best = max(range(len(candidates)), key=lambda k: (means[k], -k))
+        return candidates[best] if means[best] > -math.inf else candidates[0]
+
+    def simulate(self)->List[List[int]]:
+        """Return the outcomes of the rollouts of each candidate move."""
+        deadline = time.perf_counter() + self.time_budget
+        outcomes = [[] for _ in self.candidates]
+        live = list(range(len(self.candidates)))
+        pool = self.get_pool()
+        while len(live) > 1 and time.perf_counter() < deadline:
+            tasks = [(k, self.rng.getrandbits(64)) for k in live for _ in range(SimulationStrategy.ROLLOUTS_PER_ROUND)]
+            if pool is None:
+                for k, seed in tasks:
+                    if time.perf_counter() >= deadline:
+                        break
+                    outcomes[k].append(self.rollout(k, seed))
+                    self.rollout_count += 1
+            else:
+                tasks.reverse()
+                future2k = {}
+                while tasks or future2k:
+                    while tasks and len(future2k) < self.workers and time.perf_counter() < deadline:
+                        k, seed = tasks.pop()
+                        future2k[pool.submit(rollout, (self.turn_id, k, seed))] = k
+                    if not future2k:
+                        break
+                    done, _ = wait(future2k, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        outcomes[future2k.pop(future)].append(future.result())
+                        self.rollout_count += 1
+            live = self.drop_losing(live, outcomes)
+        return outcomes
+
+    def get_pool(self)->ProcessPoolExecutor:
+        """Return the pool of worker processes for the current game, with the state of the current turn
+        shared with them, or None if rollouts run in this process."""
+        if self.workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            return None
+        state = self.turn_state()
+        header_size = struct.calcsize(SimulationStrategy.STATE_HEADER_FORMAT)
+        if self.pool is not None and (self.pool_game is not self.game or header_size + len(state) > len(self.state_mm)):
+            self.close()
+        if self.pool is None:
+            capacity = SimulationStrategy.STATE_CAPACITY
+            while capacity < header_size + len(state):
+                capacity *= 2
+            self.state_mm = mmap.mmap(-1, capacity)  # Anonymous & shared, so written here & read by workers
+            # The workers are forked on demand, so the strategy is handed to each by its initializer.
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork')
+                                            , initializer=init_rollout_worker, initargs=(self,))
+            self.pool_game = self.game
+        struct.pack_into(SimulationStrategy.STATE_HEADER_FORMAT, self.state_mm, 0, self.turn_id, len(state))
+        self.state_mm[header_size:header_size + len(state)] = state
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+            self.pool_game = None
+            self.state_mm.close()
+            self.state_mm = None
+
+    def turn_state(self)->bytes:
+        """Pickle the state of the current turn, for the workers. (See load_turn_state.)
+        The board is sent without its game & GADDAG, which the workers already have."""
+        board = deepcopy(self.board)
+        has_cross_checks = board.cross_gtree is self.game.gtree
+        board.game = None
+        board.cross_gtree = None
+        return pickle.dumps((board, has_cross_checks, self.candidates, self.leaves, self.unseen))
+
+    def load_turn_state(self, turn_id:int):
+        """Load the state of turn turn_id from state_mm, in a worker process."""
+        header_size = struct.calcsize(SimulationStrategy.STATE_HEADER_FORMAT)
+        state_turn_id, size = struct.unpack_from(SimulationStrategy.STATE_HEADER_FORMAT, self.state_mm, 0)
+        assert(state_turn_id == turn_id)
+        state = self.state_mm[header_size:header_size + size]
+        board, has_cross_checks, self.candidates, self.leaves, self.unseen = pickle.loads(state)
+        board.game = self.pool_game
+        board.cross_gtree = self.pool_game.gtree if has_cross_checks else None
+        self.game = self.pool_game
+        self.board = board
+        self.turn_id = turn_id
+
+    def drop_losing(self, live:List[int], outcomes:List[List[int]])->List[int]:
+        """Return the candidates that are not clearly worse than the best one."""
+        def bounds(k):
+            values = outcomes[k]
+            mean = sum(values) / len(values)
+            variance = sum([(v - mean) ** 2 for v in values]) / (len(values) - 1)
+            half_width = SimulationStrategy.Z * math.sqrt(variance / len(values))
+            return mean - half_width, mean + half_width
+        ready = [k for k in live if len(outcomes[k]) >= SimulationStrategy.MIN_ROLLOUTS]
+        if len(ready) < 2:
+            return live
+        best_low = max([bounds(k)[0] for k in ready])
+        result = [k for k in live if k not in ready or bounds(k)[1] >= best_low]
+        self.dropped_count += len(live) - len(result)
+        return result
+
+    def rollout(self, k:int, seed:int)->int:
+        """Play candidate k, then PLIES plies of highest-scoring moves, on a copy of the board.
+        Return our points minus the opponent's."""
+        rng = Random(seed)
+        game = self.game
+        rack_size = int(game.config['rack_size'])
+        board = deepcopy(self.board)
+        move = self.candidates[k]
+        board.make_move(move, game.gtree)
+        unseen = list(self.unseen)
+        rng.shuffle(unseen)
+
+        our_rack = Rack(self.leaves[k])
+        our_rack.add_chars([unseen.pop() for _ in range(min(rack_size - len(our_rack), len(unseen)))])
+        opponent_rack = Rack(''.join([unseen.pop() for _ in range(min(rack_size, len(unseen)))]))
+        outcome = move.points
+        sign = -1
+        rack = opponent_rack
+        for _ in range(SimulationStrategy.PLIES):
+            moves = Search(game.gtree, board).best_moves(rack, 1)
+            if moves:
+                board.make_move(moves[0], game.gtree)
+                outcome += sign * moves[0].points
+                rack.remove_tiles([pl.char for pl in moves[0].placed_letters])
+                rack.add_chars([unseen.pop() for _ in range(min(rack_size - len(rack), len(unseen)))])
+            sign = -sign
+            rack = our_rack if rack is opponent_rack else opponent_rack
+        return outcome
+
+
+def init_rollout_worker(strategy:SimulationStrategy):
+    global _fork_simulation
+    _fork_simulation = strategy
+
+
+def rollout(task):
+    """Run a rollout in a worker process of SimulationStrategy.pool."""
+    turn_id, k, seed = task
+    if _fork_simulation.turn_id != turn_id:
+        _fork_simulation.load_turn_state(turn_id)
+    return _fork_simulation.rollout(k, seed)
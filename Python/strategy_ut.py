@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+from concurrent.futures import ProcessPoolExecutor
+import tempfile
+import unittest
+from unittest.mock import patch
+
+
+from board import Board
+from game import Game
+from leave import LeaveTable
+from player import PlayerType
+from search import Search
+from selfplay import SelfPlay
+from strategy import EquityStrategy, SimulationStrategy
+from util import Util
+
+
+class TestStrategy(unittest.TestCase):
+    # Words of the racks below ('satv', 'aeinst', then 'eorst'), and short replies.
+    WORDS = ['at', 'east', 'eat', 'in', 'it', 'rat', 'rate', 'sat', 'sea', 'seat', 'set', 'sit', 'tea', 'tin'
+             , 'to', 'toe']
+
+    def setUp(self):
+        self.config, self.gtree, self.layout = Util.small_game_fixture(TestStrategy.WORDS)
+
+    def test_equity(self):
+        config, gtree = self.config, self.gtree
+        config['rack_size'] = 4  # Keeps the leave table small
+        board = Board(config, layout=self.layout)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            table = LeaveTable.cached(config, tmp_dir)
+            strategy = EquityStrategy(seed=1, leave_table=table)
+            game = Game(config, gtree, board, player_types=[PlayerType.COMPUTER] * 2, strategies=[strategy, None]
+                        , seed=3, verbose=False)
+            player = game.pid2player[game.ordered_pids[0]]
+            player.rack.remove_chars(str(player.rack))
+            player.rack.add_chars('satv')
+
+            # 'at' scores less than 'sat', but keeps the s.
+            move = strategy.choose_move(player, Search(gtree, board))
+            assert(move.primary_word.word == 'at' and LeaveTable.move_leave(player.rack, move) == 'sv')
+            assert(max([m.points for m in Search(gtree, board).find_moves(player.rack)]) > move.points)
+            equity = move.points + table.value('sv')
+            for other in Search(gtree, board).find_moves(player.rack):
+                assert(other.points + table.value(LeaveTable.move_leave(player.rack, other)) <= equity)
+            table.close()
+            LeaveTable.path2table.clear()
+
+            # SelfPlay.prepare opens the table before play, for strategies created without one.
+            config['dictionary_cache_dir'] = tmp_dir
+            SelfPlay(config, gtree, self.layout).prepare(['best', 'equity'])
+            assert(len(LeaveTable.path2table) == 1)
+            strategy = EquityStrategy(seed=1)
+            assert(strategy.choose_move(player, Search(gtree, board)) == move)
+            assert(strategy.leave_table is list(LeaveTable.path2table.values())[0])
+            strategy.leave_table.close()
+            LeaveTable.path2table.clear()
+
+    def test_simulation(self):
+        config, gtree = self.config, self.gtree
+        board = Board(config, layout=self.layout)
+        strategy = SimulationStrategy(seed=5, time_budget=0.2)
+        game = Game(config, gtree, board, player_types=[PlayerType.COMPUTER] * 2, strategies=[strategy, None]
+                    , seed=3, verbose=False)
+        player = game.pid2player[game.ordered_pids[0]]
+        player.rack.remove_chars(str(player.rack))
+        player.rack.add_chars('aeinst')
+        bag_size = len(game.bag)
+
+        candidates = Search(gtree, board).best_moves(player.rack, SimulationStrategy.CANDIDATE_COUNT)
+        assert(len(candidates) > 1)
+        move = strategy.choose_move(player, Search(gtree, board))
+        assert(move in candidates)
+        assert(strategy.rollout_count >= 2 * SimulationStrategy.ROLLOUTS_PER_ROUND)
+        # Rollouts are played on copies: the game is unchanged.
+        assert(board.is_empty())
+        assert(str(player.rack) == 'aeinst' and len(game.bag) == bag_size)
+
+    def test_simulation_pool(self):
+        config, gtree = self.config, self.gtree
+        board = Board(config, layout=self.layout)
+        strategy = SimulationStrategy(seed=5, time_budget=0.2, workers=2)
+        game = Game(config, gtree, board, player_types=[PlayerType.COMPUTER] * 2, strategies=[strategy, None]
+                    , seed=3, verbose=False)
+        player = game.pid2player[game.ordered_pids[0]]
+        tasks = []
+        futures = []
+        submit = ProcessPoolExecutor.submit
+
+        def record_submit(pool, fn, task):
+            tasks.append(task)
+            futures.append(submit(pool, fn, task))
+            return futures[-1]
+        try:
+            # The pool is forked once, and reused by later turns, which see the moves played since.
+            with patch.object(ProcessPoolExecutor, 'submit', record_submit):
+                for rack in ['aeinst', 'eorst']:
+                    player.rack.remove_chars(str(player.rack))
+                    player.rack.add_chars(rack)
+                    candidates = Search(gtree, board).best_moves(player.rack, SimulationStrategy.CANDIDATE_COUNT)
+                    move = strategy.choose_move(player, Search(gtree, board))
+                    assert(move in candidates)
+                    if rack == 'aeinst':
+                        pool = strategy.pool
+                        board.make_move(move, gtree)
+                    assert(strategy.pool is pool)
+                    # No rollout is left running.
+                    assert(all([future.done() and not future.cancelled() for future in futures]))
+            assert(strategy.rollout_count == len(futures) >= 4 * SimulationStrategy.ROLLOUTS_PER_ROUND)
+            # The state of each turn is shared once, rather than sent with each task.
+            assert(sorted(set([turn_id for turn_id, _, _ in tasks])) == [1, 2])
+        finally:
+            strategy.close()
+        assert(strategy.pool is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,15 +4,27 @@ import unittest
 import yaml
 
 
-from gtree_ut import TestGTree
+from benchmark_ut import TestBenchmark
+from board_ut import TestBoard
+from endgame_ut import TestEndgame
+from gtree_ut import TestArrayGTree, TestGTree
+from leave_ut import TestLeaveTable
+from player_ut import TestPlayer
+from rack_ut import TestRack
+from search_batch_ut import TestSearchBatch
+from search_cache_ut import TestSearchCache
+from search_trace_ut import TestSearchTrace
 from search_ut import TestSearch
 from search_state_ut import TestSearchState
+from selfplay_ut import TestSelfPlay
+from strategy_ut import TestStrategy
+from tournament_ut import TestTournament
 from util_ut import TestUtil
 
 
 def show_config(filename):
     with open(filename, 'r') as stream:
-        config = yaml.load(stream)
+        config = yaml.safe_load(stream)
 
     for k in config:
         print(f'Config key: {k}')
@@ -22,7 +34,7 @@ def show_config(filename):
 
 def show_test_search_config(filename):
     with open(filename, 'r') as stream:
-        config = yaml.load(stream)
+        config = yaml.safe_load(stream)
 
     for k in config:
         print(f'Test name: {k}')
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import logging
+import math
+import multiprocessing
+import statistics
+import time
+
+
+from selfplay import SelfPlay
+from typing import Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# The SelfPlay used by worker processes of Tournament.run, inherited via fork.
+_fork_selfplay = None
+
+
+# Evaluates computer strategies (See strategy.py.) by playing many two-player games between them.
+# Each pair of strategies plays game_count games, taking turns going first. Games 2k and 2k + 1 of a
+# pair both use the same bag seed, so each strategy plays the same bag going first and second, which
+# cancels much of the luck of the draw. Seeds do not depend on the number of worker processes.
+# Games are played in forked worker processes, which share the dictionary.
+class Tournament:
+    # Games are handed to workers in chunks of about this many, to keep the pool's overhead low.
+    CHUNK_SIZE = 8
+    # z of the confidence intervals (95%)
+    Z = 1.96
+
+    def __init__(self, config, gtree, layout, strategy_names:List[str]):
+        if int(config['player_count']) != 2:
+            raise ValueError('Tournaments are only supported for two-player games')
+        if len(strategy_names) < 2:
+            raise ValueError('A tournament needs at least two strategies')
+        self.selfplay = SelfPlay(config, gtree, layout)
+        self.strategy_names = strategy_names
+        self.results = []
+        self.elapsed = 0.0
+
+    def schedule(self, game_count:int, seed:int)->List[Tuple[int, List[str]]]:
+        """Return the (seed, strategy names in order of play) of each game. The games of a pair of
+        strategies alternate who goes first, with the same seed for both orders."""
+        games = []
+        seeds_per_pair = (game_count + 1) // 2
+        for pair_index, (name_a, name_b) in enumerate(itertools.combinations(self.strategy_names, 2)):
+            for k in range(game_count):
+                names = [name_a, name_b] if k % 2 == 0 else [name_b, name_a]
+                games.append((seed + pair_index * seeds_per_pair + k // 2, names))
+        return games
+
+    def run(self, game_count:int, seed:int=0, workers:int=1)->List[Dict]:
+        global _fork_selfplay
+        games = self.schedule(game_count, seed)
+        self.selfplay.prepare(self.strategy_names)  # Before forking, so that workers share e.g. leave tables
+        start = time.perf_counter()
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            self.results = [self.selfplay.play_game(game_seed, names) for game_seed, names in games]
+        else:
+            chunks = [games[k:k + Tournament.CHUNK_SIZE] for k in range(0, len(games), Tournament.CHUNK_SIZE)]
+            self.results = []
+            _fork_selfplay = self.selfplay
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as executor:
+                    for results, stats in executor.map(play_games, chunks):
+                        self.results.extend(results)
+                        selfplay = self.selfplay
+                        selfplay.game_count += stats['game_count']
+                        selfplay.turn_count += stats['turn_count']
+                        selfplay.move_count += stats['move_count']
+                        selfplay.search_count += stats['search_count']
+                        selfplay.search_seconds += stats['search_seconds']
+            finally:
+                _fork_selfplay = None
+        self.elapsed = time.perf_counter() - start
+        self.selfplay.elapsed += self.elapsed
+        return self.results
+
+    @staticmethod
+    def mean_ci(values:List[float])->Tuple[float, float]:
+        """Return the mean of values, and the half-width of its confidence interval."""
+        mean = statistics.mean(values)
+        if len(values) < 2:
+            return mean, float('inf')
+        return mean, Tournament.Z * statistics.stdev(values) / math.sqrt(len(values))
+
+    @staticmethod
+    def wilson_ci(wins:float, count:int)->Tuple[float, float]:
+        """Return the Wilson score interval of the win rate wins/count."""
+        z = Tournament.Z
+        p = wins / count
+        center = (p + z * z / (2 * count)) / (1 + z * z / count)
+        half_width = z * math.sqrt(p * (1 - p) / count + z * z / (4 * count * count)) / (1 + z * z / count)
+        return center - half_width, center + half_width
+
+    def stats(self)->Dict[str, Dict]:
+        """Return per-strategy stats: win rate (ties count half) and its confidence interval,
+        and the mean score & spread (own score minus opponent's) with their confidence intervals."""
+        name2scores = {name: [] for name in self.strategy_names}
+        name2spreads = {name: [] for name in self.strategy_names}
+        name2wins = {name: 0.0 for name in self.strategy_names}
+        for result in self.results:
+            scores = result['scores']
+            for k, name in enumerate(result['strategies']):
+                spread = scores[k] - scores[1 - k]
+                name2scores[name].append(scores[k])
+                name2spreads[name].append(spread)
+                name2wins[name] += 1.0 if spread > 0 else 0.5 if spread == 0 else 0.0
+        result = {}
+        for name in self.strategy_names:
+            count = len(name2scores[name])
+            if count == 0:
+                continue
+            score, score_ci = Tournament.mean_ci(name2scores[name])
+            spread, spread_ci = Tournament.mean_ci(name2spreads[name])
+            result[name] = { 'games': count
+                             , 'win_rate': name2wins[name] / count
+                             , 'win_rate_ci': Tournament.wilson_ci(name2wins[name], count)
+                             , 'score': score
+                             , 'score_ci': score_ci
+                             , 'spread': spread
+                             , 'spread_ci': spread_ci
+                             }
+        return result
+
+    def report(self)->str:
+        lines = []
+        for name, s in self.stats().items():
+            low, high = s['win_rate_ci']
+            lines.append(f'{name:>12s}: {s["games"]} games, win rate {s["win_rate"]:.3f} [{low:.3f}, {high:.3f}]'
+                         + f', score {s["score"]:.1f} ± {s["score_ci"]:.1f}'
+                         + f', spread {s["spread"]:+.1f} ± {s["spread_ci"]:.1f}')
+        lines.append(self.selfplay.report())
+        return '\n'.join(lines)
+
+
+def play_games(games:List[Tuple[int, List[str]]])->Tuple[List[Dict], Dict]:
+    """Play games in a worker process of Tournament.run. Return their results, and the stats of their play."""
+    selfplay = _fork_selfplay
+    selfplay.game_count = selfplay.turn_count = selfplay.move_count = selfplay.search_count = 0
+    selfplay.search_seconds = 0.0
+    results = [selfplay.play_game(seed, names) for seed, names in games]
+    stats = { 'game_count': selfplay.game_count
+              , 'turn_count': selfplay.turn_count
+              , 'move_count': selfplay.move_count
+              , 'search_count': selfplay.search_count
+              , 'search_seconds': selfplay.search_seconds
+              }
+    return results, stats
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+
+import unittest
+
+
+from tournament import Tournament
+from util import Util
+
+
+class TestTournament(unittest.TestCase):
+    # Enough short words for games of a few moves each.
+    WORDS = ['at', 'eat', 'in', 'it', 'no', 'not', 'on', 'one', 'tea', 'ten', 'tin', 'to', 'toe', 'ton']
+
+    def test_run(self):
+        config, gtree, layout = Util.small_game_fixture(TestTournament.WORDS)
+
+        tournament = Tournament(config, gtree, layout, ['best', 'random'])
+        # Both orders of play of a pair of strategies play the same bag.
+        assert(tournament.schedule(4, seed=11) == [(11, ['best', 'random']), (11, ['random', 'best'])
+                                                   , (12, ['best', 'random']), (12, ['random', 'best'])])
+        seeds = [game_seed for game_seed, _ in Tournament(config, gtree, layout, ['best', 'random', 'sim']).schedule(3, seed=0)]
+        assert(seeds == [0, 0, 1, 2, 2, 3, 4, 4, 5])
+        results = tournament.run(4, seed=11)
+        assert([r['strategies'] for r in results] == [['best', 'random'], ['random', 'best']] * 2)
+        stats = tournament.stats()
+        assert(stats['best']['games'] == 4 and stats['random']['games'] == 4)
+        assert(stats['best']['win_rate'] + stats['random']['win_rate'] == 1.0)
+        assert(stats['best']['spread'] == -stats['random']['spread'])
+        low, high = stats['best']['win_rate_ci']
+        assert(0.0 <= low <= stats['best']['win_rate'] <= high <= 1.0)
+
+        # Results do not depend on the number of workers.
+        assert(Tournament(config, gtree, layout, ['best', 'random']).run(4, seed=11, workers=2) == results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,10 +25,38 @@ class Util:
         is_board_cell = row_count == len(rows[0])
         return is_board_cell
 
+    @staticmethod
+    def get_char2points(config):
+        """Return the points of each letter, per the points2chars entry of config. (Empty if there is none.)"""
+        char2points = {}
+        if config and 'points2chars' in config:
+            points2chars = config[config['points2chars']]
+            for p in points2chars:
+                for c in points2chars[p]:
+                    char2points[c] = int(p)
+        return char2points
+
     @staticmethod
     def get_rows_from_config(cfg):
         return [line for line in cfg.split('\n') if len(line) > 0]
 
+    @staticmethod
+    def load_config(filename='config.yml'):
+        import yaml
+        with open(filename, 'r') as stream:
+            return yaml.safe_load(stream)
+
+    @staticmethod
+    def small_game_fixture(words, layout_name='layout_scrabble'):
+        """Return (config, gtree, layout) for tests of whole games: config.yml, a GADDAG of words only,
+        and the BoardLayout of layout_name. (Imported here, as board & gtree import util.)"""
+        from board import BoardLayout
+        from gtree import GTree
+        config = Util.load_config()
+        gtree = GTree()
+        gtree.add_wordlist(words)
+        return config, gtree, BoardLayout(Util.get_rows_from_config(config[layout_name]))
+
     @staticmethod
     def get_rows_from_filename(filename):
         with open(filename, 'r') as f:
@@ -27,6 +27,11 @@ class TestUtil(unittest.TestCase):
 
     # TODO: def test_get_rows_from_filename(self):  # filename
 
+    def test_small_game_fixture(self):
+        config, gtree, layout = Util.small_game_fixture(['at', 'cat'], 'layout_wwf')
+        assert(config['player_count'] == 2 and layout.width == 15)
+        assert(gtree.has_word('cat') and not gtree.has_word('act'))
+
     def test_is_subset(self):
         # No repetitions
         assert(Util.is_subset('b', 'abc'))